@@ -0,0 +1,921 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+误差分析引擎 - 不依赖 Qt 的核心计算
+
+理论索引、坐标转换、误差计算、等级判定、统计、配准与形状误差评定均在这里完成，
+结果以返回值给出，不发射信号。AnalysisWorker 在 QThread 中监控测量文件并把结果转为信号；
+离线批量分析与多进程并行分析直接使用本引擎，无需 PySide6
+"""
+
+import time
+import math
+import numpy as np
+import pandas as pd
+from collections import deque
+
+from theoretical_index import TheoreticalIndex
+from surface_deviation import NormalDeviationEngine
+from normal_estimation import DEFAULT_NORMAL_K, load_cached_normals, store_cached_normals
+from registration import (PointCloudTarget, AnalyticSurfaceTarget, point_to_plane_icp,
+                          apply_transform, rotation_angles_deg)
+from form_metrics import FormMetricsTracker
+from app_logging import get_logger
+
+
+logger = get_logger('analysis')
+
+
+class AnalysisEngine:
+    """误差分析引擎 - 整批处理测量数据并维护统计、配准与形状误差状态"""
+
+    def __init__(self, theoretical_data, tolerance_qualified=0.1, tolerance_attention=0.2,
+                 tolerance_over_limit=0.3, index_cache=None, reference_surface=None, normal_deviation=True,
+                 normal_deviation_k=12, probe_tip_radius=0.0, alignment=True,
+                 alignment_interval=500, alignment_sample_size=2000, form_metrics=True,
+                 form_min_ring_points=8, deviation_map=None, pipeline_metrics=None,
+                 station_metrics=None, shared_model=None):
+        """
+        初始化分析引擎（构建理论索引与法向偏差引擎，或复用 shared_model 的）
+
+        Args:
+            theoretical_data: Pandas DataFrame，理论点云数据
+            tolerance_qualified: float，合格阈值（mm）
+            tolerance_attention: float，注意阈值（mm）
+            tolerance_over_limit: float，超差阈值（mm）
+            index_cache: IndexCache，理论索引磁盘缓存（可选）
+            reference_surface: AnalyticSurface，解析参考曲面（可选）。
+                               提供时以闭式公式计算理论半径与法向，不构建点云索引
+            normal_deviation: bool，是否基于KD树计算到理论点云曲面的真实法向偏差
+            normal_deviation_k: int，法向偏差局部拟合的近邻数
+            probe_tip_radius: float，测头球头半径（mm），大于0时沿曲面法向补偿测头几何
+            alignment: bool，是否进行测量点到理论模型的ICP刚体配准
+            alignment_interval: int，扫描中每新增多少个测量点进行一次增量配准
+            alignment_sample_size: int，增量配准使用的子采样点数（扫描结束后使用全部点）
+            form_metrics: bool，是否按X站位截面评定圆度与圆柱度
+            form_min_ring_points: int，参与圆度评定的截面最少点数
+            deviation_map: DeviationMap，(x, θ)偏差展开图（可选），分析结果按批写入
+            pipeline_metrics: PipelineMetrics，流水线指标（可选），记录查找与误差计算阶段
+            station_metrics: StationMetrics，指标端点计数（可选），记录已分析点数、索引构建耗时与容差等级点数
+            shared_model: AnalysisEngine，同一理论模型（数据、解析曲面与法向偏差设置相同）的引擎（可选）。
+                          提供时直接复用其查找索引与法向偏差引擎（只读），多个会话同时分析同一模具时只构建一次
+        """
+        self.theoretical_data = theoretical_data
+        self.index_cache = index_cache
+        self.station_metrics = station_metrics
+        self._theoretical_fingerprint = None
+        self.reference_surface = reference_surface
+        self.probe_tip_radius = float(probe_tip_radius)
+
+        # 误差阈值参数
+        self.tolerance_qualified = tolerance_qualified
+        self.tolerance_attention = tolerance_attention
+        self.tolerance_over_limit = tolerance_over_limit
+
+        # 统计数据
+        self.error_history = deque(maxlen=10000)  # 误差历史记录
+        self.statistics = self._empty_statistics()
+
+        # 创建理论数据的快速查找索引（解析曲面模式无需索引）
+        self.theoretical_index = None
+        self.deviation_engine = None
+        if shared_model is not None:
+            self.theoretical_index = shared_model.theoretical_index
+            self.deviation_engine = shared_model.deviation_engine if normal_deviation else None
+            self._theoretical_fingerprint = shared_model._theoretical_fingerprint
+        elif self.reference_surface is None:
+            self.create_theoretical_lookup()
+        else:
+            logger.info(f"使用解析参考曲面: {self.reference_surface.to_dict()}")
+
+        # 法向偏差引擎（解析曲面模式下法向由闭式公式给出，无需构建）
+        if normal_deviation and self.reference_surface is None and shared_model is None:
+            self.create_deviation_engine(normal_deviation_k)
+
+        # 测头半径补偿需要曲面法向（解析曲面或法向偏差引擎）
+        if self.probe_tip_radius > 0 and self.reference_surface is None and self.deviation_engine is None:
+            logger.warning(f"未启用法向偏差引擎，没有曲面法向，测头半径 {self.probe_tip_radius} mm 的补偿不生效")
+
+        # 刚体配准：解析曲面或理论点云（需法向偏差引擎）作为配准目标
+        self.alignment_interval = alignment_interval
+        self.alignment_sample_size = alignment_sample_size
+        self.alignment_target = None
+        if alignment:
+            if self.reference_surface is not None:
+                self.alignment_target = AnalyticSurfaceTarget(self.reference_surface)
+            elif self.deviation_engine is not None:
+                self.alignment_target = PointCloudTarget(self.deviation_engine)
+            else:
+                logger.warning("未启用法向偏差引擎，无法进行点云配准")
+        self.reset_alignment()
+
+        # 形状误差：截面圈完成时增量评定圆度，并更新圆柱度
+        self.form_tracker = FormMetricsTracker(form_min_ring_points) if form_metrics else None
+
+        # 偏差展开图：界面定时整幅绘制，这里只按批写入网格
+        self.deviation_map = deviation_map
+        self.pipeline_metrics = pipeline_metrics
+
+        logger.info(f"分析引擎初始化完成，理论数据点数: {len(theoretical_data)}")
+
+    def _empty_statistics(self):
+        return {
+            'total_points': 0,
+            'max_error': 0.0,
+            'min_error': 0.0,
+            'avg_error': 0.0,
+            'std_error': 0.0,
+            'within_tolerance_count': 0,
+            'tolerance_threshold': self.tolerance_qualified
+        }
+
+    def theoretical_fingerprint(self):
+        """返回理论数据指纹（首次调用时计算），作为索引与法向缓存键的一部分"""
+        if self._theoretical_fingerprint is None:
+            self._theoretical_fingerprint = TheoreticalIndex.fingerprint(self.theoretical_data)
+        return self._theoretical_fingerprint
+
+    def create_theoretical_lookup(self, x_precision=1, angle_precision=1):
+        """
+        创建理论数据的快速查找索引
+
+        配置了索引缓存时，优先从缓存加载以数据指纹和索引参数为键的预构建索引，
+        未命中时构建索引并写入缓存
+
+        Args:
+            x_precision: int，X键的小数位数（默认精度到0.1mm）
+            angle_precision: int，角度键的小数位数（默认精度到0.1度）
+        """
+        logger.info("创建理论数据查找索引...")
+        start_time = time.perf_counter()
+
+        cache_key = None
+        self.theoretical_index = None
+
+        if self.index_cache is not None:
+            fingerprint = self.theoretical_fingerprint()
+            params = TheoreticalIndex.cache_params(x_precision, angle_precision)
+            cache_key = self.index_cache.make_key('lookup', fingerprint, params)
+
+            arrays = self.index_cache.get(cache_key)
+            if arrays is not None:
+                self.theoretical_index = TheoreticalIndex(arrays, x_precision, angle_precision)
+                logger.info("理论数据索引已从缓存加载")
+
+        if self.theoretical_index is None:
+            self.theoretical_index = TheoreticalIndex.build(
+                self.theoretical_data, x_precision, angle_precision
+            )
+            if cache_key is not None:
+                self.index_cache.put(cache_key, self.theoretical_index.to_arrays())
+
+        elapsed = time.perf_counter() - start_time
+        if self.station_metrics is not None:
+            self.station_metrics.record_index_build(elapsed)
+        elapsed_ms = elapsed * 1000
+        logger.info(f"理论数据索引创建完成，索引项数: {len(self.theoretical_index)}，耗时: {elapsed_ms:.1f} ms")
+
+    def create_deviation_engine(self, k=12):
+        """
+        创建测量点到理论曲面法向偏差的计算引擎（KD树 + 局部二次曲面拟合）
+
+        理论数据不含法向时，优先从索引缓存读取预计算法向；
+        未命中时由引擎以PCA估计，并写入缓存供下次加载使用
+        """
+        start_time = time.perf_counter()
+
+        normals = None
+        fingerprint = None
+        has_normals = all(col in self.theoretical_data.columns for col in ('nx', 'ny', 'nz'))
+        if self.index_cache is not None and not has_normals:
+            fingerprint = self.theoretical_fingerprint()
+            normals = load_cached_normals(self.index_cache, fingerprint, DEFAULT_NORMAL_K,
+                                          len(self.theoretical_data))
+            if normals is not None:
+                logger.info("理论点云法向已从缓存加载")
+
+        self.deviation_engine = NormalDeviationEngine.from_dataframe(self.theoretical_data, k, normals)
+        if fingerprint is not None and self.deviation_engine.normals_estimated:
+            store_cached_normals(self.index_cache, fingerprint, DEFAULT_NORMAL_K,
+                                 self.deviation_engine.normals)
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(f"法向偏差引擎创建完成，k={self.deviation_engine.k}，耗时: {elapsed_ms:.1f} ms")
+
+    def analyse_batch(self, measurement_data):
+        """
+        整批分析测量数据（查找、坐标转换、误差计算与等级判定），不更新统计与配准状态
+
+        Args:
+            measurement_data: pandas DataFrame，包含 sequence, x_pos_mm, angle_deg, measured_radius_mm 列
+
+        Returns:
+            dict 或 None（没有有效测量点）：lookup_measurement_batch() 的字段，
+            另含 'errors'（calculate_error_batch() 的结果）与 'levels'（误差等级 0-3）
+        """
+        batch = self.lookup_measurement_batch(measurement_data)
+        if batch is None:
+            return None
+        batch['errors'] = self.calculate_error_batch(batch['theoretical'], batch['measured_points'],
+                                                     batch['contact_radius'], batch['normals'])
+        batch['levels'] = self.tolerance_levels(batch['errors']['radius_error'])
+        return batch
+
+    def process_batch(self, measurement_data):
+        """
+        实时分析中的一批测量数据：误差计算、增量配准、截面形状误差、偏差展开图与统计更新
+
+        Args:
+            measurement_data: pandas DataFrame，包含 sequence, x_pos_mm, angle_deg, measured_radius_mm 列
+
+        Returns:
+            dict 或 None（没有有效测量点）：
+            'result'（lookup_measurement_batch() 的字段，另含含配准后误差的 'errors'），
+            'alignment'（本批触发增量配准时的配准结果，否则为 None），
+            'form_metrics'（本批完成截面评定时的形状误差，否则为 None），
+            'statistics'（更新后的统计数据）
+        """
+        batch = self.lookup_measurement_batch(measurement_data)
+        if batch is None:
+            return None
+        if self.pipeline_metrics is not None:
+            self.pipeline_metrics.mark('lookup', batch['sequence'])
+            self.pipeline_metrics.count('lookup', len(batch['sequence']))
+
+        # 计算误差
+        batch['errors'] = self.calculate_error_batch(batch['theoretical'], batch['measured_points'],
+                                                     batch['contact_radius'], batch['normals'])
+        return self.accumulate_batch(batch)
+
+    def accumulate_batch(self, batch):
+        """
+        在已算出误差的一批结果上进行增量配准、截面形状误差、偏差展开图与统计更新
+
+        分片并行分析时查找与误差计算在工作进程中完成，按序号重组后在这里按顺序累积，
+        统计与配准状态和单进程处理完全相同
+
+        Args:
+            batch: dict，lookup_measurement_batch() 的字段，另含 calculate_error_batch() 的 'errors'
+
+        Returns:
+            dict：同 process_batch()
+        """
+        sequence, x_pos, angle_deg = batch['sequence'], batch['x_pos'], batch['angle_deg']
+        measured_points = batch['measured_points']
+        errors = batch['errors']
+        metrics = self.pipeline_metrics
+
+        # 记录测量点并按间隔进行增量配准，误差同时给出原始值与配准后的值
+        alignment_info = None
+        if self.alignment_target is not None:
+            self.alignment_points.append(measured_points)
+            self.raw_radius_errors.append(errors['radius_error'])
+            self.points_since_alignment += len(measured_points)
+            if self.points_since_alignment >= self.alignment_interval:
+                alignment_info = self.update_alignment(final=False)
+        errors.update(self.calculate_aligned_errors(measured_points, errors))
+
+        # 截面圈完成时评定圆度
+        form_info = None
+        if self.form_tracker is not None:
+            form_info = self.form_metrics_info(self.form_tracker.add_points(x_pos, measured_points))
+
+        # 写入偏差展开图
+        if self.deviation_map is not None:
+            self.deviation_map.update(x_pos, angle_deg, errors['radius_error'])
+
+        # 更新统计数据
+        self.update_statistics_batch(errors['radius_error'])
+        if metrics is not None:
+            metrics.mark('error_compute', sequence)
+            metrics.count('error_compute', len(sequence))
+        if self.station_metrics is not None:
+            levels = self.tolerance_levels(errors['radius_error'])
+            self.station_metrics.record_analysed(int(sequence[-1]), len(sequence),
+                                                 np.bincount(levels, minlength=4))
+
+        return {
+            'result': batch,
+            'alignment': alignment_info,
+            'form_metrics': form_info,
+            'statistics': self.statistics.copy()
+        }
+
+    def finish(self):
+        """
+        扫描结束：使用全部测量点进行完整配准，并评定最后一个截面
+
+        Returns:
+            dict：'alignment'、'form_metrics'（未启用或无结果时为 None）
+        """
+        alignment_info = self.update_alignment(final=True) if self.alignment_target is not None else None
+        form_info = None
+        if self.form_tracker is not None:
+            form_info = self.form_metrics_info(self.form_tracker.finish(), final=True)
+        return {'alignment': alignment_info, 'form_metrics': form_info}
+
+    @staticmethod
+    def result_records(result):
+        """
+        将 process_batch() 的 'result' 逐点转为分析结果字典
+
+        Yields:
+            dict：sequence, x_pos, angle_deg, measured_radius, compensated_radius, theoretical_radius,
+            measured_point, theoretical_point, error_analysis
+        """
+        errors, theoretical = result['errors'], result['theoretical']
+        error_keys = list(errors.keys())
+        error_rows = zip(*(errors[key].tolist() for key in error_keys))
+        rows = zip(
+            result['sequence'].tolist(), result['x_pos'].tolist(), result['angle_deg'].tolist(),
+            result['measured_radius'].tolist(), result['contact_radius'].tolist(),
+            result['measured_points'].tolist(),
+            theoretical['radius_theoretical'].tolist(), theoretical['x_theoretical'].tolist(),
+            theoretical['y_theoretical'].tolist(), theoretical['z_theoretical'].tolist(),
+            error_rows
+        )
+        for (seq, x, angle, radius, compensated, point,
+             radius_theo, x_theo, y_theo, z_theo, error_values) in rows:
+            yield {
+                'sequence': seq,
+                'x_pos': x,
+                'angle_deg': angle,
+                'measured_radius': radius,
+                'compensated_radius': compensated,
+                'theoretical_radius': radius_theo,
+                'measured_point': {'x': point[0], 'y': point[1], 'z': point[2]},
+                'theoretical_point': {'x': x_theo, 'y': y_theo, 'z': z_theo},
+                'error_analysis': dict(zip(error_keys, error_values))
+            }
+
+    def lookup_measurement_batch(self, measurement_data):
+        """
+        批量查找理论数据并将测量读数转换为笛卡尔坐标（含测头半径补偿），
+        读数无效（非数值或不完整的行）或找不到理论数据的测量点被剔除
+
+        Args:
+            measurement_data: pandas DataFrame，包含 sequence, x_pos_mm, angle_deg, measured_radius_mm 列
+
+        Returns:
+            dict 或 None（没有有效测量点）：sequence, x_pos, angle_deg, measured_radius,
+            contact_radius, measured_points (N, 3), theoretical（理论点字段数组字典）, normals
+        """
+        # 提取测量数据（正在写入的行可能不完整，非数值按 NaN 处理后剔除）
+        sequence, x_pos, angle_deg, measured_radius = (
+            pd.to_numeric(measurement_data[column], errors='coerce').to_numpy(dtype=np.float64)
+            for column in ('sequence', 'x_pos_mm', 'angle_deg', 'measured_radius_mm')
+        )
+        finite = (np.isfinite(sequence) & np.isfinite(x_pos) &
+                  np.isfinite(angle_deg) & np.isfinite(measured_radius))
+        if not finite.all():
+            logger.warning("跳过 %d 个无效测量行（非数值或不完整），序号: %s",
+                           np.count_nonzero(~finite), sequence[~finite].tolist())
+            sequence, x_pos = sequence[finite], x_pos[finite]
+            angle_deg, measured_radius = angle_deg[finite], measured_radius[finite]
+            if len(sequence) == 0:
+                return None
+        sequence = sequence.astype(np.int64)
+
+        compensate = self.probe_tip_radius > 0
+
+        # 查找对应的理论数据
+        theoretical, valid, normals = self.find_theoretical_batch(x_pos, angle_deg, compensate)
+        if not valid.all():
+            self._warn_missing_theoretical(sequence, x_pos, angle_deg, valid)
+            sequence, x_pos = sequence[valid], x_pos[valid]
+            angle_deg, measured_radius = angle_deg[valid], measured_radius[valid]
+            if normals is not None:
+                normals = normals[valid]
+
+        if len(sequence) == 0:
+            return None
+
+        # 执行正向计算：硬件读数 → 笛卡尔坐标（含测头半径补偿）
+        measured_points = self.convert_to_cartesian_batch(x_pos, angle_deg, measured_radius, normals)
+        contact_radius = np.hypot(measured_points[:, 1], measured_points[:, 2])
+
+        if compensate and normals is not None:
+            if not valid.all():
+                theoretical = {key: value[valid] for key, value in theoretical.items()}
+            ray_theoretical, ray_normals = theoretical, normals
+
+            # 补偿后接触点偏离测量射线，按接触点位置重新查找理论数据
+            contact_angle = np.degrees(np.arctan2(measured_points[:, 2], measured_points[:, 1]))
+            theoretical, valid, normals = self.find_theoretical_batch(
+                measured_points[:, 0], contact_angle
+            )
+            if not valid.all():
+                # 接触点落在模型范围之外（如半圆柱 180° 边缘的法向略有偏转，接触角回绕到 -180°）时，
+                # 沿用测量射线上的理论点
+                theoretical = {key: np.where(valid, value, ray_theoretical[key])
+                               for key, value in theoretical.items()}
+                if normals is not None:
+                    normals = np.where(valid[:, np.newaxis], normals, ray_normals)
+                valid = np.ones(len(sequence), dtype=bool)
+
+        if not valid.all():
+            theoretical = {key: value[valid] for key, value in theoretical.items()}
+
+        return {
+            'sequence': sequence,
+            'x_pos': x_pos,
+            'angle_deg': angle_deg,
+            'measured_radius': measured_radius,
+            'contact_radius': contact_radius,
+            'measured_points': measured_points,
+            'theoretical': theoretical,
+            'normals': normals
+        }
+
+    def _warn_missing_theoretical(self, sequence, x_pos, angle_deg, valid):
+        """逐个提示找不到理论数据的测量点"""
+        for i in np.flatnonzero(~valid):
+            logger.warning("找不到序号 %s 对应的理论数据 (X=%s, Angle=%s)", sequence[i], x_pos[i], angle_deg[i])
+
+    def find_theoretical_batch(self, x_pos, angle_deg, with_normals=False):
+        """
+        批量查找理论点数据
+
+        Args:
+            x_pos: numpy数组，X位置
+            angle_deg: numpy数组，角度(度)
+            with_normals: bool，点云模式下是否查询理论点处的法向（解析曲面模式总是返回法向）
+
+        Returns:
+            (theoretical, valid, normals)：理论点字段数组字典、有效掩码，
+            以及理论点处的单位外法向 (N, 3)（无法向信息时为None）
+        """
+        # 解析曲面模式：按闭式公式整批计算半径与法向
+        if self.reference_surface is not None:
+            radius, normals, valid = self.reference_surface.evaluate(x_pos, angle_deg)
+            angle_rad = np.radians(angle_deg)
+            theoretical = {
+                'x_theoretical': np.asarray(x_pos, dtype=np.float64),
+                'y_theoretical': radius * np.cos(angle_rad),
+                'z_theoretical': radius * np.sin(angle_rad),
+                'radius_theoretical': radius,
+                'angle_theoretical': np.asarray(angle_deg, dtype=np.float64)
+            }
+            return theoretical, valid, normals
+
+        theoretical, valid = self.theoretical_index.find_batch(x_pos, angle_deg)
+
+        # 取最近理论点的（预计算）法向
+        normals = None
+        if with_normals and self.deviation_engine is not None:
+            normals = self.deviation_engine.nearest_normals(np.column_stack([
+                theoretical['x_theoretical'], theoretical['y_theoretical'], theoretical['z_theoretical']
+            ]))
+        return theoretical, valid, normals
+
+    def find_theoretical_point(self, x_pos, angle_deg):
+        """查找对应的理论点数据"""
+        # 解析曲面模式：按闭式公式直接计算
+        if self.reference_surface is not None:
+            return self.reference_surface.theoretical_point(x_pos, angle_deg)
+
+        # 规则网格点云直接寻址并双线性插值；否则使用键查找，失败时在容差范围内进行邻近搜索
+        return self.theoretical_index.find(x_pos, angle_deg)
+
+    def convert_to_cartesian(self, x_pos, angle_deg, measured_radius):
+        """
+        将硬件测量数据转换为笛卡尔坐标
+
+        硬件坐标系统：
+        - x_pos: X轴位置（沿工件长度方向）
+        - angle_deg: 旋转角度（千分表相对于Y轴的角度）
+        - measured_radius: 千分表测得的半径距离
+
+        转换到笛卡尔坐标系：
+        - X = x_pos (直接对应)
+        - Y = measured_radius * cos(angle) (径向在Y方向的分量)
+        - Z = measured_radius * sin(angle) (径向在Z方向的分量)
+
+        Args:
+            x_pos: float，X位置
+            angle_deg: float，角度(度)
+            measured_radius: float，测量半径
+
+        Returns:
+            dict，笛卡尔坐标 {'x', 'y', 'z'}
+        """
+        # 角度转换为弧度
+        angle_rad = math.radians(angle_deg)
+
+        # 坐标转换
+        x_measured = x_pos  # X坐标直接对应
+        y_measured = measured_radius * math.cos(angle_rad)  # Y分量
+        z_measured = measured_radius * math.sin(angle_rad)  # Z分量
+
+        return {
+            'x': x_measured,
+            'y': y_measured,
+            'z': z_measured
+        }
+
+    def convert_to_cartesian_batch(self, x_pos, angle_deg, measured_radius, normals=None):
+        """
+        批量将硬件测量数据转换为笛卡尔坐标，并沿曲面法向补偿测头半径
+
+        千分表读数按法向入射标定，对应测头球心沿径向的位置减去测头半径；
+        曲面法向与径向不一致时，实际接触点为球心沿法向回退一个测头半径：
+            球心 = (x, (r + ρ)·cosθ, (r + ρ)·sinθ)
+            接触点 = 球心 - ρ·n
+        法向与径向一致（如圆柱面）时补偿量为零
+
+        Args:
+            x_pos: numpy数组，X位置
+            angle_deg: numpy数组，角度(度)
+            measured_radius: numpy数组，测量半径
+            normals: numpy数组 (N, 3)，理论点处的单位外法向（可选，缺省时不补偿）
+
+        Returns:
+            numpy数组 (N, 3)，测量点（接触点）笛卡尔坐标
+        """
+        angle_rad = np.radians(angle_deg)
+        cos_angle = np.cos(angle_rad)
+        sin_angle = np.sin(angle_rad)
+
+        tip_radius = self.probe_tip_radius if normals is not None else 0.0
+        centre_radius = measured_radius + tip_radius
+        points = np.column_stack([x_pos, centre_radius * cos_angle, centre_radius * sin_angle])
+        if tip_radius > 0:
+            points -= tip_radius * normals
+        return points
+
+    def calculate_error(self, theoretical_data, measured_point, measured_radius):
+        """
+        计算各种误差指标
+
+        Args:
+            theoretical_data: dict，理论数据
+            measured_point: dict，测量点笛卡尔坐标
+            measured_radius: float，测量半径
+
+        Returns:
+            dict，误差分析结果
+        """
+        # 1. 半径误差
+        radius_error = measured_radius - theoretical_data['radius_theoretical']
+
+        # 2. 笛卡尔坐标误差
+        x_error = measured_point['x'] - theoretical_data['x_theoretical']
+        y_error = measured_point['y'] - theoretical_data['y_theoretical']
+        z_error = measured_point['z'] - theoretical_data['z_theoretical']
+
+        # 3. 欧氏距离误差（总体误差）
+        euclidean_error = math.sqrt(x_error**2 + y_error**2 + z_error**2)
+
+        # 4. 径向误差（在半径方向的投影）
+        radial_error = radius_error  # 在半径测量中，径向误差等于半径误差
+
+        # 5. 法向误差与切向误差（垂直于曲面法向的分量）
+        normal_result = self.calculate_normal_error(
+            theoretical_data, measured_point, (x_error, y_error, z_error)
+        )
+        if normal_result is not None:
+            normal_error, tangential_error = normal_result
+        else:
+            # 无法向信息时简化处理，使用总误差减去径向误差的估算
+            normal_error = radial_error
+            tangential_error = math.sqrt(max(0, euclidean_error**2 - radial_error**2))
+
+        # 6. 误差状态判定 - 使用动态阈值
+        abs_radius_error = abs(radius_error)
+        if abs_radius_error <= self.tolerance_qualified:
+            status = "合格"
+            status_color = "green"
+        elif abs_radius_error <= self.tolerance_attention:
+            status = "注意"
+            status_color = "orange"
+        elif abs_radius_error <= self.tolerance_over_limit:
+            status = "超差!"
+            status_color = "red"
+        else:
+            status = "严重超差!"
+            status_color = "darkred"
+
+        return {
+            'radius_error': radius_error,
+            'x_error': x_error,
+            'y_error': y_error,
+            'z_error': z_error,
+            'euclidean_error': euclidean_error,
+            'radial_error': radial_error,
+            'tangential_error': tangential_error,
+            'normal_error': normal_error,
+            'status': status,
+            'status_color': status_color
+        }
+
+    def calculate_normal_error(self, theoretical_data, measured_point, error_vector):
+        """
+        计算有符号法向误差与切向误差
+
+        点云模式下使用法向偏差引擎求测量点到理论曲面的真实法向距离；
+        解析曲面模式下使用理论点的闭式法向
+
+        Args:
+            theoretical_data: dict，理论数据
+            measured_point: dict，测量点笛卡尔坐标
+            error_vector: tuple，测量点相对理论点的 (x, y, z) 误差
+
+        Returns:
+            (normal_error, tangential_error) 或 None（无法向信息）
+        """
+        error_vector = np.asarray(error_vector, dtype=np.float64)
+
+        if self.deviation_engine is not None:
+            result = self.deviation_engine.query(
+                [[measured_point['x'], measured_point['y'], measured_point['z']]]
+            )
+            normal_error = float(result['normal_deviation'][0])
+            normal = result['normals'][0]
+        elif 'normal_theoretical' in theoretical_data:
+            normal = np.asarray(theoretical_data['normal_theoretical'], dtype=np.float64)
+            normal_error = float(error_vector @ normal)
+        else:
+            return None
+
+        tangential = error_vector - (error_vector @ normal) * normal
+        return normal_error, float(np.linalg.norm(tangential))
+
+    def tolerance_levels(self, radius_error):
+        """
+        按阈值区间判定误差等级：(0, 合格] (合格, 注意] (注意, 超差] (超差, ∞)
+
+        Args:
+            radius_error: numpy数组，半径误差
+
+        Returns:
+            numpy数组，等级 0-3（合格、注意、超差、严重超差）
+        """
+        return np.searchsorted(
+            [self.tolerance_qualified, self.tolerance_attention, self.tolerance_over_limit],
+            np.abs(radius_error), side='left'
+        )
+
+    def calculate_error_batch(self, theoretical, measured_points, measured_radius, normals=None):
+        """
+        批量计算各种误差指标，字段与 calculate_error() 一致
+
+        Args:
+            theoretical: dict，理论点字段数组
+            measured_points: numpy数组 (N, 3)，测量点笛卡尔坐标
+            measured_radius: numpy数组，测量点半径
+            normals: numpy数组 (N, 3)，理论点处的单位外法向（可选）
+
+        Returns:
+            dict，字段名 -> 数组
+        """
+        # 1. 半径误差
+        radius_error = measured_radius - theoretical['radius_theoretical']
+
+        # 2. 笛卡尔坐标误差
+        error_vectors = measured_points - np.column_stack([
+            theoretical['x_theoretical'], theoretical['y_theoretical'], theoretical['z_theoretical']
+        ])
+
+        # 3. 欧氏距离误差（总体误差）
+        euclidean_error = np.linalg.norm(error_vectors, axis=1)
+
+        # 4. 法向误差与切向误差
+        if self.deviation_engine is not None:
+            result = self.deviation_engine.query(measured_points)
+            normal_error = result['normal_deviation']
+            normals = result['normals']
+        elif normals is not None:
+            normal_error = np.einsum('ij,ij->i', error_vectors, normals)
+        else:
+            normal_error = radius_error
+
+        if normals is not None:
+            projection = np.einsum('ij,ij->i', error_vectors, normals)
+            tangential_error = np.linalg.norm(error_vectors - projection[:, np.newaxis] * normals, axis=1)
+        else:
+            # 无法向信息时简化处理，使用总误差减去径向误差的估算
+            tangential_error = np.sqrt(np.maximum(0, euclidean_error**2 - radius_error**2))
+
+        # 5. 误差状态判定 - 阈值区间：(0, 合格] (合格, 注意] (注意, 超差] (超差, ∞)
+        levels = self.tolerance_levels(radius_error)
+        status = np.array(["合格", "注意", "超差!", "严重超差!"], dtype=object)[levels]
+        status_color = np.array(["green", "orange", "red", "darkred"], dtype=object)[levels]
+
+        return {
+            'radius_error': radius_error,
+            'x_error': error_vectors[:, 0],
+            'y_error': error_vectors[:, 1],
+            'z_error': error_vectors[:, 2],
+            'euclidean_error': euclidean_error,
+            'radial_error': radius_error,
+            'tangential_error': tangential_error,
+            'normal_error': normal_error,
+            'status': status,
+            'status_color': status_color
+        }
+
+    def reset_alignment(self):
+        """清空配准状态与累计的测量点"""
+        self.alignment_rotation = np.eye(3)
+        self.alignment_translation = np.zeros(3)
+        self.alignment_result = None
+        self.alignment_points = []
+        self.raw_radius_errors = []
+        self.points_since_alignment = 0
+
+    def calculate_aligned_errors(self, measured_points, errors):
+        """
+        按当前配准变换计算配准后的半径误差与法向误差
+
+        Args:
+            measured_points: numpy数组 (N, 3)，测量点
+            errors: dict，calculate_error_batch() 的原始误差
+
+        Returns:
+            dict：'aligned_radius_error', 'aligned_normal_error'（找不到理论数据时为NaN）
+        """
+        if self.alignment_result is None:
+            return {
+                'aligned_radius_error': errors['radius_error'].copy(),
+                'aligned_normal_error': errors['normal_error'].copy()
+            }
+
+        aligned = apply_transform(measured_points, self.alignment_rotation, self.alignment_translation)
+        aligned_radius = np.hypot(aligned[:, 1], aligned[:, 2])
+        aligned_angle = np.degrees(np.arctan2(aligned[:, 2], aligned[:, 1]))
+        theoretical, valid, normals = self.find_theoretical_batch(aligned[:, 0], aligned_angle)
+
+        radius_error = np.where(valid, aligned_radius - theoretical['radius_theoretical'], np.nan)
+        if self.deviation_engine is not None:
+            normal_error = self.deviation_engine.query(aligned)['normal_deviation']
+        elif normals is not None:
+            error_vectors = aligned - np.column_stack([
+                theoretical['x_theoretical'], theoretical['y_theoretical'], theoretical['z_theoretical']
+            ])
+            normal_error = np.where(valid, np.einsum('ij,ij->i', error_vectors, normals), np.nan)
+        else:
+            normal_error = radius_error.copy()
+
+        return {'aligned_radius_error': radius_error, 'aligned_normal_error': normal_error}
+
+    def update_alignment(self, final=False):
+        """
+        估计测量点到理论模型的刚体变换
+
+        扫描过程中对累计测量点均匀子采样，并以上一次结果为初值增量更新；
+        扫描结束后使用全部测量点，并统计配准前后的半径误差
+
+        Args:
+            final: bool，是否为扫描结束后的完整配准
+
+        Returns:
+            dict，配准结果（点数不足或计算出错时为 None）
+        """
+        self.points_since_alignment = 0
+        if not self.alignment_points:
+            return None
+
+        points = np.concatenate(self.alignment_points)
+        self.alignment_points = [points]
+        if len(points) < 6:
+            return None
+
+        if final or len(points) <= self.alignment_sample_size:
+            sample = points
+        else:
+            # 按扫描顺序等间隔子采样，覆盖已扫描的全部区域
+            sample = points[np.linspace(0, len(points) - 1, self.alignment_sample_size).astype(np.int64)]
+
+        try:
+            start_time = time.perf_counter()
+            result = point_to_plane_icp(sample, self.alignment_target,
+                                        self.alignment_rotation, self.alignment_translation)
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+        except Exception as e:
+            logger.error(f"配准计算出错: {e}")
+            return None
+
+        self.alignment_rotation = result['rotation']
+        self.alignment_translation = result['translation']
+        self.alignment_result = result
+
+        alignment_info = {
+            'final': final,
+            'point_count': len(sample),
+            'rotation': result['rotation'].tolist(),
+            'translation': result['translation'].tolist(),
+            'rotation_deg': rotation_angles_deg(result['rotation']),
+            'initial_rms': result['initial_rms'],
+            'rms': result['rms'],
+            'iterations': result['iterations'],
+            'converged': result['converged'],
+            'elapsed_ms': elapsed_ms
+        }
+
+        if final:
+            raw_errors = np.concatenate(self.raw_radius_errors)
+            self.raw_radius_errors = [raw_errors]
+            aligned_errors = self.calculate_aligned_errors(
+                points, {'radius_error': raw_errors, 'normal_error': raw_errors}
+            )['aligned_radius_error']
+            alignment_info['raw_statistics'] = self._error_summary(raw_errors)
+            alignment_info['aligned_statistics'] = self._error_summary(aligned_errors)
+
+        logger.info(f"配准{'完成' if final else '更新'}: 点数={len(sample)}，RMS {result['initial_rms']:.4f} → "
+                    f"{result['rms']:.4f} mm，迭代 {result['iterations']} 次，耗时 {elapsed_ms:.1f} ms")
+        return alignment_info
+
+    def form_metrics_info(self, sections, final=False):
+        """
+        汇总形状误差更新
+
+        Args:
+            sections: list of dict，新完成评定的截面
+            final: bool，是否为扫描结束后的最终结果
+
+        Returns:
+            dict 或 None（扫描中没有新完成的截面）
+        """
+        if not sections and not final:
+            return None
+
+        form_metrics = {
+            'final': final,
+            'sections': sections,
+            'summary': self.form_tracker.summary(),
+            'cylindricity': self.form_tracker.cylindricity()
+        }
+        for section in sections:
+            logger.info(f"截面 X={section['x']:.1f} 圆度: 最小二乘 {section['roundness_ls']:.4f} mm，"
+                        f"最小区域 {section['roundness_mz']:.4f} mm")
+        return form_metrics
+
+    def _error_summary(self, errors):
+        """误差数组的汇总统计（忽略NaN）"""
+        errors = errors[np.isfinite(errors)]
+        if len(errors) == 0:
+            return {'count': 0, 'max_error': 0.0, 'min_error': 0.0, 'avg_error': 0.0,
+                    'std_error': 0.0, 'within_tolerance_count': 0}
+        return {
+            'count': int(len(errors)),
+            'max_error': float(errors.max()),
+            'min_error': float(errors.min()),
+            'avg_error': float(errors.mean()),
+            'std_error': float(errors.std()),
+            'within_tolerance_count': int(np.count_nonzero(np.abs(errors) <= self.tolerance_qualified))
+        }
+
+    def update_statistics(self, error_analysis):
+        """更新统计数据"""
+        self.update_statistics_batch(np.array([error_analysis['radius_error']]))
+
+    def update_statistics_batch(self, radius_errors):
+        """
+        按一批半径误差更新统计数据
+
+        Args:
+            radius_errors: numpy数组，半径误差
+        """
+        if len(radius_errors) == 0:
+            return
+
+        self.error_history.extend(radius_errors.tolist())
+
+        # 更新计数
+        first_batch = self.statistics['total_points'] == 0
+        self.statistics['total_points'] += len(radius_errors)
+
+        # 检查容差范围 - 使用合格阈值
+        self.statistics['within_tolerance_count'] += int(
+            np.count_nonzero(np.abs(radius_errors) <= self.tolerance_qualified)
+        )
+
+        # 更新极值
+        batch_max = float(radius_errors.max())
+        batch_min = float(radius_errors.min())
+        if first_batch:
+            self.statistics['max_error'] = batch_max
+            self.statistics['min_error'] = batch_min
+        else:
+            self.statistics['max_error'] = max(self.statistics['max_error'], batch_max)
+            self.statistics['min_error'] = min(self.statistics['min_error'], batch_min)
+
+        # 更新平均值和标准差
+        errors_array = np.array(self.error_history)
+        self.statistics['avg_error'] = np.mean(errors_array)
+        self.statistics['std_error'] = np.std(errors_array)
+
+    def get_current_statistics(self):
+        """获取当前统计数据"""
+        return self.statistics.copy()
+
+    def reset_statistics(self):
+        """重置统计数据、配准与形状误差状态"""
+        self.statistics = self._empty_statistics()
+        self.error_history.clear()
+        self.reset_alignment()
+        if self.form_tracker is not None:
+            self.form_tracker.reset()
+        if self.deviation_map is not None:
+            self.deviation_map.clear()
+        logger.info("统计数据已重置")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析参考曲面模块 - 以闭式公式描述的理论曲面
+
+对圆柱、圆锥、圆环段等绕X轴的回转曲面，直接按参数方程计算理论半径与法向，
+无需点云查找，内存占用与采样密度无关
+"""
+
+import json
+import math
+import numpy as np
+import pandas as pd
+
+
+class AnalyticSurface:
+    """
+    绕X轴回转的解析曲面基类
+
+    曲面由母线 r = f(x) 绕X轴旋转得到，角度定义与硬件一致：
+    y = r·cos(angle)，z = r·sin(angle)
+    """
+
+    surface_type = None
+
+    # 定义域外的查找容差
+    TOLERANCE_X = 0.5  # X方向容差(mm)
+    TOLERANCE_ANGLE = 1.0  # 角度容差(度)
+
+    def __init__(self, x_start, x_end, angle_start=0.0, angle_end=180.0):
+        """
+        Args:
+            x_start: float，X起点(mm)
+            x_end: float，X终点(mm)
+            angle_start: float，角度起点(度)
+            angle_end: float，角度终点(度)
+        """
+        if x_end <= x_start:
+            raise ValueError("曲面X终点必须大于起点")
+        if angle_end <= angle_start:
+            raise ValueError("曲面角度终点必须大于起点")
+
+        self.x_start = float(x_start)
+        self.x_end = float(x_end)
+        self.angle_start = float(angle_start)
+        self.angle_end = float(angle_end)
+
+    def profile(self, x):
+        """
+        计算母线半径及其斜率
+
+        Args:
+            x: numpy数组，X位置
+
+        Returns:
+            (radius, slope)：半径 r(x) 与 dr/dx
+        """
+        raise NotImplementedError
+
+    def parameters(self):
+        """返回曲面形状参数（不含定义域）"""
+        raise NotImplementedError
+
+    def to_dict(self):
+        """导出曲面定义"""
+        definition = {'type': self.surface_type}
+        definition.update(self.parameters())
+        definition.update({
+            'x_start': self.x_start,
+            'x_end': self.x_end,
+            'angle_start': self.angle_start,
+            'angle_end': self.angle_end,
+        })
+        return definition
+
+    def contains(self, x_pos, angle_deg):
+        """
+        判断位置是否在曲面定义域（含容差）内
+
+        Args:
+            x_pos: numpy数组，X位置
+            angle_deg: numpy数组，角度(度)
+
+        Returns:
+            numpy布尔数组
+        """
+        x_pos = np.asarray(x_pos, dtype=np.float64)
+        # 将角度折算到 [angle_start - 容差, angle_start - 容差 + 360) 区间后比较
+        offset = self.angle_start - self.TOLERANCE_ANGLE
+        angle = np.mod(np.asarray(angle_deg, dtype=np.float64) - offset, 360.0) + offset
+        return ((x_pos >= self.x_start - self.TOLERANCE_X) &
+                (x_pos <= self.x_end + self.TOLERANCE_X) &
+                (angle <= self.angle_end + self.TOLERANCE_ANGLE))
+
+    def evaluate(self, x_pos, angle_deg):
+        """
+        批量计算理论半径与单位外法向
+
+        Args:
+            x_pos: numpy数组，X位置
+            angle_deg: numpy数组，角度(度)
+
+        Returns:
+            (radius, normals, valid)：半径数组、(N, 3)法向数组、定义域掩码
+        """
+        x_pos = np.asarray(x_pos, dtype=np.float64)
+        angle_rad = np.radians(np.asarray(angle_deg, dtype=np.float64))
+
+        valid = self.contains(x_pos, angle_deg)
+        x_clamped = np.clip(x_pos, self.x_start, self.x_end)
+        radius, slope = self.profile(x_clamped)
+
+        # 回转曲面法向：(-dr/dx, cosθ, sinθ) 归一化
+        scale = 1.0 / np.sqrt(1.0 + slope**2)
+        normals = np.column_stack([
+            -slope * scale,
+            np.cos(angle_rad) * scale,
+            np.sin(angle_rad) * scale,
+        ])
+        return radius, normals, valid
+
+    def theoretical_point(self, x_pos, angle_deg):
+        """
+        计算单个测量位置对应的理论点
+
+        Args:
+            x_pos: float，X位置
+            angle_deg: float，角度(度)
+
+        Returns:
+            dict 或 None，字段与点云索引查找结果一致，另含 'normal_theoretical'
+        """
+        radius, normals, valid = self.evaluate([x_pos], [angle_deg])
+        if not valid[0]:
+            return None
+
+        radius = float(radius[0])
+        angle_rad = math.radians(angle_deg)
+        return {
+            'x_theoretical': float(x_pos),
+            'y_theoretical': radius * math.cos(angle_rad),
+            'z_theoretical': radius * math.sin(angle_rad),
+            'radius_theoretical': radius,
+            'angle_theoretical': float(angle_deg),
+            'normal_theoretical': tuple(normals[0].tolist())
+        }
+
+    def sample_points(self, x_step, angle_step):
+        """
+        按规则(x, θ)网格采样曲面
+
+        Args:
+            x_step: float，X采样间隔(mm)
+            angle_step: float，角度采样间隔(度)
+
+        Returns:
+            numpy数组 (N, 3)，点按X站位优先、角度次之排列
+        """
+        x_count = int(round((self.x_end - self.x_start) / x_step)) + 1
+        angle_count = int(round((self.angle_end - self.angle_start) / angle_step)) + 1
+        x_values = np.linspace(self.x_start, self.x_end, x_count)
+        angle_rad = np.radians(np.linspace(self.angle_start, self.angle_end, angle_count))
+
+        radius, _ = self.profile(x_values)
+        points = np.empty((x_count, angle_count, 3), dtype=np.float64)
+        points[:, :, 0] = x_values[:, np.newaxis]
+        np.multiply.outer(radius, np.cos(angle_rad), out=points[:, :, 1])
+        np.multiply.outer(radius, np.sin(angle_rad), out=points[:, :, 2])
+        return points.reshape(-1, 3)
+
+    def sample(self, x_step, angle_step):
+        """
+        按规则(x, θ)网格采样曲面，生成理论点云
+
+        Args:
+            x_step: float，X采样间隔(mm)
+            angle_step: float，角度采样间隔(度)
+
+        Returns:
+            Pandas DataFrame，包含 x_mm, y_mm, z_mm 列
+        """
+        return pd.DataFrame(self.sample_points(x_step, angle_step), columns=['x_mm', 'y_mm', 'z_mm'])
+
+
+class CylinderSurface(AnalyticSurface):
+    """圆柱面：r(x) = R"""
+
+    surface_type = 'cylinder'
+
+    def __init__(self, radius, x_start=0.0, x_end=2000.0, angle_start=0.0, angle_end=180.0):
+        super().__init__(x_start, x_end, angle_start, angle_end)
+        if radius <= 0:
+            raise ValueError("圆柱半径必须大于0")
+        self.radius = float(radius)
+
+    def profile(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        return np.full(x.shape, self.radius), np.zeros(x.shape)
+
+    def parameters(self):
+        return {'radius': self.radius}
+
+
+class ConeSurface(AnalyticSurface):
+    """圆锥面：半径从 x_start 处的 radius_start 线性变化到 x_end 处的 radius_end"""
+
+    surface_type = 'cone'
+
+    def __init__(self, radius_start, radius_end, x_start=0.0, x_end=2000.0,
+                 angle_start=0.0, angle_end=180.0):
+        super().__init__(x_start, x_end, angle_start, angle_end)
+        if radius_start < 0 or radius_end < 0 or max(radius_start, radius_end) <= 0:
+            raise ValueError("圆锥端面半径必须非负且不同时为0")
+        self.radius_start = float(radius_start)
+        self.radius_end = float(radius_end)
+        self.slope = (self.radius_end - self.radius_start) / (self.x_end - self.x_start)
+
+    def profile(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        radius = self.radius_start + self.slope * (x - self.x_start)
+        return radius, np.full(x.shape, self.slope)
+
+    def parameters(self):
+        return {'radius_start': self.radius_start, 'radius_end': self.radius_end}
+
+
+class TorusSurface(AnalyticSurface):
+    """
+    圆环段（鼓形）曲面：母线为圆心位于 (center_x, major_radius)、半径为 minor_radius 的圆弧外侧
+
+    r(x) = major_radius + sqrt(minor_radius² - (x - center_x)²)
+    """
+
+    surface_type = 'torus'
+
+    def __init__(self, major_radius, minor_radius, center_x=0.0, x_start=None, x_end=None,
+                 angle_start=0.0, angle_end=180.0):
+        if minor_radius <= 0:
+            raise ValueError("圆环截面半径必须大于0")
+        if major_radius + minor_radius <= 0:
+            raise ValueError("圆环外侧半径必须大于0")
+        if x_start is None:
+            x_start = center_x - minor_radius
+        if x_end is None:
+            x_end = center_x + minor_radius
+        if x_start < center_x - minor_radius or x_end > center_x + minor_radius:
+            raise ValueError("圆环段X范围超出截面圆")
+        super().__init__(x_start, x_end, angle_start, angle_end)
+
+        self.major_radius = float(major_radius)
+        self.minor_radius = float(minor_radius)
+        self.center_x = float(center_x)
+
+    def profile(self, x):
+        dx = np.asarray(x, dtype=np.float64) - self.center_x
+        root = np.sqrt(np.maximum(self.minor_radius**2 - dx**2, 0.0))
+        # 截面圆两端斜率趋于无穷，限制分母避免除零
+        slope = -dx / np.maximum(root, 1e-9)
+        return self.major_radius + root, slope
+
+    def parameters(self):
+        return {
+            'major_radius': self.major_radius,
+            'minor_radius': self.minor_radius,
+            'center_x': self.center_x,
+        }
+
+
+SURFACE_TYPES = {
+    CylinderSurface.surface_type: CylinderSurface,
+    ConeSurface.surface_type: ConeSurface,
+    TorusSurface.surface_type: TorusSurface,
+}
+
+
+def create_surface(definition):
+    """
+    根据曲面定义创建解析曲面
+
+    Args:
+        definition: dict，如 {'type': 'cylinder', 'radius': 500.0, 'x_start': 0, 'x_end': 2000}
+
+    Returns:
+        AnalyticSurface
+    """
+    params = dict(definition)
+    surface_type = params.pop('type', None)
+    if surface_type not in SURFACE_TYPES:
+        raise ValueError(f"不支持的曲面类型: {surface_type}，可选: {', '.join(SURFACE_TYPES)}")
+    try:
+        return SURFACE_TYPES[surface_type](**params)
+    except TypeError as e:
+        raise ValueError(f"曲面参数错误 ({surface_type}): {e}")
+
+
+def load_surface_definition(file_path):
+    """
+    从JSON文件加载解析曲面定义
+
+    Args:
+        file_path: str，JSON文件路径
+
+    Returns:
+        AnalyticSurface
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        definition = json.load(f)
+    return create_surface(definition)
@@ -4,9 +4,40 @@
 模具曲面精度分析系统 - 启动入口
 
 使用 PySide6 创建的桌面应用程序
+
+启动耗时分析：
+    python app.py --profile-startup               # 打印各模块导入耗时与首帧时间后退出
+    python app.py --profile-startup=startup.json  # 同时写入JSON报告
 """
 
-from main_window import main
+import sys
+
+
+def parse_profile_option(argv):
+    """
+    解析并移除 --profile-startup 参数
+
+    Returns:
+        (enabled, output_path)
+    """
+    for arg in list(argv[1:]):
+        if arg == '--profile-startup' or arg.startswith('--profile-startup='):
+            argv.remove(arg)
+            _, _, output_path = arg.partition('=')
+            return True, output_path or None
+    return False, None
+
 
 if __name__ == "__main__":
-    main()
+    enabled, output_path = parse_profile_option(sys.argv)
+    profiler = None
+    if enabled:
+        # 必须在导入应用模块之前安装，才能记录其导入耗时
+        from startup import StartupProfiler
+        profiler = StartupProfiler(output_path)
+        profiler.install()
+
+    from main_window import main
+    if profiler is not None:
+        profiler.mark('模块导入完成')
+    main(profiler)
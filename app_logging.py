@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志模块 - 分级、按类别限流的日志与内存环形缓冲区
+
+基于标准库 logging，每个类别一个 logger（'mold.<类别>'）：
+- 热路径使用 %-格式参数，如 logger.debug("测量点 %s", seq)：级别关闭时只有一次级别判断，
+  不做字符串格式化，也不写 stdout
+- 控制台输出按类别令牌桶限流，被抑制的条数在恢复输出时附在下一条日志后
+- 环形缓冲区保存最近的日志记录（不格式化），供日志查看器按级别/类别筛选
+"""
+
+import sys
+import time
+import logging
+import threading
+from collections import deque
+
+from config import AppConfig
+
+
+# 所有类别 logger 的根名称
+LOGGER_ROOT = 'mold'
+
+# 日志格式
+LOG_FORMAT = '%(asctime)s %(levelname)-7s [%(category)s] %(message)s'
+
+_ring_buffer = None
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def get_logger(category):
+    """
+    获取类别 logger（首次调用时按 AppConfig 完成日志配置）
+
+    Args:
+        category: str，类别名，如 'measurement'、'analysis'
+
+    Returns:
+        logging.Logger
+    """
+    if not _configured:
+        setup_logging()
+    return logging.getLogger(f'{LOGGER_ROOT}.{category}')
+
+
+def _category(record):
+    """记录所属类别（logger 名去掉根前缀）"""
+    return record.name[len(LOGGER_ROOT) + 1:] if record.name.startswith(LOGGER_ROOT + '.') else record.name
+
+
+class CategoryRateLimitFilter(logging.Filter):
+    """按类别令牌桶限流：每类别每秒最多 rate 条，可短时突发 rate 条"""
+
+    def __init__(self, rates, default_rate):
+        """
+        Args:
+            rates: dict，类别 -> 每秒条数（0或None表示不限流）
+            default_rate: float，未配置类别的每秒条数
+        """
+        super().__init__()
+        self.rates = dict(rates)
+        self.default_rate = default_rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        category = _category(record)
+        rate = self.rates.get(category, self.default_rate)
+        record.category = category
+        if not rate:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, suppressed = self._buckets.get(category, (rate, now, 0))
+            tokens = min(rate, tokens + (now - updated) * rate)
+            if tokens < 1.0:
+                self._buckets[category] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[category] = (tokens - 1.0, now, 0)
+
+        record.suppressed = suppressed
+        return True
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """控制台格式：附加类别与被限流抑制的条数"""
+
+    def format(self, record):
+        if not hasattr(record, 'category'):
+            record.category = _category(record)
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            text += f'（此前已抑制 {suppressed} 条）'
+        return text
+
+
+class RingBufferHandler(logging.Handler):
+    """保存最近 capacity 条日志记录，读取时才格式化"""
+
+    def __init__(self, capacity):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.total = 0
+
+    def emit(self, record):
+        # deque.append 是原子操作，无需加锁
+        self.records.append(record)
+        self.total += 1
+
+    def snapshot(self, level=logging.NOTSET, category=None, limit=None):
+        """
+        读取缓冲区中的日志
+
+        Args:
+            level: int，最低级别
+            category: str，类别筛选（可选）
+            limit: int，最多返回最近的条数（可选）
+
+        Returns:
+            list of dict: 'time', 'level', 'category', 'message'
+        """
+        entries = []
+        for record in list(self.records):
+            if record.levelno < level:
+                continue
+            record_category = _category(record)
+            if category and record_category != category:
+                continue
+            entries.append({
+                'time': record.created,
+                'level': record.levelname,
+                'category': record_category,
+                'message': record.getMessage(),
+            })
+        return entries[-limit:] if limit else entries
+
+    def categories(self):
+        """缓冲区中出现过的类别"""
+        return sorted({_category(record) for record in list(self.records)})
+
+    def clear(self):
+        self.records.clear()
+
+
+def setup_logging(level=None, category_levels=None, ring_buffer_size=None,
+                  rate_limits=None, default_rate_limit=None, stream=None):
+    """
+    配置日志（重复调用时替换已有配置）。参数缺省时取 AppConfig 中的配置
+
+    Args:
+        level: str 或 int，全局级别
+        category_levels: dict，类别 -> 级别，覆盖全局级别
+        ring_buffer_size: int，环形缓冲区容量
+        rate_limits: dict，类别 -> 控制台每秒最多条数
+        default_rate_limit: float，未配置类别的控制台每秒最多条数
+        stream: 控制台输出流（缺省为 sys.stdout）
+
+    Returns:
+        RingBufferHandler
+    """
+    global _ring_buffer, _configured
+    with _configure_lock:
+        root = logging.getLogger(LOGGER_ROOT)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        root.setLevel(level if level is not None else AppConfig.LOG_LEVEL)
+        root.propagate = False
+        category_levels = AppConfig.LOG_CATEGORY_LEVELS if category_levels is None else category_levels
+        for category, category_level in category_levels.items():
+            logging.getLogger(f'{LOGGER_ROOT}.{category}').setLevel(category_level)
+
+        console = logging.StreamHandler(stream if stream is not None else sys.stdout)
+        console.setFormatter(_ConsoleFormatter(LOG_FORMAT, datefmt='%H:%M:%S'))
+        console.addFilter(CategoryRateLimitFilter(
+            AppConfig.LOG_RATE_LIMITS if rate_limits is None else rate_limits,
+            AppConfig.LOG_DEFAULT_RATE_LIMIT if default_rate_limit is None else default_rate_limit,
+        ))
+        root.addHandler(console)
+
+        _ring_buffer = RingBufferHandler(ring_buffer_size or AppConfig.LOG_RING_BUFFER_SIZE)
+        root.addHandler(_ring_buffer)
+        _configured = True
+        return _ring_buffer
+
+
+def get_ring_buffer():
+    """返回内存环形缓冲区（日志查看器使用）"""
+    if not _configured:
+        setup_logging()
+    return _ring_buffer
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步采集与分析流水线 - 多个测头在同一个事件循环中并发运行
+
+每个测头对应一个 ProbeChannel，各阶段为协程，由有界 asyncio.Queue 依次连接：
+    设备读取 → 凑批 → 持久化写入(CSV) → 分析(AnalysisEngine) → 发布
+队列满时上游协程等待（背压），写盘或界面跟不上时内存不会无限增长。
+分析与写盘在事件循环的默认线程池中执行，同一通道的批次按顺序处理；
+多个测头共用一个事件循环与线程池，不需要每个设备一个线程。
+单个高速测头可设置 analysis_jobs，查找与误差计算分片到进程池，多批同时计算，按提交顺序累积结果。
+
+设备是任意提供 read() 异步生成器的对象，逐点产生 (序号, X, 角度, 测量半径)。
+QtAsyncBridge 以 Qt 定时器驱动 asyncio 事件循环，协程与发布回调都在界面线程中运行，
+可以直接更新界面控件；不使用 Qt 时可直接 asyncio.run(pipeline.run())
+"""
+
+import asyncio
+from collections import deque
+
+import pandas as pd
+
+from app_logging import get_logger
+
+
+logger = get_logger('analysis')
+
+# 测量数据列（与 HardwareSimulator 写出的测量文件一致）
+MEASUREMENT_COLUMNS = ['sequence', 'x_pos_mm', 'angle_deg', 'measured_radius_mm']
+
+# 默认队列容量与凑批参数
+DEFAULT_QUEUE_SIZE = 1000        # 设备到凑批阶段的队列容量(点)
+DEFAULT_BATCH_QUEUE_SIZE = 8     # 凑批之后各阶段的队列容量(批)
+DEFAULT_BATCH_SIZE = 200         # 每批最多点数
+DEFAULT_BATCH_INTERVAL = 0.05    # 凑批最长等待(秒)，低速测头也能及时分析
+
+# Qt 桥接：定时器间隔(ms)与每次触发最多运行的事件循环轮数
+DEFAULT_BRIDGE_INTERVAL = 5
+BRIDGE_MAX_ITERATIONS = 16
+
+# 流结束标记
+_END = None
+
+
+class SimulatedProbe:
+    """模拟测头：按 HardwareSimulator 的测量路径与误差模型异步产生测量点"""
+
+    def __init__(self, theoretical_data, measurement_params):
+        """
+        Args:
+            theoretical_data: Pandas DataFrame，理论点云数据
+            measurement_params: dict，测量参数（与 HardwareSimulator 相同）
+        """
+        from hardware_simulator import HardwareSimulator
+        self.simulator = HardwareSimulator(theoretical_data, measurement_params, output_file_path=None)
+        self.measurement_delay = measurement_params.get('measurement_delay', 0.05)
+        self.total_points = 0
+
+    async def read(self):
+        """逐点产生 (序号, X, 角度, 测量半径)"""
+        loop = asyncio.get_running_loop()
+        points = await loop.run_in_executor(None, self.simulator.filter_measurement_points)
+        self.total_points = len(points)
+        logger.info(f"根据测量参数，需要测量 {self.total_points} 个点")
+
+        for i, (_, row) in enumerate(points.iterrows()):
+            sequence = i + 1
+            yield (sequence, *self.simulator.measure_point(row, sequence))
+            await asyncio.sleep(self.measurement_delay)
+
+
+class PipelinePublisher:
+    """流水线结果的接收方（默认不做任何处理），各方法在事件循环线程中调用"""
+
+    def measurement_point(self, channel, sequence, x_pos, angle_deg, measured_radius):
+        """设备产生一个测量点"""
+
+    def measurement_finished(self, channel):
+        """设备测量结束"""
+
+    def analysis_update(self, channel, update):
+        """一批分析完成，update 为 AnalysisEngine.process_batch() 的返回值"""
+
+    def analysis_finished(self, channel, update):
+        """分析结束，update 为 AnalysisEngine.finish() 的返回值"""
+
+    def pipeline_error(self, channel, message):
+        """通道出错（其余阶段已取消）"""
+
+
+class ProbeChannel:
+    """单个测头的异步流水线：设备 → 凑批 → 写盘 → 分析 → 发布"""
+
+    def __init__(self, name, device, engine, output_file_path=None, publisher=None,
+                 queue_size=DEFAULT_QUEUE_SIZE, batch_queue_size=DEFAULT_BATCH_QUEUE_SIZE,
+                 batch_size=DEFAULT_BATCH_SIZE, batch_interval=DEFAULT_BATCH_INTERVAL,
+                 pipeline_metrics=None, station_metrics=None, analysis_jobs=1, shard_by='sequence'):
+        """
+        Args:
+            name: str，通道名称
+            device: 提供 read() 异步生成器的设备对象
+            engine: AnalysisEngine，本通道的分析引擎
+            output_file_path: str，测量数据文件路径（None 时不写盘）
+            publisher: PipelinePublisher，结果接收方
+            queue_size: int，设备到凑批阶段的队列容量(点)
+            batch_queue_size: int，凑批之后各阶段的队列容量(批)
+            batch_size: int，每批最多点数
+            batch_interval: float，凑批最长等待(秒)
+            pipeline_metrics: PipelineMetrics，流水线指标（可选）
+            station_metrics: StationMetrics，指标端点计数（可选），记录已测量点数
+            analysis_jobs: int，分析进程数，大于1时使用 parallel_analysis.ShardedStreamAnalysis
+            shard_by: str，分片方式，'sequence'（按序号分块）或 'x'（按X站位）
+        """
+        self.name = name
+        self.device = device
+        self.engine = engine
+        self.output_file_path = output_file_path
+        self.publisher = publisher or PipelinePublisher()
+        self.queue_size = queue_size
+        self.batch_queue_size = batch_queue_size
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.pipeline_metrics = pipeline_metrics
+        self.station_metrics = station_metrics
+        self.analysis_jobs = analysis_jobs
+        self.shard_by = shard_by
+        self.sharded_analysis = None
+        self.is_stopping = False
+        self.measured_points = 0
+        self._resumed = None
+
+    async def run(self):
+        """运行全部阶段直到设备结束（或被停止）且剩余数据分析完毕"""
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        points = asyncio.Queue(self.queue_size)
+        batches = asyncio.Queue(self.batch_queue_size)
+        written = asyncio.Queue(self.batch_queue_size)
+        updates = asyncio.Queue(self.batch_queue_size)
+
+        tasks = []
+        try:
+            if self.analysis_jobs > 1:
+                from parallel_analysis import ShardedStreamAnalysis
+                self.sharded_analysis = await asyncio.get_running_loop().run_in_executor(
+                    None, ShardedStreamAnalysis, self.engine, self.analysis_jobs, self.shard_by)
+            tasks = [asyncio.ensure_future(stage) for stage in (
+                self._read(points),
+                self._batch(points, batches),
+                self._write(batches, written),
+                self._analyse(written, updates),
+                self._publish(updates),
+            )]
+            await asyncio.gather(*tasks)
+        except Exception as e:
+            logger.error(f"测头 {self.name} 流水线出错: {e}")
+            self.publisher.pipeline_error(self, f"测头 {self.name} 流水线错误: {str(e)}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            if self.sharded_analysis is not None:
+                self.sharded_analysis.close()
+                self.sharded_analysis = None
+
+    async def _read(self, points):
+        """设备读取阶段"""
+        async for sequence, x_pos, angle_deg, measured_radius in self.device.read():
+            await self._resumed.wait()
+            if self.is_stopping:
+                break
+            if self.pipeline_metrics is not None:
+                self.pipeline_metrics.mark('acquire', sequence)
+                self.pipeline_metrics.count('acquire')
+            if self.station_metrics is not None:
+                self.station_metrics.record_measured(sequence)
+            self.measured_points += 1
+            self.publisher.measurement_point(self, sequence, x_pos, angle_deg, measured_radius)
+            await points.put((sequence, x_pos, angle_deg, measured_radius))
+        await points.put(_END)
+        logger.info(f"测头 {self.name} 测量结束，共 {self.measured_points} 点")
+        self.publisher.measurement_finished(self)
+
+    async def _batch(self, points, batches):
+        """凑批阶段：取到首个点后，在 batch_interval 内尽量凑满 batch_size 个点"""
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            point = await points.get()
+            if point is _END:
+                break
+            rows = [point]
+            deadline = loop.time() + self.batch_interval
+            while len(rows) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    point = await asyncio.wait_for(points.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if point is _END:
+                    finished = True
+                    break
+                rows.append(point)
+            await batches.put(pd.DataFrame(rows, columns=MEASUREMENT_COLUMNS))
+        await batches.put(_END)
+
+    async def _write(self, batches, written):
+        """持久化阶段：整批追加到测量文件后交给分析阶段"""
+        loop = asyncio.get_running_loop()
+        if self.output_file_path is not None:
+            await loop.run_in_executor(None, self._initialize_output_file)
+        while True:
+            batch = await batches.get()
+            if batch is _END:
+                break
+            if self.output_file_path is not None:
+                await loop.run_in_executor(None, self._append_rows, batch)
+            if self.pipeline_metrics is not None:
+                self.pipeline_metrics.mark('file_write', batch['sequence'].to_numpy())
+                self.pipeline_metrics.count('file_write', len(batch))
+            await written.put(batch)
+        await written.put(_END)
+
+    def _initialize_output_file(self):
+        with open(self.output_file_path, 'w', encoding='utf-8') as f:
+            f.write(','.join(MEASUREMENT_COLUMNS) + '\n')
+        logger.info(f"测头 {self.name} 输出文件已初始化: {self.output_file_path}")
+
+    def _append_rows(self, batch):
+        with open(self.output_file_path, 'a', encoding='utf-8') as f:
+            f.writelines(
+                f"{int(sequence)},{x_pos:.3f},{angle_deg:.3f},{measured_radius:.6f}\n"
+                for sequence, x_pos, angle_deg, measured_radius in batch.itertuples(index=False)
+            )
+
+    async def _analyse(self, written, updates):
+        """分析阶段：在线程池中按顺序整批分析，不阻塞事件循环"""
+        if self.sharded_analysis is not None:
+            await self._analyse_sharded(written, updates)
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await written.get()
+            if batch is _END:
+                break
+            if self.pipeline_metrics is not None:
+                self.pipeline_metrics.mark('analysis_read', batch['sequence'].to_numpy())
+                self.pipeline_metrics.count('analysis_read', len(batch))
+            update = await loop.run_in_executor(None, self.engine.process_batch, batch)
+            if update is not None:
+                await updates.put(('update', update))
+        # 使用全部测量点进行完整配准，并评定最后一个截面
+        await updates.put(('finish', await loop.run_in_executor(None, self.engine.finish)))
+
+    async def _analyse_sharded(self, written, updates):
+        """
+        分片并行分析阶段：新批次到达即提交到进程池，多批同时计算；
+        按提交顺序取回重组结果并在线程池中累积，发布顺序与单进程相同
+        """
+        loop = asyncio.get_running_loop()
+        analysis = self.sharded_analysis
+        pending = deque()
+        finished = False
+        while not finished or pending:
+            # 没有新批次可取或计算中的批次已满时，先累积最早提交的一批
+            if pending and (finished or written.empty() or len(pending) >= analysis.max_pending):
+                futures = pending.popleft()
+                await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+                update = await loop.run_in_executor(None, analysis.accumulate, analysis.collect(futures))
+                if update is not None:
+                    await updates.put(('update', update))
+                continue
+            batch = await written.get()
+            if batch is _END:
+                finished = True
+                continue
+            if self.pipeline_metrics is not None:
+                self.pipeline_metrics.mark('analysis_read', batch['sequence'].to_numpy())
+                self.pipeline_metrics.count('analysis_read', len(batch))
+            pending.append(analysis.submit(batch))
+        await updates.put(('finish', await loop.run_in_executor(None, analysis.finish)))
+
+    async def _publish(self, updates):
+        """发布阶段"""
+        while True:
+            kind, update = await updates.get()
+            if kind == 'finish':
+                self.publisher.analysis_finished(self, update)
+                break
+            if self.pipeline_metrics is not None:
+                sequence = update['result']['sequence']
+                self.pipeline_metrics.mark('signal_emit', sequence)
+                self.pipeline_metrics.count('signal_emit', len(sequence))
+            self.publisher.analysis_update(self, update)
+
+    def pause(self):
+        """暂停设备读取（已读取的点继续分析）"""
+        if self._resumed is not None:
+            self._resumed.clear()
+        logger.info(f"测头 {self.name} 已暂停")
+
+    def resume(self):
+        if self._resumed is not None:
+            self._resumed.set()
+        logger.info(f"测头 {self.name} 已恢复")
+
+    def stop(self):
+        """停止设备读取，已读取的点分析完毕后通道结束"""
+        self.is_stopping = True
+        if self._resumed is not None:
+            self._resumed.set()
+
+
+class AsyncPipeline:
+    """多测头异步流水线：各通道在同一个事件循环中并发运行"""
+
+    def __init__(self, channels=()):
+        self.channels = list(channels)
+        self.tasks = []
+
+    def add_channel(self, channel):
+        self.channels.append(channel)
+
+    async def run(self):
+        """运行全部通道直到结束"""
+        await asyncio.gather(*(channel.run() for channel in self.channels))
+
+    def start(self, loop):
+        """
+        在给定事件循环中启动全部通道（不等待结束）
+
+        Args:
+            loop: asyncio 事件循环（如 QtAsyncBridge.loop）
+        """
+        self.tasks = [loop.create_task(channel.run()) for channel in self.channels]
+        logger.info(f"异步流水线已启动，{len(self.channels)} 个测头")
+
+    @property
+    def is_running(self):
+        return any(not task.done() for task in self.tasks)
+
+    def pause(self):
+        for channel in self.channels:
+            channel.pause()
+
+    def resume(self):
+        for channel in self.channels:
+            channel.resume()
+
+    def stop(self):
+        """停止设备读取，剩余数据分析完毕后结束"""
+        for channel in self.channels:
+            channel.stop()
+
+    def cancel(self):
+        """立即取消全部通道（不等待剩余数据分析）"""
+        for task in self.tasks:
+            task.cancel()
+
+
+class QtAsyncBridge:
+    """
+    在 Qt 事件循环中驱动 asyncio 事件循环
+
+    定时器每次触发时运行若干轮事件循环（处理已就绪的回调、到期的定时器与线程池完成通知，
+    不阻塞等待），协程因此运行在界面线程中。没有未完成的任务时定时器停止，
+    在事件循环中创建任务（如 AsyncPipeline.start()）时重新启动
+    """
+
+    def __init__(self, interval=DEFAULT_BRIDGE_INTERVAL, parent=None):
+        """
+        Args:
+            interval: int，定时器间隔(ms)
+            parent: QObject，定时器的父对象（可选）
+        """
+        from PySide6.QtCore import QTimer
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_task_factory(self._create_task)
+        self.timer = QTimer(parent)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.step)
+
+    def _create_task(self, loop, coro, **kwargs):
+        """任务工厂：创建任务时唤醒定时器"""
+        self.wake()
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    def wake(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def step(self):
+        """运行若干轮事件循环；一个协程的连续唤醒（如队列的 put → get）在同一次触发中完成"""
+        for _ in range(BRIDGE_MAX_ITERATIONS):
+            self.loop.call_soon(self.loop.stop)
+            self.loop.run_forever()
+        # 空闲时停止定时器，不再周期性运行事件循环
+        if not asyncio.all_tasks(self.loop):
+            self.timer.stop()
+
+    def close(self):
+        """取消未完成的任务并关闭事件循环"""
+        self.timer.stop()
+        self.loop.set_task_factory(None)
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.run_until_complete(self.loop.shutdown_default_executor())
+        self.loop.close()
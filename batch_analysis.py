@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线批量分析 - 无界面处理归档的测量文件
+
+加载一次理论模型（CSV / .npy / STL / 解析曲面 JSON）并构建查找索引，之后对每个测量文件
+使用与界面实时分析相同的 AnalysisEngine 整批计算：理论点查找、坐标转换（含测头半径补偿）、
+误差计算、等级判定与统计（不需要 PySide6）。每个测量文件的逐点结果写入一个列式文件，
+各文件的汇总统计写入 summary 表（一行一个文件），全部文件合并的误差直方图写入 histogram 表。
+--jobs 大于1时由 parallel_analysis 按文件（或按X范围）分片到进程池并行处理，结果与单进程相同。
+
+输出格式：pyarrow 可用时默认 Parquet，否则为 .npz（也可指定 csv）
+
+命令行示例:
+    python batch_analysis.py data/semicylinder_pointcloud.csv measurement_data/*.csv -o results/
+    python batch_analysis.py model.stl archive/2024-06/ --format csv --align
+    python batch_analysis.py model.npy @runs.txt -o results/ -j 0    # runs.txt 每行一个测量文件，使用全部CPU核
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from error_statistics import ErrorStatistics
+
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# 测量文件的列（与 HardwareSimulator 写出的格式一致）
+MEASUREMENT_DTYPES = {
+    'sequence': np.int64,
+    'x_pos_mm': np.float64,
+    'angle_deg': np.float64,
+    'measured_radius_mm': np.float64,
+}
+
+OUTPUT_FORMATS = ('parquet', 'npz', 'csv')
+DEFAULT_OUTPUT_DIR = 'batch_results'
+SUMMARY_NAME = 'summary'
+HISTOGRAM_NAME = 'histogram'
+
+
+def default_format():
+    """pyarrow 可用时使用 Parquet，否则使用 .npz"""
+    return 'parquet' if PYARROW_AVAILABLE else 'npz'
+
+
+def load_theoretical(file_path):
+    """
+    加载理论模型（与主窗口支持的格式一致）
+
+    Args:
+        file_path: str，理论点云 (.csv/.npy/.stl) 或解析曲面定义 (.json)
+
+    Returns:
+        (theoretical_data DataFrame, reference_surface 或 None)
+    """
+    from config import AppConfig
+
+    lower = file_path.lower()
+    if lower.endswith('.csv'):
+        df = pd.read_csv(file_path)
+        if not all(col in df.columns for col in ('x_mm', 'y_mm', 'z_mm')):
+            if not all(col in df.columns for col in ('x', 'y', 'z')):
+                raise ValueError(f"CSV文件缺少必要的列。找到: {list(df.columns)}")
+            df = df.rename(columns={'x': 'x_mm', 'y': 'y_mm', 'z': 'z_mm'})
+        return df, None
+    if lower.endswith('.npy'):
+        from pointcloud_generator import load_pointcloud_binary
+        return pd.DataFrame(load_pointcloud_binary(file_path), columns=['x_mm', 'y_mm', 'z_mm']), None
+    if lower.endswith('.stl'):
+        from stl_loader import load_stl_pointcloud
+        df = load_stl_pointcloud(file_path, spacing=AppConfig.STL_SAMPLE_SPACING,
+                                 method=AppConfig.STL_SAMPLE_METHOD,
+                                 angle_step=AppConfig.STL_SAMPLE_ANGLE_STEP)
+        return df, None
+    if lower.endswith('.json'):
+        from analytic_surface import load_surface_definition
+        surface = load_surface_definition(file_path)
+        return surface.sample(AppConfig.ANALYTIC_SAMPLE_X_STEP, AppConfig.ANALYTIC_SAMPLE_ANGLE_STEP), surface
+    raise ValueError(f"不支持的文件格式: {file_path}")
+
+
+def expand_measurement_paths(inputs):
+    """
+    展开命令行给出的测量文件：目录取其中的 *.csv，通配符按 glob 展开（按名称排序）
+
+    Returns:
+        list of str
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, '*.csv'))))
+        elif glob.has_magic(item):
+            paths.extend(sorted(glob.glob(item)))
+        else:
+            paths.append(item)
+    return paths
+
+
+def read_measurements(file_path):
+    """读取测量CSV（只解析需要的列；pyarrow 可用时使用其多线程解析器）"""
+    return pd.read_csv(file_path, usecols=list(MEASUREMENT_DTYPES), dtype=MEASUREMENT_DTYPES,
+                       engine='pyarrow' if PYARROW_AVAILABLE else 'c')
+
+
+def engine_options(args):
+    """由命令行参数得到分析引擎的构造参数（并行分析时传给各工作进程）"""
+    from config import AppConfig
+    return {
+        'tolerance_qualified': args.tolerance_qualified,
+        'tolerance_attention': args.tolerance_attention,
+        'tolerance_over_limit': args.tolerance_over_limit,
+        'probe_tip_radius': args.probe_tip_radius,
+        'normal_deviation': AppConfig.ENABLE_NORMAL_DEVIATION and not args.no_normal_deviation,
+        'normal_deviation_k': AppConfig.NORMAL_DEVIATION_K,
+        'alignment': args.align,
+    }
+
+
+def create_batch_engine(theoretical_data, reference_surface, index_cache=None, **options):
+    """
+    创建分析引擎
+
+    Args:
+        theoretical_data: DataFrame，理论点云
+        reference_surface: AnalyticSurface 或 None
+        index_cache: 理论索引缓存（IndexCache，或并行分析时的只读共享存储）
+        **options: engine_options() 或 parallel_analysis.stream_options() 给出的参数
+    """
+    from analysis_engine import AnalysisEngine
+    return AnalysisEngine(
+        theoretical_data=theoretical_data,
+        index_cache=index_cache,
+        reference_surface=reference_surface,
+        form_metrics=False,
+        **options
+    )
+
+
+def analyse_run(engine, measurement_data, align=True):
+    """
+    整批分析一个测量文件（或其中一个X范围分片）
+
+    Args:
+        engine: AnalysisEngine
+        measurement_data: pandas DataFrame，测量数据
+        align: bool，引擎启用配准时是否使用全部测量点进行配准
+
+    Returns:
+        (逐点结果列字典, ErrorStatistics, 附加汇总字段 dict)
+    """
+    statistics = ErrorStatistics()
+    batch = engine.analyse_batch(measurement_data)
+    if batch is None:
+        return {}, statistics, {'skipped_points': len(measurement_data)}
+
+    points, theoretical = batch['measured_points'], batch['theoretical']
+    errors, levels = batch['errors'], batch['levels']
+    statistics.add(errors['radius_error'], levels)
+
+    columns = {
+        'sequence': batch['sequence'],
+        'x_pos_mm': batch['x_pos'],
+        'angle_deg': batch['angle_deg'],
+        'measured_radius_mm': batch['measured_radius'],
+        'compensated_radius_mm': batch['contact_radius'],
+        'x_mm': points[:, 0],
+        'y_mm': points[:, 1],
+        'z_mm': points[:, 2],
+        'theoretical_x_mm': theoretical['x_theoretical'],
+        'theoretical_y_mm': theoretical['y_theoretical'],
+        'theoretical_z_mm': theoretical['z_theoretical'],
+        'theoretical_radius_mm': theoretical['radius_theoretical'],
+        'radius_error_mm': errors['radius_error'],
+        'x_error_mm': errors['x_error'],
+        'y_error_mm': errors['y_error'],
+        'z_error_mm': errors['z_error'],
+        'euclidean_error_mm': errors['euclidean_error'],
+        'tangential_error_mm': errors['tangential_error'],
+        'normal_error_mm': errors['normal_error'],
+        'status_level': levels.astype(np.int8),
+    }
+    extra = {'skipped_points': len(measurement_data) - len(points)}
+    if align and engine.alignment_target is not None:
+        extra.update(align_run(engine, columns))
+    return columns, statistics, extra
+
+
+def align_run(engine, columns):
+    """
+    使用一个测量文件的全部测量点进行ICP配准（与扫描结束时的完整配准相同），
+    配准后误差列写入 columns
+
+    Returns:
+        dict，配准相关的汇总字段
+    """
+    engine.reset_alignment()
+    points = np.column_stack([columns['x_mm'], columns['y_mm'], columns['z_mm']])
+    errors = {'radius_error': columns['radius_error_mm'], 'normal_error': columns['normal_error_mm']}
+    engine.alignment_points.append(points)
+    engine.raw_radius_errors.append(errors['radius_error'])
+    engine.update_alignment(final=True)
+
+    aligned = engine.calculate_aligned_errors(points, errors)
+    columns['aligned_radius_error_mm'] = aligned['aligned_radius_error']
+    columns['aligned_normal_error_mm'] = aligned['aligned_normal_error']
+    finite = aligned['aligned_radius_error'][np.isfinite(aligned['aligned_radius_error'])]
+    return {
+        'aligned_mean_error': float(finite.mean()) if len(finite) else np.nan,
+        'aligned_std_error': float(finite.std()) if len(finite) else np.nan,
+        'alignment_rms': engine.alignment_result['rms'] if engine.alignment_result else np.nan,
+    }
+
+
+def summary_row(name, path, output_path, statistics, extra, elapsed):
+    """汇总表中一个测量文件的行"""
+    return {'run': name, 'source': os.path.abspath(path), 'output': output_path,
+            **statistics.to_dict(), **extra, 'elapsed_s': elapsed}
+
+
+def process_run(engine, path, name, output_dir, fmt, align):
+    """
+    读取、分析一个测量文件并写出逐点结果
+
+    Returns:
+        (汇总行 dict, ErrorStatistics)
+    """
+    start = time.perf_counter()
+    columns, statistics, extra = analyse_run(engine, read_measurements(path), align)
+    output_path = write_table(columns, os.path.join(output_dir, name), fmt) if columns else ''
+    return summary_row(name, path, output_path, statistics, extra, time.perf_counter() - start), statistics
+
+
+def write_table(columns, path_stem, fmt):
+    """
+    将列字典写为列式文件
+
+    Args:
+        columns: dict，列名 -> 一维数组
+        path_stem: str，不含扩展名的输出路径
+        fmt: str，'parquet' / 'npz' / 'csv'
+
+    Returns:
+        str，输出文件路径
+    """
+    path = f'{path_stem}.{fmt}'
+    if fmt == 'npz':
+        np.savez(path, **{name: np.asarray(values) for name, values in columns.items()})
+    elif fmt == 'parquet':
+        pd.DataFrame(columns).to_parquet(path, index=False)
+    else:
+        pd.DataFrame(columns).to_csv(path, index=False, float_format='%.6f')
+    return path
+
+
+def unique_run_name(file_path, used):
+    """输出文件名取测量文件名（不含扩展名），重名时追加序号"""
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    candidate, n = name, 1
+    while candidate in used or candidate in (SUMMARY_NAME, HISTOGRAM_NAME):
+        n += 1
+        candidate = f'{name}_{n}'
+    used.add(candidate)
+    return candidate
+
+
+def build_parser():
+    """创建命令行参数解析器"""
+    from config import AppConfig
+
+    parser = argparse.ArgumentParser(description="模具曲面精度离线批量分析", fromfile_prefix_chars='@')
+    parser.add_argument('theoretical', help="理论模型文件 (.csv/.npy/.stl/.json)")
+    parser.add_argument('measurements', nargs='+',
+                        help="测量CSV文件、目录或通配符（@文件名 读取每行一个路径的列表）")
+    parser.add_argument('-o', '--output-dir', default=DEFAULT_OUTPUT_DIR, help="输出目录")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default=default_format(),
+                        help="输出格式（默认：pyarrow 可用时 parquet，否则 npz）")
+    parser.add_argument('--tolerance-qualified', type=float, default=AppConfig.DEFAULT_TOLERANCE_QUALIFIED,
+                        help="合格阈值(mm)")
+    parser.add_argument('--tolerance-attention', type=float, default=AppConfig.DEFAULT_TOLERANCE_ATTENTION,
+                        help="注意阈值(mm)")
+    parser.add_argument('--tolerance-over-limit', type=float, default=AppConfig.DEFAULT_TOLERANCE_OVER_LIMIT,
+                        help="超差阈值(mm)")
+    parser.add_argument('--probe-tip-radius', type=float, default=AppConfig.DEFAULT_PROBE_TIP_RADIUS,
+                        help="测头球头半径(mm)，0为不补偿")
+    parser.add_argument('--align', action='store_true', help="每个文件使用全部测量点进行ICP配准，输出配准后误差")
+    parser.add_argument('--no-normal-deviation', action='store_true',
+                        help="不构建KD树法向偏差引擎（法向误差退化为半径误差，速度更快）")
+    parser.add_argument('--no-index-cache', action='store_true', help="不使用理论索引磁盘缓存")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="工作进程数（0为CPU核数）；文件数少于进程数时每个文件按X范围分片并行")
+    parser.add_argument('-q', '--quiet', action='store_true', help="不逐个打印文件结果")
+    return parser
+
+
+def write_histogram(statistics, output_dir, fmt):
+    """写出全部文件合并后的误差直方图（首尾两行为范围外的下溢/上溢计数）"""
+    edges = statistics.bin_edges()
+    columns = {
+        'bin_lower_mm': np.concatenate([[-np.inf], edges]),
+        'bin_upper_mm': np.concatenate([edges, [np.inf]]),
+        'count': statistics.histogram,
+    }
+    return write_table(columns, os.path.join(output_dir, HISTOGRAM_NAME), fmt)
+
+
+def print_run(index, total, row):
+    print(f"[{index}/{total}] {row['run']}: {row['points']} 点 "
+          f"(跳过 {row['skipped_points']})，平均误差 {row['mean_error']:.4f} mm，"
+          f"标准差 {row['std_error']:.4f} mm，超差 "
+          f"{row['over_limit_count'] + row['severe_count']} 点，"
+          f"{row['elapsed_s'] * 1000:.0f} ms", flush=True)
+
+
+def main(argv=None):
+    """命令行入口，有文件处理失败时返回1"""
+    args = build_parser().parse_args(argv)
+    if args.format == 'parquet' and not PYARROW_AVAILABLE:
+        print("Parquet 输出需要安装 pyarrow，请改用 --format npz 或 csv")
+        return 2
+    measurement_paths = expand_measurement_paths(args.measurements)
+    if not measurement_paths:
+        print("没有找到测量文件")
+        return 2
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    from config import AppConfig
+    from index_cache import IndexCache
+    from app_logging import setup_logging
+    setup_logging(level='WARNING')
+
+    start = time.perf_counter()
+    try:
+        theoretical_data, reference_surface = load_theoretical(args.theoretical)
+        index_cache = None if args.no_index_cache else IndexCache(AppConfig.INDEX_CACHE_DIR,
+                                                                  AppConfig.INDEX_CACHE_MAX_BYTES)
+        options = engine_options(args)
+        engine = create_batch_engine(theoretical_data, reference_surface, index_cache, **options)
+    except Exception as e:
+        print(f"加载理论模型失败: {e}")
+        return 2
+    print(f"理论模型 {len(theoretical_data)} 点，准备耗时 {time.perf_counter() - start:.2f} 秒，"
+          f"待分析 {len(measurement_paths)} 个文件，{jobs} 个进程，输出格式 {args.format}", flush=True)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    used_names = set()
+    runs = [(path, unique_run_name(path, used_names)) for path in measurement_paths]
+    results = [None] * len(runs)
+    failures = []
+    batch_start = time.perf_counter()
+
+    def on_result(i, result, error):
+        if error is not None:
+            failures.append(runs[i][0])
+            print(f"[{i + 1}/{len(runs)}] {runs[i][0]}: 处理失败: {error}", flush=True)
+            return
+        results[i] = result
+        if not args.quiet:
+            print_run(i + 1, len(runs), result[0])
+
+    if jobs == 1:
+        for i, (path, name) in enumerate(runs):
+            try:
+                result = process_run(engine, path, name, args.output_dir, args.format, args.align)
+            except Exception as e:
+                on_result(i, None, e)
+                continue
+            on_result(i, result, None)
+    else:
+        from parallel_analysis import ParallelAnalysis
+        with ParallelAnalysis(engine, options, jobs) as pool:
+            if len(runs) >= jobs:
+                # 按文件分片：每个进程独立读取、分析并写出一个文件
+                for i, result, error in pool.process_runs(runs, args.output_dir, args.format, args.align):
+                    on_result(i, result, error)
+            else:
+                # 文件数少于进程数：每个文件按X范围分片，各进程的部分统计合并
+                for i, (path, name) in enumerate(runs):
+                    try:
+                        result = pool.process_run_sharded(path, name, args.output_dir, args.format, args.align)
+                    except Exception as e:
+                        on_result(i, None, e)
+                        continue
+                    on_result(i, result, None)
+
+    # 按文件顺序合并统计，结果与完成顺序无关
+    completed = [result for result in results if result is not None]
+    total = ErrorStatistics()
+    for _, statistics in completed:
+        total.merge(statistics)
+
+    if completed:
+        summary_rows = [row for row, _ in completed]
+        summary_columns = {key: [row.get(key, np.nan) for row in summary_rows]
+                           for key in dict.fromkeys(k for row in summary_rows for k in row)}
+        summary_path = write_table(summary_columns, os.path.join(args.output_dir, SUMMARY_NAME), args.format)
+        histogram_path = write_histogram(total, args.output_dir, args.format)
+        print(f"汇总已保存: {summary_path}，误差直方图: {histogram_path}")
+
+    elapsed = time.perf_counter() - batch_start
+    rate = total.count / elapsed if elapsed > 0 else 0.0
+    print(f"完成 {len(completed)} 个文件，共 {total.count} 点，平均误差 {total.mean:.4f} mm，"
+          f"标准差 {total.std:.4f} mm，耗时 {elapsed:.2f} 秒 ({rate:,.0f} 点/秒)")
+    if failures:
+        print(f"{len(failures)} 个文件处理失败")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试 - 分析、存储与界面热路径
+
+以固定随机种子生成合成圆柱模具（30k / 1M / 10M 点），测量：
+- 理论索引构建耗时、批量/逐点查找速率
+- 分析线程整批处理吞吐量（按 AppConfig 的法向偏差、配准与形状误差配置）
+- 理论点云 CSV 与二进制(.npy)读入速率
+- 统计更新开销、数据表格插入速率
+- 误差直方图与3D视图（LOD抽稀后）的 Agg 重绘耗时（offscreen Qt 平台）
+结果写入JSON，并可与保存的基线比较，性能下降超过阈值时以非零状态退出
+
+命令行示例:
+    python benchmark.py                                  # 30k与1M模具，结果写入 benchmark_results.json
+    python benchmark.py --sizes 30k,1m,10m --repeat 5
+    python benchmark.py --save-baseline                  # 将本次结果保存为基线
+    python benchmark.py --baseline benchmark_baseline.json --threshold 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+
+# 随机种子（查询点、测量误差与直方图数据）
+BENCHMARK_SEED = 20240601
+
+# 合成模具：(X站位数, 每站位角度数)，圆柱半径500mm、X间隔0.5mm、角度0~180°
+MOLD_SIZES = {
+    '30k': (200, 150),
+    '1m': (1000, 1000),
+    '10m': (4000, 2500),
+}
+MOLD_RADIUS = 500.0
+MOLD_X_STEP = 0.5
+DEFAULT_SIZES = ['30k', '1m']
+
+# 各项基准的工作量
+LOOKUP_BATCH_QUERIES = 100000
+LOOKUP_SCALAR_QUERIES = 10000
+ANALYSIS_BATCH_POINTS = 5000
+STATISTICS_BATCHES = 200
+STATISTICS_BATCH_SIZE = 50
+TABLE_ROWS = 500
+TABLE_ROWS_PER_FRAME = 20
+HISTOGRAM_ERRORS = 10000
+MEASURED_3D_POINTS = 1000
+RENDER_SIZE = (800, 600)
+
+# 默认重复次数、回归阈值（相对基线下降比例）与输出路径
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_OUTPUT = 'benchmark_results.json'
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+
+
+class BenchmarkResults:
+    """基准结果集合：指标名 -> 数值、单位与方向"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, value, unit, higher_is_better):
+        self.metrics[name] = {'value': float(value), 'unit': unit, 'higher_is_better': higher_is_better}
+        arrow = '↑' if higher_is_better else '↓'
+        print(f"  {name:<36s} {value:14.3f} {unit} {arrow}", flush=True)
+
+
+def measure(func, repeat):
+    """
+    重复执行并取中位耗时
+
+    Args:
+        func: callable，无参数
+        repeat: int，重复次数
+
+    Returns:
+        (中位耗时秒数, 最后一次的返回值)
+    """
+    timings = []
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)), result
+
+
+def make_mold(size):
+    """生成合成圆柱模具点云 (N, 3)"""
+    from analytic_surface import CylinderSurface
+    x_count, angle_count = MOLD_SIZES[size]
+    surface = CylinderSurface(MOLD_RADIUS, 0.0, (x_count - 1) * MOLD_X_STEP, 0.0, 180.0)
+    return surface.sample_points(MOLD_X_STEP, 180.0 / (angle_count - 1))
+
+
+def make_measurements(points, count, rng, noise=0.05):
+    """从理论点中抽取测量点，按硬件读数格式加入半径噪声"""
+    rows = rng.choice(len(points), size=count, replace=len(points) < count)
+    chosen = points[rows]
+    return pd.DataFrame({
+        'sequence': np.arange(1, count + 1),
+        'x_pos_mm': chosen[:, 0],
+        'angle_deg': np.degrees(np.arctan2(chosen[:, 2], chosen[:, 1])),
+        'measured_radius_mm': np.hypot(chosen[:, 1], chosen[:, 2]) + rng.normal(0.0, noise, count),
+    })
+
+
+def bench_index(results, size, theoretical_data, repeat):
+    """理论索引构建"""
+    from theoretical_index import TheoreticalIndex
+    elapsed, index = measure(lambda: TheoreticalIndex.build(theoretical_data), repeat)
+    results.add(f'{size}/index_build_s', elapsed, 's', False)
+    results.add(f'{size}/index_build_points_per_s', len(theoretical_data) / elapsed, 'points/s', True)
+    return index
+
+
+def bench_lookups(results, size, index, points, rng, repeat):
+    """批量与逐点理论点查找"""
+    measurements = make_measurements(points, LOOKUP_BATCH_QUERIES, rng)
+    x_pos = measurements['x_pos_mm'].to_numpy()
+    angle_deg = measurements['angle_deg'].to_numpy()
+
+    elapsed, _ = measure(lambda: index.find_batch(x_pos, angle_deg), repeat)
+    results.add(f'{size}/lookup_batch_per_s', len(x_pos) / elapsed, 'lookups/s', True)
+
+    x_scalar = x_pos[:LOOKUP_SCALAR_QUERIES].tolist()
+    angle_scalar = angle_deg[:LOOKUP_SCALAR_QUERIES].tolist()
+
+    def scalar_lookups():
+        for x, angle in zip(x_scalar, angle_scalar):
+            index.find(x, angle)
+
+    elapsed, _ = measure(scalar_lookups, repeat)
+    results.add(f'{size}/lookup_scalar_per_s', len(x_scalar) / elapsed, 'lookups/s', True)
+
+
+def create_analysis_worker(theoretical_data, measurement_file_path):
+    """按主窗口的配置创建分析线程对象（不启动线程）"""
+    from config import AppConfig
+    from analysis_worker import AnalysisWorker
+    return AnalysisWorker(
+        theoretical_data=theoretical_data,
+        measurement_file_path=measurement_file_path,
+        normal_deviation=AppConfig.ENABLE_NORMAL_DEVIATION,
+        normal_deviation_k=AppConfig.NORMAL_DEVIATION_K,
+        alignment=AppConfig.ENABLE_ALIGNMENT,
+        alignment_interval=AppConfig.ALIGNMENT_UPDATE_INTERVAL,
+        alignment_sample_size=AppConfig.ALIGNMENT_SAMPLE_SIZE,
+        form_metrics=AppConfig.ENABLE_FORM_METRICS,
+        form_min_ring_points=AppConfig.FORM_MIN_RING_POINTS,
+    )
+
+
+def bench_analysis(results, size, theoretical_data, points, rng, work_dir, repeat):
+    """分析线程整批处理吞吐量"""
+    measurement_file = os.path.join(work_dir, 'measurement.csv')
+    start = time.perf_counter()
+    worker = create_analysis_worker(theoretical_data, measurement_file)
+    results.add(f'{size}/analysis_setup_s', time.perf_counter() - start, 's', False)
+
+    batch = make_measurements(points, ANALYSIS_BATCH_POINTS, rng)
+
+    def analyse():
+        worker.reset_statistics()
+        worker.process_measurement_batch(batch)
+
+    elapsed, _ = measure(analyse, repeat)
+    results.add(f'{size}/analysis_points_per_s', len(batch) / elapsed, 'points/s', True)
+
+    # 仅分析引擎（不含信号发射与逐点结果字典），与上项之差即线程适配层的开销
+    engine = worker.engine
+
+    def analyse_engine():
+        engine.reset_statistics()
+        engine.process_batch(batch)
+
+    elapsed, _ = measure(analyse_engine, repeat)
+    results.add(f'{size}/engine_points_per_s', len(batch) / elapsed, 'points/s', True)
+    return worker
+
+
+def bench_ingest(results, size, points, work_dir, repeat):
+    """理论点云 CSV 与二进制读入"""
+    from pointcloud_generator import save_pointcloud_csv, save_pointcloud_binary, load_pointcloud_binary
+
+    csv_path = os.path.join(work_dir, f'mold_{size}.csv')
+    npy_path = os.path.join(work_dir, f'mold_{size}.npy')
+    save_pointcloud_csv(points, csv_path)
+    save_pointcloud_binary(points, npy_path)
+
+    csv_bytes = os.path.getsize(csv_path)
+    elapsed, _ = measure(lambda: pd.read_csv(csv_path), repeat)
+    results.add(f'{size}/csv_ingest_points_per_s', len(points) / elapsed, 'points/s', True)
+    results.add(f'{size}/csv_ingest_mb_per_s', csv_bytes / elapsed / 1e6, 'MB/s', True)
+
+    elapsed, _ = measure(lambda: load_pointcloud_binary(npy_path), repeat)
+    results.add(f'{size}/binary_ingest_points_per_s', len(points) / elapsed, 'points/s', True)
+
+    os.remove(csv_path)
+    os.remove(npy_path)
+
+
+def bench_redraw_3d(results, size, points, rng, repeat):
+    """3D视图重绘（理论点按LOD抽稀 + 测量点）"""
+    from config import AppConfig
+    from point_cloud_lod import PointCloudLOD
+    from render_worker import RenderWorker, draw_point_cloud_scene
+
+    start = time.perf_counter()
+    lod = PointCloudLOD(points)
+    results.add(f'{size}/lod_build_s', time.perf_counter() - start, 's', False)
+
+    _, indices = lod.select(AppConfig.LOD_POINT_BUDGET)
+    measured = points[rng.choice(len(points), MEASURED_3D_POINTS)]
+    colors = np.where(rng.random(MEASURED_3D_POINTS) < 0.9, 'green', 'red')
+    scene = {
+        'theoretical_points': points[indices],
+        'measured_points': measured,
+        'measured_colors': colors,
+        'limits': (points.min(axis=0), points.max(axis=0)),
+        'elev': AppConfig.VIEW_DEFAULT_ELEV,
+        'azim': AppConfig.VIEW_DEFAULT_AZIM,
+    }
+    renderer = RenderWorker()
+    renderer.register_view('3d', draw_point_cloud_scene)
+    elapsed, _ = measure(lambda: renderer.render('3d', scene, *RENDER_SIZE), repeat)
+    results.add(f'{size}/redraw_3d_ms', elapsed * 1000, 'ms', False)
+
+
+def bench_histogram(results, rng, repeat):
+    """误差直方图重绘"""
+    from render_worker import RenderWorker, draw_histogram_scene
+    renderer = RenderWorker()
+    renderer.register_view('histogram', draw_histogram_scene)
+    scene = {'errors': rng.normal(0.0, 0.05, HISTOGRAM_ERRORS), 'tolerance': 0.1}
+    elapsed, _ = measure(lambda: renderer.render('histogram', scene, *RENDER_SIZE), repeat)
+    results.add('ui/redraw_histogram_ms', elapsed * 1000, 'ms', False)
+
+
+def bench_statistics(results, worker, rng, repeat):
+    """统计更新开销（每批，从空历史开始）"""
+    batches = [rng.normal(0.0, 0.05, STATISTICS_BATCH_SIZE) for _ in range(STATISTICS_BATCHES)]
+
+    engine = worker.engine
+
+    def update():
+        engine.reset_statistics()
+        for batch in batches:
+            engine.update_statistics_batch(batch)
+
+    elapsed, _ = measure(update, repeat)
+    results.add('analysis/statistics_update_us_per_batch', elapsed / STATISTICS_BATCHES * 1e6, 'us', False)
+
+
+def bench_table(results, rng, repeat):
+    """数据表格插入速率（主窗口显示于 offscreen 平台，每帧插入若干行）"""
+    from PySide6.QtWidgets import QApplication
+    from main_window import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+
+    errors = rng.normal(0.0, 0.1, TABLE_ROWS).tolist()
+
+    def insert_rows():
+        window.data_table.setRowCount(0)
+        for i, error in enumerate(errors):
+            status = "合格" if abs(error) <= 0.1 else "注意"
+            window.add_analysis_result_to_table(i + 1, 10.0, 45.0, 500.0 + error, 500.0,
+                                                {'radius_error': error, 'status': status})
+            if (i + 1) % TABLE_ROWS_PER_FRAME == 0:
+                app.processEvents()
+
+    elapsed, _ = measure(insert_rows, repeat)
+    results.add('ui/table_insert_rows_per_s', TABLE_ROWS / elapsed, 'rows/s', True)
+    window.close()
+    app.processEvents()
+
+
+def git_revision():
+    """当前 git 提交（不可用时为 None）"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes, repeat):
+    """
+    运行全部基准
+
+    Args:
+        sizes: list of str，模具规模（MOLD_SIZES 的键）
+        repeat: int，每项重复次数（取中位数）
+
+    Returns:
+        dict: 'meta' 运行环境，'metrics' 指标名 -> {value, unit, higher_is_better}
+    """
+    rng = np.random.default_rng(BENCHMARK_SEED)
+    results = BenchmarkResults()
+    worker = None
+
+    with tempfile.TemporaryDirectory(prefix='mold_benchmark_') as work_dir:
+        for size in sizes:
+            points = make_mold(size)
+            theoretical_data = pd.DataFrame(points, columns=['x_mm', 'y_mm', 'z_mm'])
+            print(f"[{size}] 合成模具 {len(points)} 点", flush=True)
+
+            index = bench_index(results, size, theoretical_data, repeat)
+            bench_lookups(results, size, index, points, rng, repeat)
+            del index
+            size_worker = bench_analysis(results, size, theoretical_data, points, rng, work_dir, repeat)
+            if worker is None:
+                worker = size_worker
+            del size_worker
+            bench_ingest(results, size, points, work_dir, repeat)
+            bench_redraw_3d(results, size, points, rng, repeat)
+
+        print("[common]", flush=True)
+        if worker is not None:
+            bench_statistics(results, worker, rng, repeat)
+        bench_histogram(results, rng, repeat)
+        bench_table(results, rng, repeat)
+
+    return {
+        'meta': {
+            'timestamp': time.time(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'sizes': list(sizes),
+            'repeat': repeat,
+            'seed': BENCHMARK_SEED,
+        },
+        'metrics': results.metrics,
+    }
+
+
+def compare_with_baseline(report, baseline, threshold):
+    """
+    与基线比较
+
+    Args:
+        report: dict，本次结果
+        baseline: dict，基线结果
+        threshold: float，性能下降超过该比例视为回归
+
+    Returns:
+        list of dict: 'name', 'baseline', 'current', 'unit', 'ratio'（>1为变快）, 'regression'
+    """
+    rows = []
+    for name, current in report['metrics'].items():
+        previous = baseline['metrics'].get(name)
+        if previous is None or previous['value'] <= 0 or current['value'] <= 0:
+            continue
+        if current['higher_is_better']:
+            ratio = current['value'] / previous['value']
+        else:
+            ratio = previous['value'] / current['value']
+        rows.append({
+            'name': name,
+            'baseline': previous['value'],
+            'current': current['value'],
+            'unit': current['unit'],
+            'ratio': ratio,
+            'regression': ratio < 1.0 - threshold,
+        })
+    return rows
+
+
+def print_comparison(rows, threshold):
+    """打印基线比较表"""
+    print(f"\n=== 与基线比较（下降超过 {threshold:.0%} 视为回归）===")
+    print(f"  {'指标':<36s} {'基线':>14s} {'本次':>14s} {'相对性能':>9s}")
+    for row in rows:
+        flag = '  ← 回归' if row['regression'] else ''
+        print(f"  {row['name']:<36s} {row['baseline']:14.3f} {row['current']:14.3f} "
+              f"{row['ratio']:8.2f}x{flag}")
+
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="模具曲面精度分析系统性能基准测试")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES),
+                        help=f"模具规模，逗号分隔，可选 {', '.join(MOLD_SIZES)}")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="每项重复次数（取中位数）")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help="结果JSON文件")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基线JSON文件（存在时进行比较）")
+    parser.add_argument('--save-baseline', action='store_true', help="将本次结果保存为基线")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="相对基线性能下降超过该比例视为回归")
+    return parser
+
+
+def main(argv=None):
+    """命令行入口，出现回归时返回1"""
+    args = build_parser().parse_args(argv)
+    sizes = [size.strip().lower() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in MOLD_SIZES]
+    if unknown:
+        print(f"未知的模具规模: {', '.join(unknown)}（可选 {', '.join(MOLD_SIZES)}）")
+        return 2
+
+    # 基准运行期间只输出警告及以上级别的日志
+    from app_logging import setup_logging
+    setup_logging(level='WARNING')
+
+    report = run_benchmarks(sizes, args.repeat)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"未找到基线文件 {args.baseline}，跳过比较（可使用 --save-baseline 生成）")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows = compare_with_baseline(report, baseline, args.threshold)
+    print_comparison(rows, args.threshold)
+    regressions = [row['name'] for row in rows if row['regression']]
+    if regressions:
+        print(f"\n检测到 {len(regressions)} 项性能回归: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -144,6 +144,281 @@ def test_data_manager():
         print(f"  ❌ 数据管理模块测试失败: {e}")
         return False
 
+def test_theoretical_index():
+    """测试理论索引批量查找（含非有限输入）"""
+    print("🔍 测试理论索引...")
+    
+    try:
+        import numpy as np
+        import pandas as pd
+        from theoretical_index import TheoreticalIndex
+        
+        data = pd.read_csv(project_root / "data" / "semicylinder_pointcloud.csv")
+        grid_index = TheoreticalIndex.build(data)
+        # 非规则点云（打乱后去掉部分点）走键查找路径
+        key_index = TheoreticalIndex.build(data.sample(frac=0.9, random_state=0))
+        
+        for name, index in (("网格", grid_index), ("键查找", key_index)):
+            x_pos = np.array([0.0, np.nan, 0.0, np.inf, -np.inf])
+            angle_deg = np.array([90.0, 20.0, np.nan, 10.0, 10.0])
+            points, valid = index.find_batch(x_pos, angle_deg)
+            assert valid.tolist() == [valid[0], False, False, False, False]
+            assert len(points['radius_theoretical']) == len(x_pos)
+            assert index.find(np.nan, 20.0) is None
+            print(f"  ✅ {name}索引: 非有限的X/角度视为未找到")
+        
+        assert grid_index.is_grid
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 理论索引测试失败: {e}")
+        return False
+
+def test_probe_tip_compensation():
+    """测试测头半径补偿（点云与解析曲面模式，含半圆柱 180° 边缘）"""
+    print("🔍 测试测头半径补偿...")
+    
+    try:
+        import numpy as np
+        import pandas as pd
+        from analysis_engine import AnalysisEngine
+        from analytic_surface import load_surface_definition
+        
+        theoretical = pd.read_csv(project_root / "data" / "semicylinder_pointcloud.csv")
+        measurements = pd.read_csv(project_root / "measurement_data" / "live_measurement.csv")
+        surface = load_surface_definition(project_root / "data" / "semicylinder_surface.json")
+        edge = np.isclose(measurements['angle_deg'].to_numpy(), 180.0)
+        assert edge.any()
+        
+        for name, reference_surface in (("点云", None), ("解析曲面", surface)):
+            for tip_radius in (0.0, 1.0):
+                engine = AnalysisEngine(theoretical, reference_surface=reference_surface,
+                                        probe_tip_radius=tip_radius, alignment=False, form_metrics=False)
+                batch = engine.analyse_batch(measurements)
+                # 边缘接触角回绕到 -180° 时仍沿用测量射线上的理论点，不丢点
+                assert len(batch['sequence']) == len(measurements)
+                assert np.isfinite(batch['measured_points']).all()
+                assert np.isfinite(batch['theoretical']['radius_theoretical']).all()
+                assert np.isfinite(batch['errors']['radius_error']).all()
+                if reference_surface is not None:
+                    # 圆柱面法向与径向一致，补偿量为零
+                    assert np.allclose(batch['contact_radius'], batch['measured_radius'], atol=1e-9)
+            print(f"  ✅ {name}模式: 测头半径 1.0mm 时 {edge.sum()} 个 180° 边缘测量点全部保留")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 测头半径补偿测试失败: {e}")
+        return False
+
+def test_batch_consistency():
+    """测试整批分析与逐点分析结果一致（点云与解析曲面模式）"""
+    print("🔍 测试整批与逐点分析一致性...")
+    
+    try:
+        import numpy as np
+        import pandas as pd
+        from analysis_engine import AnalysisEngine
+        from analytic_surface import load_surface_definition
+        
+        theoretical = pd.read_csv(project_root / "data" / "semicylinder_pointcloud.csv")
+        measurements = pd.read_csv(project_root / "measurement_data" / "live_measurement.csv")
+        surface = load_surface_definition(project_root / "data" / "semicylinder_surface.json")
+        error_keys = ('radius_error', 'x_error', 'y_error', 'z_error', 'euclidean_error',
+                      'radial_error', 'normal_error', 'tangential_error')
+        
+        for name, reference_surface in (("点云", None), ("解析曲面", surface)):
+            engine = AnalysisEngine(theoretical, reference_surface=reference_surface,
+                                    alignment=False, form_metrics=False)
+            result = engine.process_batch(measurements)['result']
+            assert len(result['sequence']) == len(measurements)
+            
+            for i, row in enumerate(measurements.itertuples(index=False)):
+                theoretical_point = engine.find_theoretical_point(row.x_pos_mm, row.angle_deg)
+                measured_point = engine.convert_to_cartesian(row.x_pos_mm, row.angle_deg,
+                                                             row.measured_radius_mm)
+                expected = engine.calculate_error(theoretical_point, measured_point, row.measured_radius_mm)
+                for key in error_keys:
+                    assert np.isclose(result['errors'][key][i], expected[key], rtol=1e-9, atol=1e-9), \
+                        f"序号 {row.sequence} 的 {key} 不一致"
+                assert result['errors']['status'][i] == expected['status']
+            
+            statistics = engine.get_current_statistics()
+            assert statistics['total_points'] == len(measurements)
+            print(f"  ✅ {name}模式: {len(measurements)} 个测量点整批与逐点误差一致")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 整批与逐点分析一致性测试失败: {e}")
+        return False
+
+def test_analytic_surface():
+    """测试解析曲面模式与同一曲面采样点云模式的误差一致"""
+    print("🔍 测试解析曲面模式...")
+    
+    try:
+        import numpy as np
+        import pandas as pd
+        from analysis_engine import AnalysisEngine
+        from analytic_surface import load_surface_definition
+        
+        theoretical = pd.read_csv(project_root / "data" / "semicylinder_pointcloud.csv")
+        measurements = pd.read_csv(project_root / "measurement_data" / "live_measurement.csv")
+        surface = load_surface_definition(project_root / "data" / "semicylinder_surface.json")
+        
+        analytic = AnalysisEngine(theoretical, reference_surface=surface, alignment=False, form_metrics=False)
+        assert analytic.theoretical_index is None and analytic.deviation_engine is None
+        cloud = AnalysisEngine(theoretical, alignment=False, form_metrics=False)
+        
+        analytic_errors = analytic.analyse_batch(measurements)['errors']
+        cloud_errors = cloud.analyse_batch(measurements)['errors']
+        # 圆柱面的法向误差即半径误差
+        assert np.allclose(analytic_errors['normal_error'], analytic_errors['radius_error'], atol=1e-9)
+        for key in ('radius_error', 'normal_error'):
+            difference = np.abs(analytic_errors[key] - cloud_errors[key]).max()
+            assert difference < 1e-3, f"{key} 最大差值 {difference:.2e} mm"
+        print("  ✅ 解析曲面与点云模式的半径误差、法向误差一致")
+        
+        # 定义域之外的测量点被剔除
+        outside = measurements.head(3).assign(x_pos_mm=surface.x_end + 10.0)
+        assert analytic.analyse_batch(outside) is None
+        print("  ✅ 曲面定义域之外的测量点被剔除")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 解析曲面模式测试失败: {e}")
+        return False
+
+def test_error_statistics_merge():
+    """测试分批统计合并与一次累加结果一致"""
+    print("🔍 测试误差统计合并...")
+    
+    try:
+        import numpy as np
+        from error_statistics import ErrorStatistics
+        
+        rng = np.random.default_rng(0)
+        errors = rng.normal(0.05, 0.3, 5000)
+        # 含NaN（忽略）与直方图范围外及恰好在上界的误差
+        errors[[10, 20, 30, 40]] = [np.nan, -5.0, 5.0, 1.0]
+        levels = np.searchsorted([0.1, 0.2, 0.3], np.abs(np.nan_to_num(errors)), side='left')
+        
+        whole = ErrorStatistics()
+        whole.add(errors, levels)
+        for split in ([2500], [1, 7, 4999], list(range(250, 5000, 250))):
+            merged = ErrorStatistics()
+            for part_errors, part_levels in zip(np.split(errors, split), np.split(levels, split)):
+                part = ErrorStatistics()
+                part.add(part_errors, part_levels)
+                merged.merge(part)
+            assert merged.count == whole.count == 4999
+            assert np.isclose(merged.mean, whole.mean, rtol=1e-12, atol=0)
+            assert np.isclose(merged.m2, whole.m2, rtol=1e-12, atol=0)
+            assert (merged.min, merged.max) == (whole.min, whole.max)
+            assert np.array_equal(merged.histogram, whole.histogram)
+            assert np.array_equal(merged.level_counts, whole.level_counts)
+        print("  ✅ 分批合并的计数、均值、M2、直方图与等级计数与一次累加一致")
+        
+        finite = errors[np.isfinite(errors)]
+        assert np.isclose(whole.std, finite.std(), rtol=1e-12)
+        expected = np.histogram(finite, bins=whole.bins, range=whole.hist_range)[0]
+        assert np.array_equal(whole.histogram[1:-1], expected)
+        assert whole.histogram[0] == np.count_nonzero(finite < -1.0)
+        assert whole.histogram[-1] == np.count_nonzero(finite > 1.0)
+        print("  ✅ 标准差与直方图与 numpy 计算结果一致")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 误差统计合并测试失败: {e}")
+        return False
+
+def test_sharded_stream_analysis():
+    """测试测量流分片并行分析与单进程结果一致（按序号与按X分片）"""
+    print("🔍 测试分片并行分析...")
+    
+    try:
+        import numpy as np
+        import pandas as pd
+        from analysis_engine import AnalysisEngine
+        from parallel_analysis import ShardedStreamAnalysis, SHARD_BY_SEQUENCE, SHARD_BY_X
+        
+        theoretical = pd.read_csv(project_root / "data" / "semicylinder_pointcloud.csv")
+        measurements = pd.read_csv(project_root / "measurement_data" / "live_measurement.csv")
+        batches = [measurements.iloc[:300], measurements.iloc[300:800], measurements.iloc[800:]]
+        
+        def assert_same(left, right):
+            if isinstance(left, dict):
+                assert left.keys() == right.keys()
+                for key in left:
+                    assert_same(left[key], right[key])
+            elif left is None or isinstance(left, np.ndarray) and left.dtype == object:
+                assert left is right or np.array_equal(left, right)
+            else:
+                assert np.array_equal(left, right, equal_nan=True)
+        
+        expected = AnalysisEngine(theoretical, alignment_interval=400)
+        expected_results = [expected.process_batch(batch) for batch in batches]
+        expected_finish = expected.finish()
+        
+        for shard_by in (SHARD_BY_SEQUENCE, SHARD_BY_X):
+            engine = AnalysisEngine(theoretical, alignment_interval=400)
+            with ShardedStreamAnalysis(engine, jobs=2, shard_by=shard_by, min_shard_points=100) as sharded:
+                assert all(len(sharded.shard(batch)) == 2 for batch in batches)
+                results = [sharded.process_batch(batch) for batch in batches]
+                finish = sharded.finish()
+            for result, reference in zip(results, expected_results):
+                assert_same(result['result'], reference['result'])
+                assert result['statistics'] == reference['statistics']
+            for key in ('rotation', 'translation', 'rms'):
+                assert finish['alignment'][key] == expected_finish['alignment'][key]
+            print(f"  ✅ 按{'序号' if shard_by == SHARD_BY_SEQUENCE else 'X站位'}分片: 逐点误差、统计与配准与单进程一致")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 分片并行分析测试失败: {e}")
+        return False
+
+def test_stl_normals():
+    """测试STL点云法向朝外（与三角形绕序无关）"""
+    print("🔍 测试STL法向方向...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        from stl_loader import STL_RECORD_DTYPE, load_stl_pointcloud
+        
+        # 半径100mm、长50mm的半圆柱面网格
+        angles = np.radians(np.linspace(0.0, 180.0, 37))
+        xs = np.linspace(0.0, 50.0, 6)
+        grid = np.stack(np.meshgrid(xs, angles, indexing='ij'), axis=-1)
+        vertices = np.stack([grid[..., 0], 100 * np.cos(grid[..., 1]), 100 * np.sin(grid[..., 1])], axis=-1)
+        quads = [(vertices[i, j], vertices[i + 1, j], vertices[i + 1, j + 1], vertices[i, j + 1])
+                 for i in range(len(xs) - 1) for j in range(len(angles) - 1)]
+        triangles = np.array([tri for a, b, c, d in quads for tri in ((a, b, c), (a, c, d))])
+        
+        with tempfile.TemporaryDirectory() as directory:
+            for winding, name in ((triangles, "外绕序"), (triangles[:, ::-1], "内绕序")):
+                records = np.zeros(len(winding), dtype=STL_RECORD_DTYPE)
+                records['vertices'] = winding
+                path = os.path.join(directory, "mesh.stl")
+                with open(path, 'wb') as f:
+                    f.write(b'\0' * 80 + np.uint32(len(records)).tobytes())
+                    records.tofile(f)
+                data = load_stl_pointcloud(path, spacing=10.0, method='area')
+                outward = data['y_mm'] * data['ny'] + data['z_mm'] * data['nz']
+                assert len(data) > 0 and (outward > 0).all()
+                print(f"  ✅ {name}网格: 法向全部指向径向外侧")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ STL法向测试失败: {e}")
+        return False
+
 def test_main_window_creation():
     """测试主窗口创建"""
     print("🔍 测试主窗口创建...")
@@ -281,6 +556,13 @@ def run_comprehensive_test():
         ("配置模块测试", test_config),
         ("样式模块测试", test_styles),
         ("数据管理测试", test_data_manager),
+        ("理论索引测试", test_theoretical_index),
+        ("测头半径补偿测试", test_probe_tip_compensation),
+        ("整批与逐点一致性测试", test_batch_consistency),
+        ("解析曲面模式测试", test_analytic_surface),
+        ("误差统计合并测试", test_error_statistics_merge),
+        ("分片并行分析测试", test_sharded_stream_analysis),
+        ("STL法向方向测试", test_stl_normals),
         ("主窗口创建测试", test_main_window_creation),
         ("文件结构测试", test_file_structure),
         ("文档完整性测试", test_documentation)
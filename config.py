@@ -29,6 +29,8 @@ class AppConfig:
     DEFAULT_X_MAX = 500.0
     DEFAULT_X_STEP = 10.0
     DEFAULT_ROT_STEP = 1.5
+    DEFAULT_PROBE_TIP_RADIUS = 0.0       # 测头球头半径（mm），0表示不补偿
+    MEASUREMENT_DELAY = 0.05             # 模拟测量每点间隔（秒）
     
     # 默认误差阈值参数（mm）
     DEFAULT_TOLERANCE_QUALIFIED = 0.1    # 合格阈值：±0.1mm
@@ -38,6 +40,9 @@ class AppConfig:
     # 更新频率（毫秒）
     DATA_UPDATE_INTERVAL = 2000
     
+    # 数据表格最多保留的行数（超出时删除最早的行，长时间测量时表格不无限增长）
+    TABLE_MAX_ROWS = 1000
+    
     # 颜色配置
     COLORS = {
         'error_positive_high': '#ef4444',   # 红色 - 正向超差
@@ -62,6 +67,84 @@ class AppConfig:
     # 文件路径配置
     SUPPORTED_MODEL_FORMATS = ['.step', '.stp', '.iges', '.igs', '.stl']
     
+    # 解析曲面采样间隔（用于测量路径规划和3D显示）
+    ANALYTIC_SAMPLE_X_STEP = 5.0        # X采样间隔(mm)
+    ANALYTIC_SAMPLE_ANGLE_STEP = 0.5    # 角度采样间隔(度)
+    
+    # STL网格采样配置
+    STL_SAMPLE_METHOD = 'grid'          # 'grid'：(x, θ)网格对齐采样；'area'：面积加权采样
+    STL_SAMPLE_SPACING = 5.0            # 采样间距 / 网格X步长(mm)
+    STL_SAMPLE_ANGLE_STEP = 0.5         # 网格对齐采样角度步长(度)
+    
+    # 法向偏差计算配置（KD树 + 局部二次曲面拟合）
+    ENABLE_NORMAL_DEVIATION = True
+    NORMAL_DEVIATION_K = 12             # 局部拟合近邻数
+    
+    # 刚体配准（点到平面ICP最佳拟合）配置
+    ENABLE_ALIGNMENT = True
+    ALIGNMENT_UPDATE_INTERVAL = 500     # 扫描中每新增多少个点进行一次增量配准
+    ALIGNMENT_SAMPLE_SIZE = 2000        # 增量配准子采样点数
+    
+    # 形状误差（圆度/圆柱度）评定配置
+    ENABLE_FORM_METRICS = True
+    FORM_MIN_RING_POINTS = 8            # 参与圆度评定的截面最少点数
+    
+    # 偏差展开图配置
+    DEVIATION_MAP_REFRESH_INTERVAL = 200    # 界面刷新间隔(ms)，与测量点频率无关
+    
+    # 理论点云显示LOD配置
+    LOD_POINT_BUDGET = 5000             # 视野内显示的理论点数上限
+    LOD_ZOOM_STEP = 1.25                # 滚轮每格缩放比例
+    VIEW_DEFAULT_ELEV = 30.0            # 3D视图默认仰角(度)
+    VIEW_DEFAULT_AZIM = -60.0           # 3D视图默认方位角(度)
+    VIEW_ROTATE_RATE = 0.5              # 左键拖动旋转速度(度/像素)
+    VIEW_DRAG_ZOOM_RATE = 0.005         # 右键拖动缩放速度(每像素比例)
+    
+    # 启动配置：窗口首次绘制后在后台预加载的模块（数据加载与分析线程依赖）
+    BACKGROUND_PRELOAD_MODULES = [
+        'pandas', 'hardware_simulator', 'analysis_worker',
+        'stl_loader', 'analytic_surface', 'pointcloud_generator',
+    ]
+    
+    # 日志配置：级别、控制台按类别限流（条/秒）与内存环形缓冲区
+    LOG_LEVEL = 'INFO'                  # 全局级别；逐点日志为 DEBUG，默认关闭
+    LOG_CATEGORY_LEVELS = {}            # 按类别覆盖级别，如 {'measurement': 'DEBUG'}
+    LOG_RATE_LIMITS = {'measurement': 5, 'progress': 2, 'analysis': 20}
+    LOG_DEFAULT_RATE_LIMIT = 50         # 未配置类别的控制台限流
+    LOG_RING_BUFFER_SIZE = 5000         # 日志查看器可回看的条数
+    
+    # 流水线诊断：按序号采样记录各阶段时间戳（0为关闭，可在诊断面板中开启）
+    PIPELINE_SAMPLE_EVERY = 0
+    PIPELINE_DIAGNOSTICS_SAMPLE_EVERY = 10      # 在诊断面板中开启采样时的默认间隔
+    PIPELINE_DIAGNOSTICS_REFRESH_INTERVAL = 1000  # 诊断面板刷新间隔(ms)
+    
+    # 指标端点：在本机以 Prometheus 文本格式提供 /metrics（默认关闭）
+    METRICS_SERVER_ENABLED = False
+    METRICS_SERVER_HOST = '127.0.0.1'   # 仅本机访问
+    METRICS_SERVER_PORT = 9464
+    METRICS_TICK_INTERVAL = 100         # 界面心跳间隔(ms)，用于帧时间与速率统计
+    
+    # 理论索引缓存配置
+    INDEX_CACHE_DIR = "cache/index"                 # 缓存目录（相对于工作目录）
+    INDEX_CACHE_MAX_BYTES = 512 * 1024 * 1024       # 缓存总大小上限：512MB
+    
+    # 测量流水线模式：'thread' 为设备与分析各一个 QThread；
+    # 'asyncio' 为协程流水线（有界队列连接各阶段，由界面线程的事件循环驱动，多测头不需要多线程）
+    PIPELINE_MODE = 'thread'
+    ASYNC_QUEUE_SIZE = 1000             # 设备到凑批阶段的队列容量(点)
+    ASYNC_BATCH_SIZE = 200              # 每批最多点数
+    ASYNC_BATCH_INTERVAL = 0.05         # 凑批最长等待(秒)
+    ASYNC_BRIDGE_INTERVAL = 5           # Qt 定时器驱动 asyncio 事件循环的间隔(ms)
+    
+    # 分片并行分析：单个测头的查找与误差计算分片到多个进程（1为不分片，在分析线程/线程池中计算）
+    ANALYSIS_JOBS = 1
+    ANALYSIS_SHARD_BY = 'sequence'      # 'sequence'：按序号连续分块；'x'：按X站位分片
+    
+    # 多工位会话：各会话的测量文件目录、会话视图保留的最近结果条数与面板刷新间隔(ms)
+    SESSION_OUTPUT_DIR = "measurement_data/sessions"
+    SESSION_RECENT_RESULTS = 200
+    SESSION_MONITOR_REFRESH_INTERVAL = 500
+    
     @classmethod
     def get_color_legend_items(cls):
         """获取颜色图例项目列表"""
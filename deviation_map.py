@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+偏差展开图模块 - (x, θ)展开平面上的半径误差图像
+
+以预分配的 RGBA 网格数组保存每个测量位置的误差颜色：分析线程按批原地写入
+（代价与新增点数成正比），界面定时将整幅数组作为一张 QImage 绘制
+（代价与已测点数无关）
+"""
+
+import threading
+import numpy as np
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QImage, QPainter, QColor
+from PySide6.QtWidgets import QWidget
+
+from config import AppConfig
+
+
+# 图像单边最大像素数，超出时按比例放大网格步长
+MAX_MAP_DIMENSION = 4096
+
+# 未测量区域的背景色 (R, G, B, A)
+BACKGROUND_RGBA = (241, 245, 249, 255)
+
+
+def _hex_to_rgba(color):
+    """'#rrggbb' 转 (R, G, B, 255)"""
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4)) + (255,)
+
+
+class DeviationMap:
+    """预分配的(x, θ)误差网格及其 RGBA 颜色缓冲区"""
+
+    def __init__(self, x_min, x_max, x_step, angle_min, angle_max, angle_step,
+                 tolerance_qualified=0.1, tolerance_attention=0.2, tolerance_over_limit=0.3):
+        """
+        Args:
+            x_min, x_max, x_step: float，X范围与网格步长(mm)
+            angle_min, angle_max, angle_step: float，角度范围与网格步长(度)
+            tolerance_qualified: float，合格阈值(mm)
+            tolerance_attention: float，注意阈值(mm)
+            tolerance_over_limit: float，超差阈值(mm)
+        """
+        x_step = max(x_step, (x_max - x_min) / (MAX_MAP_DIMENSION - 1))
+        angle_step = max(angle_step, (angle_max - angle_min) / (MAX_MAP_DIMENSION - 1))
+
+        self.x_min = float(x_min)
+        self.x_step = float(x_step)
+        self.angle_min = float(angle_min)
+        self.angle_step = float(angle_step)
+        self.x_count = int(round((x_max - x_min) / x_step)) + 1
+        self.angle_count = int(round((angle_max - angle_min) / angle_step)) + 1
+
+        # 有符号阈值分段：(-∞, -超差] ... (超差, +∞) 共7段，对应颜色由负向深蓝到正向红
+        self.edges = np.array([-tolerance_over_limit, -tolerance_attention, -tolerance_qualified,
+                               tolerance_qualified, tolerance_attention, tolerance_over_limit])
+        colors = AppConfig.COLORS
+        self.palette = np.array([_hex_to_rgba(c) for c in (
+            colors['error_negative_high'], colors['error_negative_high'], colors['error_negative_low'],
+            colors['error_normal'],
+            colors['error_positive_low'], colors['error_positive_high'], colors['error_positive_high'],
+        )], dtype=np.uint8)
+
+        # 行号对应角度（第0行为最大角度，图像上方角度大），列号对应X
+        self.errors = np.full((self.angle_count, self.x_count), np.nan, dtype=np.float32)
+        self.rgba = np.empty((self.angle_count, self.x_count, 4), dtype=np.uint8)
+        self.rgba[:] = BACKGROUND_RGBA
+
+        self.version = 0
+        self.point_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def x_max(self):
+        return self.x_min + (self.x_count - 1) * self.x_step
+
+    @property
+    def angle_max(self):
+        return self.angle_min + (self.angle_count - 1) * self.angle_step
+
+    def update(self, x_pos, angle_deg, radius_error):
+        """
+        按批写入测量结果，落在同一网格单元的点以后写入的为准
+
+        Args:
+            x_pos: numpy数组，X位置
+            angle_deg: numpy数组，角度(度)
+            radius_error: numpy数组，半径误差
+        """
+        ix = np.rint((np.asarray(x_pos) - self.x_min) / self.x_step).astype(np.int64)
+        ia = np.rint((np.asarray(angle_deg) - self.angle_min) / self.angle_step).astype(np.int64)
+        radius_error = np.asarray(radius_error, dtype=np.float64)
+        inside = ((ix >= 0) & (ix < self.x_count) & (ia >= 0) & (ia < self.angle_count) &
+                  np.isfinite(radius_error))
+        if not inside.any():
+            return
+
+        rows = self.angle_count - 1 - ia[inside]
+        cols = ix[inside]
+        values = radius_error[inside]
+        levels = np.searchsorted(self.edges, values, side='left')
+
+        with self._lock:
+            self.errors[rows, cols] = values
+            self.rgba[rows, cols] = self.palette[levels]
+            self.point_count += len(values)
+            self.version += 1
+
+    def clear(self):
+        """清空全部测量结果"""
+        with self._lock:
+            self.errors[:] = np.nan
+            self.rgba[:] = BACKGROUND_RGBA
+            self.point_count = 0
+            self.version += 1
+
+    def to_qimage(self):
+        """
+        生成当前颜色缓冲区的 QImage（拷贝一次，避免绘制时与写入线程竞争）
+
+        Returns:
+            QImage，宽 = X网格数，高 = 角度网格数
+        """
+        with self._lock:
+            image = QImage(self.rgba.data, self.x_count, self.angle_count, self.x_count * 4,
+                           QImage.Format_RGBA8888)
+            # QImage 不持有 numpy 缓冲区，拷贝一份使其拥有独立数据
+            return image.copy()
+
+
+class DeviationMapWidget(QWidget):
+    """偏差展开图显示部件 - 每次刷新只绘制一张图像"""
+
+    MARGIN_LEFT = 48
+    MARGIN_BOTTOM = 28
+    MARGIN_TOP = 8
+    MARGIN_RIGHT = 12
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.deviation_map = None
+        self._image = None
+        self._image_version = -1
+        self.setMinimumSize(200, 150)
+
+    def set_map(self, deviation_map):
+        """设置要显示的偏差图"""
+        self.deviation_map = deviation_map
+        self._image = None
+        self._image_version = -1
+        self.update()
+
+    def refresh(self):
+        """偏差图有新数据时重绘（由界面定时器调用）"""
+        if self.deviation_map is not None and self.deviation_map.version != self._image_version:
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(255, 255, 255))
+
+        target = QRectF(self.MARGIN_LEFT, self.MARGIN_TOP,
+                        max(1, self.width() - self.MARGIN_LEFT - self.MARGIN_RIGHT),
+                        max(1, self.height() - self.MARGIN_TOP - self.MARGIN_BOTTOM))
+
+        if self.deviation_map is None:
+            painter.setPen(QColor(100, 116, 139))
+            painter.drawText(target, Qt.AlignCenter, "开始测量后显示 (X, θ) 偏差展开图")
+            painter.end()
+            return
+
+        if self.deviation_map.version != self._image_version:
+            self._image_version = self.deviation_map.version
+            self._image = self.deviation_map.to_qimage()
+
+        # 最近邻缩放，保持网格单元边界清晰
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        painter.drawImage(target, self._image)
+
+        # 坐标范围标注
+        painter.setPen(QColor(71, 85, 105))
+        deviation_map = self.deviation_map
+        bottom = target.bottom() + 4
+        painter.drawText(QRectF(target.left(), bottom, 80, 20), Qt.AlignLeft | Qt.AlignTop,
+                         f"{deviation_map.x_min:.0f}")
+        painter.drawText(QRectF(target.right() - 80, bottom, 80, 20), Qt.AlignRight | Qt.AlignTop,
+                         f"{deviation_map.x_max:.0f}")
+        painter.drawText(QRectF(target.center().x() - 60, bottom, 120, 20), Qt.AlignCenter | Qt.AlignTop,
+                         "X (mm)")
+        painter.drawText(QRectF(0, target.top(), self.MARGIN_LEFT - 4, 20), Qt.AlignRight | Qt.AlignTop,
+                         f"{deviation_map.angle_max:.0f}°")
+        painter.drawText(QRectF(0, target.bottom() - 20, self.MARGIN_LEFT - 4, 20),
+                         Qt.AlignRight | Qt.AlignBottom, f"{deviation_map.angle_min:.0f}°")
+        painter.end()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可合并的误差统计 - 分片/多进程分析的部分统计精确合并
+
+计数、极值、等级计数与固定分箱直方图直接相加；均值与方差按 Chan 等人的成对合并公式
+（计数、均值与离差平方和 M2）合并，结果与对全部误差一次计算在数学上相同，
+不依赖分片的划分方式。按固定顺序合并时结果可逐位复现
+"""
+
+import numpy as np
+
+
+# 误差直方图：固定分箱范围(mm)与分箱数，范围外的误差计入下溢/上溢计数
+HISTOGRAM_RANGE = (-1.0, 1.0)
+HISTOGRAM_BINS = 200
+
+# 误差等级数（合格、注意、超差、严重超差）
+LEVEL_COUNT = 4
+
+
+class ErrorStatistics:
+    """半径误差的可合并统计量"""
+
+    def __init__(self, bins=HISTOGRAM_BINS, hist_range=HISTOGRAM_RANGE):
+        """
+        Args:
+            bins: int，直方图分箱数
+            hist_range: (low, high)，直方图范围(mm)
+        """
+        self.bins = bins
+        self.hist_range = (float(hist_range[0]), float(hist_range[1]))
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.level_counts = np.zeros(LEVEL_COUNT, dtype=np.int64)
+        # [下溢, 分箱..., 上溢]
+        self.histogram = np.zeros(bins + 2, dtype=np.int64)
+
+    def add(self, errors, levels):
+        """
+        累加一批误差
+
+        Args:
+            errors: numpy数组，半径误差（忽略NaN）
+            levels: numpy数组，与 errors 对应的误差等级 0-3
+        """
+        errors = np.asarray(errors, dtype=np.float64)
+        finite = np.isfinite(errors)
+        if not finite.all():
+            errors, levels = errors[finite], np.asarray(levels)[finite]
+        if len(errors) == 0:
+            return
+
+        batch = ErrorStatistics(self.bins, self.hist_range)
+        batch.count = len(errors)
+        batch.mean = float(errors.mean())
+        batch.m2 = float(np.sum((errors - batch.mean) ** 2))
+        batch.min = float(errors.min())
+        batch.max = float(errors.max())
+        batch.level_counts = np.bincount(levels, minlength=LEVEL_COUNT).astype(np.int64)
+
+        low, high = self.hist_range
+        index = np.floor((errors - low) * (self.bins / (high - low))).astype(np.int64)
+        # 恰好等于上界的误差计入最后一个分箱（与 numpy.histogram 一致）
+        index[errors == high] = self.bins - 1
+        batch.histogram = np.bincount(np.clip(index + 1, 0, self.bins + 1), minlength=self.bins + 2)
+        self.merge(batch)
+
+    def merge(self, other):
+        """
+        合并另一份部分统计（分箱设置必须相同）
+
+        Returns:
+            self
+        """
+        if other.bins != self.bins or other.hist_range != self.hist_range:
+            raise ValueError("直方图分箱设置不同，无法合并")
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+        else:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+            self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.level_counts += other.level_counts
+        self.histogram += other.histogram
+        return self
+
+    @property
+    def variance(self):
+        """总体方差（与 numpy.var 的默认 ddof=0 一致）"""
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance)) if self.count else np.nan
+
+    @property
+    def rms(self):
+        return float(np.sqrt(self.variance + self.mean ** 2)) if self.count else np.nan
+
+    def bin_edges(self):
+        """直方图分箱边界（不含下溢/上溢）"""
+        return np.linspace(self.hist_range[0], self.hist_range[1], self.bins + 1)
+
+    def to_dict(self):
+        """汇总统计（字段与批量分析汇总表的列一致）"""
+        summary = {
+            'points': int(self.count),
+            'mean_error': float(self.mean) if self.count else np.nan,
+            'std_error': self.std,
+            'rms_error': self.rms,
+            'min_error': float(self.min) if self.count else np.nan,
+            'max_error': float(self.max) if self.count else np.nan,
+            # 合格等级即 |误差| 不超过合格阈值
+            'within_tolerance_count': int(self.level_counts[0]),
+        }
+        summary.update(zip(('qualified_count', 'attention_count', 'over_limit_count', 'severe_count'),
+                           self.level_counts.tolist()))
+        return summary
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+形状误差模块 - 截面圆拟合、圆度与圆柱度评定
+
+按X站位将测量点划分为截面圈，对每圈在YZ平面内拟合圆：
+- 最小二乘圆：代数拟合（Kasa）初值 + 几何距离Gauss-Newton迭代
+- 最小区域圆：以最小二乘圆心为初值，对两同心圆半径差进行向量化模式搜索
+圆度为截面点到圆心距离的峰谷值；圆柱度以各截面最小二乘圆心拟合轴线，
+取全部测量点到轴线距离的峰谷值
+"""
+
+import numpy as np
+
+
+# 截面圈至少需要的点数
+MIN_RING_POINTS = 8
+
+# 同一X站位的判定容差(mm)
+STATION_TOLERANCE = 0.5
+
+# 最小二乘圆几何迭代参数
+LS_MAX_ITERATIONS = 20
+LS_TOLERANCE = 1e-10
+
+# 最小区域圆模式搜索参数
+MZ_MAX_ITERATIONS = 500
+MZ_MIN_STEP = 1e-7  # 搜索步长下限(mm)
+
+# 模式搜索的8个方向
+_SEARCH_DIRECTIONS = np.array([
+    [1.0, 0.0], [-1.0, 0.0], [0.0, 1.0], [0.0, -1.0],
+    [0.70710678, 0.70710678], [-0.70710678, 0.70710678],
+    [0.70710678, -0.70710678], [-0.70710678, -0.70710678],
+])
+
+
+def fit_circle_kasa(points):
+    """
+    代数最小二乘圆拟合（Kasa）：x² + y² = a·x + b·y + c
+
+    Args:
+        points: numpy数组 (N, 2)
+
+    Returns:
+        (center, radius)
+    """
+    design = np.column_stack([points, np.ones(len(points))])
+    rhs = np.einsum('ij,ij->i', points, points)
+    (a, b, c), *_ = np.linalg.lstsq(design, rhs, rcond=None)
+    center = np.array([a / 2.0, b / 2.0])
+    radius = float(np.sqrt(max(c + center @ center, 0.0)))
+    return center, radius
+
+
+def fit_circle_least_squares(points, center=None, radius=None):
+    """
+    几何最小二乘圆拟合：最小化 Σ(|p_i - c| - r)²
+
+    Args:
+        points: numpy数组 (N, 2)
+        center: numpy数组 (2,)，初始圆心（可选，缺省时使用Kasa拟合）
+        radius: float，初始半径（可选）
+
+    Returns:
+        (center, radius)
+    """
+    if center is None or radius is None:
+        center, radius = fit_circle_kasa(points)
+    center = np.array(center, dtype=np.float64)
+
+    for _ in range(LS_MAX_ITERATIONS):
+        offset = points - center
+        distance = np.maximum(np.hypot(offset[:, 0], offset[:, 1]), 1e-12)
+        residual = distance - radius
+        jacobian = np.column_stack([-offset / distance[:, np.newaxis], -np.ones(len(points))])
+        step, *_ = np.linalg.lstsq(jacobian, -residual, rcond=None)
+        center += step[:2]
+        radius += step[2]
+        if step @ step < LS_TOLERANCE**2:
+            break
+
+    return center, float(radius)
+
+
+def radial_deviation(points, center):
+    """截面点到圆心的距离"""
+    offset = points - center
+    return np.hypot(offset[:, 0], offset[:, 1])
+
+
+def fit_circle_minimum_zone(points, center=None):
+    """
+    最小区域圆拟合：求使外接、内切同心圆半径差最小的圆心
+
+    Args:
+        points: numpy数组 (N, 2)
+        center: numpy数组 (2,)，初始圆心（可选，缺省时使用最小二乘圆心）
+
+    Returns:
+        (center, inner_radius, outer_radius)
+    """
+    if center is None:
+        center, _ = fit_circle_least_squares(points)
+    center = np.array(center, dtype=np.float64)
+
+    distance = radial_deviation(points, center)
+    best = float(np.ptp(distance))
+    step = max(best, MZ_MIN_STEP * 10)
+
+    for _ in range(MZ_MAX_ITERATIONS):
+        if step < MZ_MIN_STEP:
+            break
+        # 同时评估8个方向的候选圆心
+        candidates = center + step * _SEARCH_DIRECTIONS
+        offsets = points[np.newaxis, :, :] - candidates[:, np.newaxis, :]
+        zones = np.ptp(np.hypot(offsets[:, :, 0], offsets[:, :, 1]), axis=1)
+        best_index = int(np.argmin(zones))
+        if zones[best_index] < best:
+            best = float(zones[best_index])
+            center = candidates[best_index]
+        else:
+            step *= 0.5
+
+    distance = radial_deviation(points, center)
+    return center, float(distance.min()), float(distance.max())
+
+
+def evaluate_section(points, x_position=None):
+    """
+    评定单个截面的圆度
+
+    Args:
+        points: numpy数组 (N, 2)，截面点的 (y, z) 坐标
+        x_position: float，截面X位置（可选）
+
+    Returns:
+        dict：最小二乘圆与最小区域圆的圆心、半径和圆度
+    """
+    ls_center, ls_radius = fit_circle_least_squares(points)
+    ls_deviation = radial_deviation(points, ls_center) - ls_radius
+    mz_center, inner_radius, outer_radius = fit_circle_minimum_zone(points, ls_center)
+
+    return {
+        'x': x_position,
+        'point_count': len(points),
+        'ls_center': (float(ls_center[0]), float(ls_center[1])),
+        'ls_radius': ls_radius,
+        'roundness_ls': float(np.ptp(ls_deviation)),
+        'mz_center': (float(mz_center[0]), float(mz_center[1])),
+        'mz_radius': 0.5 * (inner_radius + outer_radius),
+        'roundness_mz': outer_radius - inner_radius,
+    }
+
+
+def evaluate_cylindricity(points, sections):
+    """
+    评定圆柱度：以各截面最小二乘圆心线性拟合轴线，取测量点到轴线距离的峰谷值
+
+    Args:
+        points: numpy数组 (N, 3)，全部截面的测量点
+        sections: list of dict，evaluate_section() 的结果（至少2个截面）
+
+    Returns:
+        dict 或 None（截面不足）
+    """
+    if len(sections) < 2:
+        return None
+
+    section_x = np.array([s['x'] for s in sections], dtype=np.float64)
+    centers = np.array([s['ls_center'] for s in sections], dtype=np.float64)
+    if np.ptp(section_x) <= 0:
+        return None
+
+    # 轴线：center(x) = origin + slope·x
+    design = np.column_stack([np.ones(len(section_x)), section_x])
+    (origin, slope), *_ = np.linalg.lstsq(design, centers, rcond=None)
+
+    direction = np.array([1.0, slope[0], slope[1]])
+    direction /= np.linalg.norm(direction)
+    offset = points - np.array([0.0, origin[0], origin[1]])
+    distance = np.linalg.norm(np.cross(offset, direction), axis=1)
+
+    return {
+        'section_count': len(sections),
+        'point_count': len(points),
+        'axis_origin': (float(origin[0]), float(origin[1])),
+        'axis_direction': tuple(float(v) for v in direction),
+        'radius': float(distance.mean()),
+        'cylindricity': float(np.ptp(distance)),
+    }
+
+
+class FormMetricsTracker:
+    """
+    形状误差增量评定 - 按扫描顺序累计测量点，截面圈完成时即时评定
+
+    硬件按X站位逐圈扫描，测量点的X位置变化即表示上一圈完成
+    """
+
+    def __init__(self, min_ring_points=MIN_RING_POINTS, station_tolerance=STATION_TOLERANCE):
+        """
+        Args:
+            min_ring_points: int，参与评定的截面最少点数
+            station_tolerance: float，同一X站位的判定容差(mm)
+        """
+        self.min_ring_points = min_ring_points
+        self.station_tolerance = station_tolerance
+        self.reset()
+
+    def reset(self):
+        """清空全部截面"""
+        self.sections = []
+        self.section_points = []
+        self.current_x = None
+        self.current_points = []
+
+    def add_points(self, x_positions, points):
+        """
+        追加一批测量点
+
+        Args:
+            x_positions: numpy数组 (N,)，测量时的X站位
+            points: numpy数组 (N, 3)，测量点笛卡尔坐标
+
+        Returns:
+            list of dict，本批次中完成评定的截面
+        """
+        if len(x_positions) == 0:
+            return []
+
+        # 找出批次内X站位切换的位置
+        previous = np.concatenate([[x_positions[0] if self.current_x is None else self.current_x],
+                                   x_positions[:-1]])
+        breaks = np.flatnonzero(np.abs(x_positions - previous) > self.station_tolerance)
+
+        completed = []
+        start = 0
+        for index in breaks:
+            self.current_points.append(points[start:index])
+            section = self._close_ring()
+            if section is not None:
+                completed.append(section)
+            start = index
+            self.current_x = float(x_positions[index])
+
+        if self.current_x is None:
+            self.current_x = float(x_positions[0])
+        self.current_points.append(points[start:])
+        return completed
+
+    def finish(self):
+        """结束扫描，评定最后一圈"""
+        section = self._close_ring()
+        self.current_x = None
+        return [section] if section is not None else []
+
+    def _close_ring(self):
+        """评定当前圈并开始新的一圈"""
+        if not self.current_points:
+            return None
+        points = np.concatenate(self.current_points)
+        self.current_points = []
+        if len(points) < self.min_ring_points:
+            return None
+
+        section = evaluate_section(points[:, 1:], float(np.mean(points[:, 0])))
+        self.sections.append(section)
+        self.section_points.append(points)
+        return section
+
+    def cylindricity(self):
+        """以已完成的截面评定圆柱度"""
+        if len(self.sections) < 2:
+            return None
+        return evaluate_cylindricity(np.concatenate(self.section_points), self.sections)
+
+    def summary(self):
+        """已完成截面的圆度汇总"""
+        if not self.sections:
+            return {'section_count': 0, 'max_roundness_ls': 0.0, 'max_roundness_mz': 0.0}
+        return {
+            'section_count': len(self.sections),
+            'max_roundness_ls': max(s['roundness_ls'] for s in self.sections),
+            'max_roundness_mz': max(s['roundness_mz'] for s in self.sections),
+        }
@@ -7,12 +7,19 @@
 - 长度: 2000mm (X轴)
 - 直径: 1000mm (半径500mm)
 - 采样间隔: 10mm
+
+点云生成与保存使用 pointcloud_generator 的向量化实现，默认不弹出图形窗口：
+    python generate_semicylinder.py                 # 生成CSV并保存预览图
+    python generate_semicylinder.py --no-plot       # 仅生成数据（无界面环境）
+    python generate_semicylinder.py --show          # 生成后显示图形窗口
+    python generate_semicylinder.py -o data/semicylinder_pointcloud.npy   # 二进制输出
 """
 
+import os
+import argparse
 import numpy as np
-import csv
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+
+from pointcloud_generator import save_pointcloud as save_pointcloud_file
 
 def generate_semicylinder_pointcloud():
     """生成半圆柱体点云数据"""
@@ -30,63 +37,51 @@ def generate_semicylinder_pointcloud():
     print(f"Length: {length}mm, Radius: {radius}mm, Step: {step}mm")
     print(f"Points: {x_points} x {theta_points} = {x_points * theta_points} total points")
     
-    # 生成点云数据
-    points = []
-    
-    for i in range(x_points):
-        x = i * step  # X坐标
-        
-        for j in range(theta_points):
-            theta = j * np.pi / (theta_points - 1)  # 角度从0到π
-            
-            # 半圆柱体参数方程
-            y = radius * np.cos(theta)  # Y坐标
-            z = radius * np.sin(theta)  # Z坐标
-            
-            points.append([x, y, z])
-    
-    return points
+    # 生成点云数据：X站位优先、角度次之，角度从0到π
+    x_values = np.arange(x_points) * step
+    theta = np.arange(theta_points) * np.pi / (theta_points - 1)
+
+    points = np.empty((x_points, theta_points, 3), dtype=np.float64)
+    points[:, :, 0] = x_values[:, np.newaxis]
+    points[:, :, 1] = radius * np.cos(theta)  # Y坐标
+    points[:, :, 2] = radius * np.sin(theta)  # Z坐标
+
+    return points.reshape(-1, 3)
 
 def save_pointcloud(points, filename="data/semicylinder_pointcloud.csv"):
-    """保存点云数据到CSV文件"""
-    
-    import os
-    
-    # 确保data目录存在
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    
+    """保存点云数据到文件（.npy 为二进制格式，其余为CSV）"""
+
     print(f"Saving {len(points)} points to {filename}...")
-    
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        
-        # 写入CSV头部（只包含x,y,z坐标）
-        writer.writerow(['x_mm', 'y_mm', 'z_mm'])
-        
-        # 写入数据（只写x,y,z坐标）
-        for point in points:
-            writer.writerow([f"{point[0]:.3f}", f"{point[1]:.3f}", f"{point[2]:.3f}"])
-    
+
+    # 只包含x,y,z坐标（x_mm, y_mm, z_mm）
+    save_pointcloud_file(points, filename)
+
     print(f"Point cloud saved successfully!")
 
-def plot_pointcloud(points, sample_ratio=0.1):
+def plot_pointcloud(points, sample_ratio=0.1, show=False):
     """绘制3D点云图形"""
-    
+
+    import matplotlib
+    if not show:
+        # 不显示窗口时使用无界面后端
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     print(f"Creating 3D visualization...")
     
     # 为了提高显示性能，对点云进行采样
     if len(points) > 2000:
         sample_size = max(1000, int(len(points) * sample_ratio))
         indices = np.random.choice(len(points), sample_size, replace=False)
-        sampled_points = [points[i] for i in sorted(indices)]
+        sampled_points = points[np.sort(indices)]
         print(f"Sampling {len(sampled_points)} points from {len(points)} total points")
     else:
         sampled_points = points
     
     # 提取坐标
-    x_coords = [p[0] for p in sampled_points]
-    y_coords = [p[1] for p in sampled_points] 
-    z_coords = [p[2] for p in sampled_points]
+    x_coords = sampled_points[:, 0]
+    y_coords = sampled_points[:, 1]
+    z_coords = sampled_points[:, 2]
     
     # 创建3D图形
     fig = plt.figure(figsize=(12, 9))
@@ -130,7 +125,6 @@ def plot_pointcloud(points, sample_ratio=0.1):
     plt.tight_layout()
     
     # 确保figures目录存在
-    import os
     os.makedirs('figures', exist_ok=True)
     
     # 保存图像
@@ -138,34 +132,43 @@ def plot_pointcloud(points, sample_ratio=0.1):
     print("3D visualization saved as: figures/semicylinder_pointcloud.png")
 
     # 显示图形
-    plt.show()
+    if show:
+        plt.show()
 
-def main():
+def main(argv=None):
     """主函数"""
+    parser = argparse.ArgumentParser(description="Semicylinder point cloud generator")
+    parser.add_argument('-o', '--output', default="data/semicylinder_pointcloud.csv",
+                        help="output file (.npy for binary, otherwise CSV)")
+    parser.add_argument('--no-plot', action='store_true', help="skip the 3D preview figure")
+    parser.add_argument('--show', action='store_true', help="show the preview figure window")
+    args = parser.parse_args(argv)
+
     print("=" * 50)
     print("Semicylinder Point Cloud Generator")
     print("=" * 50)
-    
+
     # 生成点云
     points = generate_semicylinder_pointcloud()
-    
+
     # 保存数据
-    save_pointcloud(points)
-    
+    save_pointcloud(points, args.output)
+
     # 绘制3D可视化
-    plot_pointcloud(points)
-    
+    if not args.no_plot:
+        plot_pointcloud(points, show=args.show)
+
     # 显示统计信息
-    x_coords = [p[0] for p in points]
-    y_coords = [p[1] for p in points]
-    z_coords = [p[2] for p in points]
-    
+    x_coords = points[:, 0]
+    y_coords = points[:, 1]
+    z_coords = points[:, 2]
+
     print("\nPoint Cloud Statistics:")
     print(f"Total points: {len(points)}")
-    print(f"X range: {min(x_coords):.1f} to {max(x_coords):.1f} mm")
-    print(f"Y range: {min(y_coords):.1f} to {max(y_coords):.1f} mm")
-    print(f"Z range: {min(z_coords):.1f} to {max(z_coords):.1f} mm")
-    print("\nOutput file: data/semicylinder_pointcloud.csv")
+    print(f"X range: {x_coords.min():.1f} to {x_coords.max():.1f} mm")
+    print(f"Y range: {y_coords.min():.1f} to {y_coords.max():.1f} mm")
+    print(f"Z range: {z_coords.min():.1f} to {z_coords.max():.1f} mm")
+    print(f"\nOutput file: {args.output}")
     print("Done!")
 
 if __name__ == "__main__":
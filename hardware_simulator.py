@@ -13,6 +13,10 @@ import random
 import numpy as np
 import pandas as pd
 from PySide6.QtCore import QThread, Signal
+from app_logging import get_logger
+
+
+logger = get_logger('simulator')
 
 
 class HardwareSimulator(QThread):
@@ -24,7 +28,8 @@ class HardwareSimulator(QThread):
     measurement_error = Signal(str)  # 错误信号
     progress_updated = Signal(int, int)  # 进度更新 (当前点, 总点数)
     
-    def __init__(self, theoretical_data, measurement_params, output_file_path="live_measurement.csv"):
+    def __init__(self, theoretical_data, measurement_params, output_file_path="live_measurement.csv",
+                 pipeline_metrics=None, station_metrics=None):
         """
         初始化硬件模拟器
         
@@ -36,12 +41,16 @@ class HardwareSimulator(QThread):
                     'rot_step': float, 'measurement_delay': float
                 }
             output_file_path: str，输出文件路径
+            pipeline_metrics: PipelineMetrics，流水线指标（可选），记录采集与写文件阶段
+            station_metrics: StationMetrics，指标端点计数（可选），记录已测量点数
         """
         super().__init__()
         
         self.theoretical_data = theoretical_data
         self.measurement_params = measurement_params
         self.output_file_path = output_file_path
+        self.pipeline_metrics = pipeline_metrics
+        self.station_metrics = station_metrics
         self.is_running = False
         self.is_paused = False
         
@@ -50,7 +59,7 @@ class HardwareSimulator(QThread):
         self.systematic_error = 0.02  # 系统性误差 (固定偏移)
         self.random_noise_level = 0.05  # 随机噪声级别
         
-        print(f"HardwareSimulator初始化完成，理论数据点数: {len(theoretical_data)}")
+        logger.info(f"HardwareSimulator初始化完成，理论数据点数: {len(theoretical_data)}")
         
     def run(self):
         """主运行函数 - 在独立线程中执行"""
@@ -58,14 +67,14 @@ class HardwareSimulator(QThread):
             self.is_running = True
             self.simulate_measurement_process()
         except Exception as e:
-            print(f"硬件模拟器运行出错: {e}")
+            logger.error(f"硬件模拟器运行出错: {e}")
             self.measurement_error.emit(f"硬件模拟器错误: {str(e)}")
         finally:
             self.is_running = False
             
     def simulate_measurement_process(self):
         """模拟整个测量过程"""
-        print("开始硬件模拟测量过程...")
+        logger.info("开始硬件模拟测量过程...")
         
         # 清空或创建输出文件
         self.initialize_output_file()
@@ -74,7 +83,7 @@ class HardwareSimulator(QThread):
         measurement_points = self.filter_measurement_points()
         total_points = len(measurement_points)
         
-        print(f"根据测量参数，需要测量 {total_points} 个点")
+        logger.info(f"根据测量参数，需要测量 {total_points} 个点")
         
         # 逐个测量点进行模拟
         for i, (index, row) in enumerate(measurement_points.iterrows()):
@@ -90,26 +99,18 @@ class HardwareSimulator(QThread):
                 
             # 执行单点测量模拟
             sequence = i + 1
-            x_ideal, y_ideal, z_ideal = row['x_mm'], row['y_mm'], row['z_mm']
-            
-            # 逆向计算：笛卡尔坐标 → 硬件原始读数
-            # 硬件坐标系统：
-            # - X位置：直接对应 x_ideal
-            # - 测量半径：从原点到(y, z)的距离
-            # - 角度：相对于Y轴的角度
-            x_pos = x_ideal
-            ideal_radius = math.sqrt(y_ideal**2 + z_ideal**2)
-            
-            # 角度计算：使用atan2(z, y)来获得相对于Y轴的角度
-            # 这样cos(angle) = y/radius, sin(angle) = z/radius
-            angle_rad = math.atan2(z_ideal, y_ideal)
-            angle_deg = math.degrees(angle_rad)
-            
-            # 模拟测量误差
-            measured_radius = self.simulate_measurement_error(ideal_radius, sequence)
+            x_pos, angle_deg, measured_radius = self.measure_point(row, sequence)
+            if self.pipeline_metrics is not None:
+                self.pipeline_metrics.mark('acquire', sequence)
+                self.pipeline_metrics.count('acquire')
             
             # 写入数据到文件
             self.write_measurement_data(sequence, x_pos, angle_deg, measured_radius)
+            if self.pipeline_metrics is not None:
+                self.pipeline_metrics.mark('file_write', sequence)
+                self.pipeline_metrics.count('file_write')
+            if self.station_metrics is not None:
+                self.station_metrics.record_measured(sequence)
             
             # 发射信号
             self.measurement_point.emit(sequence, x_pos, angle_deg, measured_radius)
@@ -119,9 +120,39 @@ class HardwareSimulator(QThread):
             measurement_delay = self.measurement_params.get('measurement_delay', 0.05)
             time.sleep(measurement_delay)
             
-        print("硬件模拟测量过程完成")
+        logger.info("硬件模拟测量过程完成")
         self.measurement_finished.emit()
         
+    def measure_point(self, row, sequence):
+        """
+        模拟单点测量：理论点 → 硬件原始读数（含测量误差）
+        
+        Args:
+            row: 理论点（含 x_mm, y_mm, z_mm）
+            sequence: int，测量序号
+            
+        Returns:
+            (X位置, 角度, 测量半径)
+        """
+        x_ideal, y_ideal, z_ideal = row['x_mm'], row['y_mm'], row['z_mm']
+        
+        # 逆向计算：笛卡尔坐标 → 硬件原始读数
+        # 硬件坐标系统：
+        # - X位置：直接对应 x_ideal
+        # - 测量半径：从原点到(y, z)的距离
+        # - 角度：相对于Y轴的角度
+        x_pos = x_ideal
+        ideal_radius = math.sqrt(y_ideal**2 + z_ideal**2)
+        
+        # 角度计算：使用atan2(z, y)来获得相对于Y轴的角度
+        # 这样cos(angle) = y/radius, sin(angle) = z/radius
+        angle_rad = math.atan2(z_ideal, y_ideal)
+        angle_deg = math.degrees(angle_rad)
+        
+        # 模拟测量误差
+        measured_radius = self.simulate_measurement_error(ideal_radius, sequence)
+        return x_pos, angle_deg, measured_radius
+        
     def filter_measurement_points(self):
         """根据测量参数筛选需要测量的点 - 改进的循环旋转模式"""
         x_min = self.measurement_params.get('x_min', -5.0)
@@ -147,7 +178,7 @@ class HardwareSimulator(QThread):
                 selected_x_values.append(closest_x)
             current_x += x_step
         
-        print(f"选择的X坐标: {len(selected_x_values)} 个")
+        logger.info(f"选择的X坐标: {len(selected_x_values)} 个")
         
         # 改进的循环旋转测量模式
         measurement_points = []
@@ -195,7 +226,7 @@ class HardwareSimulator(QThread):
                         measurement_points.append(closest_angle_data[1])
                     current_angle -= rot_step
                     
-        print(f"生成的测量点: {len(measurement_points)} 个")
+        logger.info(f"生成的测量点: {len(measurement_points)} 个")
         
         # 转换为DataFrame并按测量顺序排序
         if measurement_points:
@@ -248,10 +279,10 @@ class HardwareSimulator(QThread):
             with open(self.output_file_path, 'w', encoding='utf-8') as f:
                 f.write("sequence,x_pos_mm,angle_deg,measured_radius_mm\n")
                 
-            print(f"输出文件已初始化: {self.output_file_path}")
+            logger.info(f"输出文件已初始化: {self.output_file_path}")
             
         except Exception as e:
-            print(f"初始化输出文件失败: {e}")
+            logger.error(f"初始化输出文件失败: {e}")
             raise
             
     def write_measurement_data(self, sequence, x_pos, angle_deg, measured_radius):
@@ -261,21 +292,21 @@ class HardwareSimulator(QThread):
                 f.write(f"{sequence},{x_pos:.3f},{angle_deg:.3f},{measured_radius:.6f}\n")
                 
         except Exception as e:
-            print(f"写入测量数据失败: {e}")
+            logger.error(f"写入测量数据失败: {e}")
             
     def pause(self):
         """暂停测量"""
         self.is_paused = True
-        print("硬件模拟器已暂停")
+        logger.info("硬件模拟器已暂停")
         
     def resume(self):
         """恢复测量"""
         self.is_paused = False
-        print("硬件模拟器已恢复")
+        logger.info("硬件模拟器已恢复")
         
     def stop(self):
         """停止测量"""
         self.is_running = False
         self.is_paused = False
-        print("硬件模拟器已停止")
+        logger.info("硬件模拟器已停止")
         
\ No newline at end of file
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+索引缓存模块 - 理论数据索引的持久化磁盘缓存
+
+以理论数据指纹和索引参数作为键，将预构建的索引数组保存到缓存目录，
+按总占用空间进行LRU淘汰
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import numpy as np
+from app_logging import get_logger
+
+
+logger = get_logger('cache')
+
+
+class IndexCache:
+    """理论索引磁盘缓存 - 每个条目为一个 .npz 文件，按访问时间进行LRU淘汰"""
+
+    FILE_SUFFIX = ".npz"
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        """
+        初始化索引缓存
+
+        Args:
+            cache_dir: str，缓存目录
+            max_bytes: int，缓存总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(kind, fingerprint, params=None):
+        """
+        生成缓存键
+
+        Args:
+            kind: str，缓存条目类型（如 'lookup'）
+            fingerprint: str，理论数据指纹
+            params: dict，影响条目内容的参数
+
+        Returns:
+            str，可用作文件名的缓存键
+        """
+        params_text = json.dumps(params or {}, sort_keys=True)
+        params_hash = hashlib.sha1(params_text.encode('utf-8')).hexdigest()[:12]
+        return f"{kind}-{fingerprint[:24]}-{params_hash}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.FILE_SUFFIX)
+
+    def get(self, key):
+        """
+        读取缓存条目
+
+        Args:
+            key: str，缓存键
+
+        Returns:
+            dict（数组名 -> numpy数组）或 None
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # 缓存文件损坏时删除，后续重新构建
+            logger.error(f"读取索引缓存失败，已丢弃: {e}")
+            self._remove(path)
+            return None
+
+        # 更新访问时间，作为LRU依据
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return arrays
+
+    def put(self, key, arrays):
+        """
+        写入缓存条目并按大小上限淘汰旧条目
+
+        Args:
+            key: str，缓存键
+            arrays: dict，数组名 -> numpy数组
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            # 先写临时文件再原子替换，避免读到写了一半的文件
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.savez(f, **arrays)
+                os.replace(tmp_path, self._path(key))
+            except Exception:
+                self._remove(tmp_path)
+                raise
+
+            self.evict()
+
+        except Exception as e:
+            logger.error(f"写入索引缓存失败: {e}")
+
+    def evict(self):
+        """按最近访问时间淘汰条目，直到总大小不超过上限"""
+        with self._lock:
+            entries = []
+            total_bytes = 0
+            try:
+                names = os.listdir(self.cache_dir)
+            except FileNotFoundError:
+                return
+
+            for name in names:
+                if not name.endswith(self.FILE_SUFFIX):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_bytes += stat.st_size
+
+            # 最久未使用的条目优先淘汰
+            entries.sort()
+            for _, size, path in entries:
+                if total_bytes <= self.max_bytes:
+                    break
+                self._remove(path)
+                total_bytes -= size
+
+    def clear(self):
+        """清空缓存目录中的所有条目"""
+        with self._lock:
+            if not os.path.isdir(self.cache_dir):
+                return
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(self.FILE_SUFFIX):
+                    self._remove(os.path.join(self.cache_dir, name))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志查看器 - 显示内存环形缓冲区中的日志，可按级别与类别筛选
+"""
+
+import time
+import logging
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+                               QPlainTextEdit, QPushButton, QCheckBox)
+
+from app_logging import get_ring_buffer
+
+
+# 自动刷新间隔(ms)
+LOG_VIEWER_REFRESH_INTERVAL = 500
+
+# 最多显示的条数
+LOG_VIEWER_MAX_LINES = 2000
+
+LEVELS = [('全部', logging.NOTSET), ('DEBUG', logging.DEBUG), ('INFO', logging.INFO),
+          ('WARNING', logging.WARNING), ('ERROR', logging.ERROR)]
+
+
+class LogViewerDialog(QDialog):
+    """日志查看器对话框"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("日志查看器")
+        self.resize(900, 500)
+        self.ring_buffer = get_ring_buffer()
+        self._shown_total = -1
+
+        layout = QVBoxLayout(self)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("级别:"))
+        self.level_combo = QComboBox()
+        for name, level in LEVELS:
+            self.level_combo.addItem(name, level)
+        self.level_combo.currentIndexChanged.connect(self.refresh)
+        filter_layout.addWidget(self.level_combo)
+
+        filter_layout.addWidget(QLabel("类别:"))
+        self.category_combo = QComboBox()
+        self.category_combo.addItem("全部", None)
+        self.category_combo.currentIndexChanged.connect(self.refresh)
+        filter_layout.addWidget(self.category_combo)
+
+        self.auto_refresh_check = QCheckBox("自动刷新")
+        self.auto_refresh_check.setChecked(True)
+        filter_layout.addWidget(self.auto_refresh_check)
+        filter_layout.addStretch()
+
+        clear_btn = QPushButton("清空")
+        clear_btn.clicked.connect(self.clear_logs)
+        filter_layout.addWidget(clear_btn)
+        layout.addLayout(filter_layout)
+
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setFont(QFont("monospace", 9))
+        self.text_edit.setMaximumBlockCount(LOG_VIEWER_MAX_LINES)
+        layout.addWidget(self.text_edit)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.auto_refresh)
+        self.timer.start(LOG_VIEWER_REFRESH_INTERVAL)
+        self.refresh()
+
+    def auto_refresh(self):
+        """缓冲区有新记录且开启自动刷新时更新显示"""
+        if self.auto_refresh_check.isChecked() and self.ring_buffer.total != self._shown_total:
+            self.refresh()
+
+    def refresh(self):
+        """按当前筛选条件重新显示日志"""
+        self._shown_total = self.ring_buffer.total
+        self.update_categories()
+
+        entries = self.ring_buffer.snapshot(self.level_combo.currentData(),
+                                            self.category_combo.currentData(),
+                                            LOG_VIEWER_MAX_LINES)
+        lines = [
+            f"{time.strftime('%H:%M:%S', time.localtime(e['time']))} "
+            f"{e['level']:<7s} [{e['category']}] {e['message']}"
+            for e in entries
+        ]
+        self.text_edit.setPlainText("\n".join(lines))
+        self.text_edit.verticalScrollBar().setValue(self.text_edit.verticalScrollBar().maximum())
+        self.status_label.setText(f"显示 {len(entries)} 条，缓冲区累计 {self.ring_buffer.total} 条")
+
+    def update_categories(self):
+        """将新出现的类别加入筛选列表"""
+        known = {self.category_combo.itemData(i) for i in range(self.category_combo.count())}
+        for category in self.ring_buffer.categories():
+            if category not in known:
+                self.category_combo.addItem(category, category)
+
+    def clear_logs(self):
+        """清空缓冲区"""
+        self.ring_buffer.clear()
+        self.refresh()
@@ -11,21 +11,32 @@ import os
 import random
 import math
 import numpy as np
-import pandas as pd
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QGridLayout, QFormLayout, QLabel, 
                                QPushButton, QLineEdit, QTableWidget, QTableWidgetItem,
                                QMenuBar, QToolBar, QSplitter, QFrame, QHeaderView,
-                               QSizePolicy, QFileDialog, QMessageBox, QScrollArea)
+                               QSizePolicy, QFileDialog, QMessageBox, QScrollArea,
+                               QTabWidget)
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QAction, QIcon, QFont, QPalette, QColor
 
 from config import AppConfig
 from styles import StyleManager
-from hardware_simulator import HardwareSimulator
-from analysis_worker import AnalysisWorker
-from hardware_simulator import HardwareSimulator
-from analysis_worker import AnalysisWorker
+from index_cache import IndexCache
+from deviation_map import DeviationMap, DeviationMapWidget
+from point_cloud_lod import PointCloudLOD
+from render_worker import (RenderWorker, RenderedView, draw_point_cloud_scene,
+                           draw_histogram_scene, MATPLOTLIB_AVAILABLE)
+from startup import call_after_first_paint, preload_modules
+from app_logging import get_logger
+from log_viewer import LogViewerDialog
+from pipeline_metrics import PipelineMetrics
+from pipeline_diagnostics import PipelineDiagnosticsDialog, PaintProbe
+
+
+logger = get_logger('ui')
+measurement_logger = get_logger('measurement')  # 逐点日志（热路径）
+progress_logger = get_logger('progress')        # 逐点进度（热路径）
 
 
 class MainWindow(QMainWindow):
@@ -56,20 +67,73 @@ class MainWindow(QMainWindow):
         self.hardware_simulator = None
         self.analysis_worker = None
         self.theoretical_data = None  # 存储加载的理论数据
-        
-        # 新增：3D可视化相关
-        self.matplotlib_canvas = None
-        self.matplotlib_figure = None
-        self.matplotlib_ax = None
-        self.theoretical_scatter = None  # 理论点云散点图
-        self.measured_scatter = None     # 测量点云散点图
+        self.reference_surface = None  # 解析参考曲面（加载曲面定义文件时有效）
+        
+        # 异步流水线模式（PIPELINE_MODE = 'asyncio'）：事件循环桥接在首次使用时创建
+        self.async_bridge = None
+        self.async_pipeline = None
+        
+        # 多工位会话（在会话面板首次打开时创建）
+        self.session_manager = None
+        self.session_monitor = None
+        
+        # 理论索引磁盘缓存：同一模具重复开始测量时无需重建索引
+        self.index_cache = IndexCache(AppConfig.INDEX_CACHE_DIR, AppConfig.INDEX_CACHE_MAX_BYTES)
+        
+        # 新增：3D可视化相关（图形由后台渲染线程绘制，界面只贴图）
+        self.point_cloud_view = None     # 3D视图显示部件
+        self.histogram_view = None       # 直方图显示部件
+        self.histogram_errors = []       # 直方图当前数据（尺寸变化时重新渲染）
+        self.theoretical_lod = None      # 理论点云显示用的体素金字塔
+        self.theoretical_lod_selection = None  # 当前显示的 (层级, 点数)
+        self.theoretical_display_points = None  # 当前LOD层级的显示点
+        self.full_view_limits = None     # 完整视野的坐标轴范围（用于重置视图）
+        self.view_limits = None          # 当前视野范围 (min_xyz, max_xyz)
+        self.view_elev = AppConfig.VIEW_DEFAULT_ELEV
+        self.view_azim = AppConfig.VIEW_DEFAULT_AZIM
         self.measured_points = []        # 存储测量点数据
+        self.log_viewer = None           # 日志查看器窗口
+        self.pipeline_diagnostics = None  # 流水线诊断窗口
+        
+        # 测量流水线分阶段延迟与吞吐量指标（采样默认关闭）
+        self.pipeline_metrics = PipelineMetrics(AppConfig.PIPELINE_SAMPLE_EVERY)
+        
+        # 本机指标端点（关闭时不创建计数对象，工作线程不做任何记录）
+        self.station_metrics = None
+        self.metrics_server = None
+        if AppConfig.METRICS_SERVER_ENABLED:
+            # 端点默认关闭，http.server 与 psutil 不在启动路径上导入
+            from metrics_server import StationMetrics, MetricsServer
+            self.station_metrics = StationMetrics()
+            self.metrics_server = MetricsServer(self.station_metrics, AppConfig.METRICS_SERVER_HOST,
+                                                AppConfig.METRICS_SERVER_PORT)
+            self.metrics_server.start()
+        
+        # 后台渲染线程（matplotlib 不可用时为 None）
+        self.render_worker = None
+        if MATPLOTLIB_AVAILABLE:
+            self.render_worker = RenderWorker()
+            self.render_worker.register_view('3d', draw_point_cloud_scene)
+            self.render_worker.register_view('histogram', draw_histogram_scene)
+            self.render_worker.frame_ready.connect(self.on_frame_ready)
         
         self.init_ui()
+        self.paint_probe = PaintProbe(self.data_table.viewport(), self.pipeline_metrics)
         self.setup_style()
         self.setup_connections()  # 设置信号连接
         self.init_timer()
         
+        # 渲染线程与重模块在窗口首次绘制后再启动/导入，不占用首帧时间
+        call_after_first_paint(self, self.on_first_paint)
+        
+    def on_first_paint(self):
+        """窗口首次绘制完成：启动后台渲染线程，并在后台预加载分析相关模块"""
+        if not self.isVisible():
+            return  # 首帧后窗口已关闭（如启动耗时分析模式）
+        if self.render_worker is not None and not self.render_worker.isRunning():
+            self.render_worker.start()
+        preload_modules(AppConfig.BACKGROUND_PRELOAD_MODULES)
+        
     def init_ui(self):
         """初始化用户界面"""
         # 设置主窗口属性
@@ -98,10 +162,89 @@ class MainWindow(QMainWindow):
         
         # 工具菜单
         tools_menu = menubar.addMenu('工具(&T)')
+        log_viewer_action = QAction('日志查看器(&L)', self)
+        log_viewer_action.triggered.connect(self.show_log_viewer)
+        tools_menu.addAction(log_viewer_action)
+        diagnostics_action = QAction('流水线诊断(&D)', self)
+        diagnostics_action.triggered.connect(self.show_pipeline_diagnostics)
+        tools_menu.addAction(diagnostics_action)
+        sessions_action = QAction('多工位会话(&S)', self)
+        sessions_action.triggered.connect(self.show_session_monitor)
+        tools_menu.addAction(sessions_action)
         
         # 帮助菜单
         help_menu = menubar.addMenu('帮助(&H)')
         
+    def show_log_viewer(self):
+        """打开日志查看器（非模态，重复打开时复用同一窗口）"""
+        if self.log_viewer is None:
+            self.log_viewer = LogViewerDialog(self)
+        self.log_viewer.show()
+        self.log_viewer.raise_()
+        
+    def show_pipeline_diagnostics(self):
+        """打开流水线诊断面板（非模态，重复打开时复用同一窗口）"""
+        if self.pipeline_diagnostics is None:
+            self.pipeline_diagnostics = PipelineDiagnosticsDialog(self.pipeline_metrics, self)
+        self.pipeline_diagnostics.show()
+        self.pipeline_diagnostics.raise_()
+        
+    def show_session_monitor(self):
+        """打开多工位会话面板（非模态，重复打开时复用同一窗口）"""
+        if self.session_monitor is None:
+            from session_manager import SessionManager
+            from session_monitor import SessionMonitorDialog
+            self.session_manager = SessionManager(
+                self.index_cache, AppConfig.SESSION_OUTPUT_DIR, AppConfig.SESSION_RECENT_RESULTS,
+                channel_options=dict(queue_size=AppConfig.ASYNC_QUEUE_SIZE, batch_size=AppConfig.ASYNC_BATCH_SIZE,
+                                     batch_interval=AppConfig.ASYNC_BATCH_INTERVAL)
+            )
+            self.session_monitor = SessionMonitorDialog(self.session_manager, self.create_measurement_session, self)
+        self.session_monitor.show()
+        self.session_monitor.raise_()
+        
+    def create_measurement_session(self):
+        """
+        按当前理论模型与测量参数新建并启动一个会话（模拟测头）
+        
+        Returns:
+            MeasurementSession 或 None（未加载模型或参数无效）
+        """
+        if self.theoretical_data is None:
+            QMessageBox.warning(self, "无法新建会话", "请先加载理论点云数据文件。")
+            return None
+        measurement_params = self.get_measurement_parameters()
+        if measurement_params is None:
+            return None
+            
+        from async_pipeline import SimulatedProbe
+        session = self.session_manager.create_session(
+            self.theoretical_data,
+            SimulatedProbe(self.theoretical_data, measurement_params),
+            mold_name=self.model_name_label.text(),
+            reference_surface=self.reference_surface,
+            normal_deviation=AppConfig.ENABLE_NORMAL_DEVIATION,
+            normal_deviation_k=AppConfig.NORMAL_DEVIATION_K,
+            tolerance_qualified=measurement_params['tolerance_qualified'],
+            tolerance_attention=measurement_params['tolerance_attention'],
+            tolerance_over_limit=measurement_params['tolerance_over_limit'],
+            probe_tip_radius=measurement_params['probe_tip_radius'],
+            alignment=AppConfig.ENABLE_ALIGNMENT,
+            alignment_interval=AppConfig.ALIGNMENT_UPDATE_INTERVAL,
+            alignment_sample_size=AppConfig.ALIGNMENT_SAMPLE_SIZE,
+            form_metrics=AppConfig.ENABLE_FORM_METRICS,
+            form_min_ring_points=AppConfig.FORM_MIN_RING_POINTS
+        )
+        self.session_manager.start(self.get_async_bridge().loop, session.name)
+        return session
+        
+    def get_async_bridge(self):
+        """界面线程中的 asyncio 事件循环桥接（首次使用时创建）"""
+        if self.async_bridge is None:
+            from async_pipeline import QtAsyncBridge
+            self.async_bridge = QtAsyncBridge(AppConfig.ASYNC_BRIDGE_INTERVAL, self)
+        return self.async_bridge
+        
     def create_toolbar(self):
         """创建工具栏"""
         toolbar = self.addToolBar('主工具栏')
@@ -352,6 +495,26 @@ class MainWindow(QMainWindow):
         rot_step_layout.addLayout(rot_step_inputs_layout)
         form_layout.addWidget(rot_step_container)
         
+        # 测头半径
+        tip_radius_container = QWidget()
+        tip_radius_layout = QVBoxLayout(tip_radius_container)
+        tip_radius_layout.setContentsMargins(0, 0, 0, 0)
+        tip_radius_layout.setSpacing(4)
+        
+        tip_radius_label = QLabel("测头半径")
+        tip_radius_layout.addWidget(tip_radius_label)
+        
+        tip_radius_inputs_layout = QHBoxLayout()
+        tip_radius_inputs_layout.setSpacing(6)
+        self.probe_tip_radius_input = QLineEdit(str(AppConfig.DEFAULT_PROBE_TIP_RADIUS))
+        self.probe_tip_radius_input.setFixedWidth(60)
+        self.probe_tip_radius_input.setMinimumHeight(24)
+        tip_radius_inputs_layout.addWidget(self.probe_tip_radius_input)
+        tip_radius_inputs_layout.addWidget(QLabel("mm"))
+        tip_radius_inputs_layout.addStretch()
+        tip_radius_layout.addLayout(tip_radius_inputs_layout)
+        form_layout.addWidget(tip_radius_container)
+        
         # 分隔线
         form_layout.addSpacing(8)
         separator = QFrame()
@@ -530,7 +693,14 @@ class MainWindow(QMainWindow):
         viz_label.setObjectName("placeholderText")
         self.viz_layout.addWidget(viz_label)
         
-        layout.addWidget(self.visualization_widget)
+        # 偏差展开图：(X, θ) 平面上的半径误差图像，定时整幅刷新
+        self.deviation_map_widget = DeviationMapWidget()
+        self.deviation_map_widget.setObjectName("deviationMapWidget")
+        
+        self.view_tabs = QTabWidget()
+        self.view_tabs.addTab(self.visualization_widget, "3D视图")
+        self.view_tabs.addTab(self.deviation_map_widget, "偏差展开图")
+        layout.addWidget(self.view_tabs)
         
         # 添加实时数据表格（位于中心面板下方）
         table_widget = self.create_data_table_widget()
@@ -581,11 +751,14 @@ class MainWindow(QMainWindow):
         # 设置表头
         header = self.data_table.horizontalHeader()
         header.setStretchLastSection(True)
-        header.setSectionResizeMode(QHeaderView.ResizeToContents)
         
         # 添加示例数据
         self.populate_sample_data()
         
+        # 列宽按示例数据计算一次（各列为定宽格式）；ResizeToContents 模式会在每次插入行时
+        # 遍历全部行重新计算列宽，长时间测量时插入开销随行数线性增长
+        self.data_table.resizeColumnsToContents()
+        
         layout.addWidget(self.data_table)
         
         return table_widget
@@ -631,6 +804,14 @@ class MainWindow(QMainWindow):
         stats_group = self.create_error_stats_group()
         layout.addWidget(stats_group)
         
+        # 形状误差（圆度/圆柱度）
+        form_group = self.create_form_metrics_group()
+        layout.addWidget(form_group)
+        
+        # 配准（最佳拟合）结果
+        alignment_group = self.create_alignment_group()
+        layout.addWidget(alignment_group)
+        
         # 误差分布直方图（占位符）
         chart_group = self.create_error_chart_group()
         layout.addWidget(chart_group)
@@ -709,6 +890,79 @@ class MainWindow(QMainWindow):
         
         return group_widget
         
+    def create_form_metrics_group(self):
+        """创建形状误差（圆度/圆柱度）组"""
+        group_widget = QWidget()
+        layout = QVBoxLayout(group_widget)
+        
+        # 标题
+        title = QLabel("形状误差")
+        title.setObjectName("groupTitle")
+        layout.addWidget(title)
+        
+        # 形状误差数据 - 创建可更新的标签引用
+        form_data = [
+            ("截面圆度:", "--", "section_roundness_label"),
+            ("最大圆度:", "--", "max_roundness_label"),
+            ("圆柱度:", "--", "cylindricity_label")
+        ]
+        
+        for label_text, initial_value, attr_name in form_data:
+            stat_layout = QHBoxLayout()
+            
+            label_widget = QLabel(label_text)
+            label_widget.setObjectName("statLabel")
+            stat_layout.addWidget(label_widget)
+            
+            value_widget = QLabel(initial_value)
+            value_widget.setObjectName("statValue")
+            stat_layout.addWidget(value_widget)
+            stat_layout.addStretch()
+            
+            # 保存标签引用以便后续更新
+            setattr(self, attr_name, value_widget)
+            
+            layout.addLayout(stat_layout)
+        
+        return group_widget
+        
+    def create_alignment_group(self):
+        """创建配准（最佳拟合）结果组"""
+        group_widget = QWidget()
+        layout = QVBoxLayout(group_widget)
+        
+        # 标题
+        title = QLabel("配准（最佳拟合）")
+        title.setObjectName("groupTitle")
+        layout.addWidget(title)
+        
+        # 配准数据 - 创建可更新的标签引用
+        alignment_data = [
+            ("平移:", "--", "alignment_translation_label"),
+            ("旋转:", "--", "alignment_rotation_label"),
+            ("残差RMS:", "--", "alignment_rms_label"),
+            ("配准后平均误差:", "--", "aligned_avg_error_label")
+        ]
+        
+        for label_text, initial_value, attr_name in alignment_data:
+            stat_layout = QHBoxLayout()
+            
+            label_widget = QLabel(label_text)
+            label_widget.setObjectName("statLabel")
+            stat_layout.addWidget(label_widget)
+            
+            value_widget = QLabel(initial_value)
+            value_widget.setObjectName("statValue")
+            stat_layout.addWidget(value_widget)
+            stat_layout.addStretch()
+            
+            # 保存标签引用以便后续更新
+            setattr(self, attr_name, value_widget)
+            
+            layout.addLayout(stat_layout)
+        
+        return group_widget
+        
     def create_error_chart_group(self):
         """创建误差分布直方图组"""
         group_widget = QWidget()
@@ -719,28 +973,20 @@ class MainWindow(QMainWindow):
         title.setObjectName("groupTitle")
         layout.addWidget(title)
         
-        # 创建matplotlib直方图画布
+        # 直方图显示部件（后台渲染）
         try:
-            import matplotlib.pyplot as plt
-            from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-            from matplotlib.figure import Figure
-            
-            # 创建图形
-            self.histogram_figure = Figure(figsize=(4, 3))
-            self.histogram_canvas = FigureCanvas(self.histogram_figure)
-            self.histogram_canvas.setFixedHeight(200)
-            self.histogram_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-            
-            # 创建子图
-            self.histogram_ax = self.histogram_figure.add_subplot(111)
-            self.histogram_ax.set_xlabel('Error (mm)', fontsize=8)
-            self.histogram_ax.set_ylabel('Frequency', fontsize=8)
-            self.histogram_ax.tick_params(axis='both', labelsize=8)
+            if self.render_worker is None:
+                raise ImportError("matplotlib")
+                
+            self.histogram_view = RenderedView()
+            self.histogram_view.setFixedHeight(200)
+            self.histogram_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+            self.histogram_view.resized.connect(lambda: self.update_error_histogram(self.histogram_errors))
             
             # 初始化空直方图
             self.update_error_histogram([])
             
-            layout.addWidget(self.histogram_canvas)
+            layout.addWidget(self.histogram_view)
             
         except ImportError:
             # 如果matplotlib不可用，显示占位符
@@ -759,51 +1005,21 @@ class MainWindow(QMainWindow):
         return group_widget
         
     def update_error_histogram(self, error_data):
-        """更新误差分布直方图"""
+        """更新误差分布直方图（提交到后台渲染线程）"""
         try:
-            if not hasattr(self, 'histogram_ax'):
+            if self.histogram_view is None:
                 return
                 
-            # 清除之前的图形
-            self.histogram_ax.clear()
-            
-            if len(error_data) > 0:
-                # 绘制直方图
-                self.histogram_ax.hist(
-                    error_data, bins=20, alpha=0.7, color='skyblue', edgecolor='black'
-                )
-                
-                # 添加统计线
-                mean_error = np.mean(error_data)
-                self.histogram_ax.axvline(mean_error, color='red', linestyle='--', 
-                                        linewidth=2, label=f'Mean: {mean_error:.3f}')
-                
-                # 添加合格范围线
-                self.histogram_ax.axvline(0.1, color='green', linestyle=':', 
-                                        alpha=0.7, label='Tolerance Range')
-                self.histogram_ax.axvline(-0.1, color='green', linestyle=':', alpha=0.7)
-                
-                self.histogram_ax.legend(fontsize=8)
-                
-            else:
-                # 显示空图表
-                self.histogram_ax.text(0.5, 0.5, 'No Data Available', 
-                                     transform=self.histogram_ax.transAxes,
-                                     ha='center', va='center', fontsize=10)
-            
-            # 设置标签和格式
-            self.histogram_ax.set_xlabel('Error (mm)', fontsize=8)
-            self.histogram_ax.set_ylabel('Frequency', fontsize=8)
-            self.histogram_ax.tick_params(axis='both', labelsize=8)
-            
-            # 调整布局
-            self.histogram_figure.tight_layout()
-            
-            # 刷新画布
-            self.histogram_canvas.draw()
+            self.histogram_errors = error_data
+            scene = {
+                'errors': np.asarray(error_data, dtype=np.float64),
+                'tolerance': 0.1,
+            }
+            self.render_worker.submit('histogram', scene, self.histogram_view.width(),
+                                      self.histogram_view.height())
             
         except Exception as e:
-            print(f"更新误差直方图时出错: {e}")
+            logger.error(f"更新误差直方图时出错: {e}")
         
     def setup_style(self):
         """设置界面样式"""
@@ -817,9 +1033,17 @@ class MainWindow(QMainWindow):
         
     def init_timer(self):
         """初始化定时器"""
-        # 模拟定时器已在 __init__ 中创建，这里不需要额外的定时器
-        pass
+        # 模拟定时器已在 __init__ 中创建；偏差展开图按固定间隔刷新，绘制代价与测量点数无关
+        self.deviation_map_timer = QTimer(self)
+        self.deviation_map_timer.timeout.connect(self.deviation_map_widget.refresh)
+        self.deviation_map_timer.start(AppConfig.DEVIATION_MAP_REFRESH_INTERVAL)
         
+        # 指标端点的界面心跳：帧间隔与测量/分析速率
+        if self.station_metrics is not None:
+            self.metrics_tick_timer = QTimer(self)
+            self.metrics_tick_timer.timeout.connect(self.station_metrics.tick)
+            self.metrics_tick_timer.start(AppConfig.METRICS_TICK_INTERVAL)
+            
     # 更新实时状态监控功能已整合到上述方法中
     
     def setup_connections(self):
@@ -843,21 +1067,22 @@ class MainWindow(QMainWindow):
     
     def load_model(self):
         """加载理论点云数据文件"""
-        print("=== 加载理论点云数据 ===")
+        logger.info("=== 加载理论点云数据 ===")
         
         # 打开文件选择对话框
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "选择理论点云数据文件",
             "",
-            "点云文件 (*.csv *.txt);;CSV文件 (*.csv);;文本文件 (*.txt);;所有文件 (*.*)"
+            "点云文件 (*.csv *.txt *.npy *.stl);;CSV文件 (*.csv);;文本文件 (*.txt);;二进制点云 (*.npy);;STL网格 (*.stl);;解析曲面定义 (*.json);;所有文件 (*.*)"
         )
         
         if file_path:
-            print(f"选择的点云文件路径: {file_path}")
+            logger.info(f"选择的点云文件路径: {file_path}")
             
             try:
                 # 使用HardwareSimulator的静态方法加载点云数据
+                self.reference_surface = None
                 point_cloud_data = self.load_theoretical_data(file_path)
                 
                 if point_cloud_data is not None:
@@ -874,9 +1099,9 @@ class MainWindow(QMainWindow):
                     self.rotation_range_label.setText(f"数据点: {point_count} 个")
                     
                     # 在3D可视化区域显示点云
-                    self.display_point_cloud_in_3d(point_cloud_data.values)
+                    self.display_point_cloud_in_3d(point_cloud_data[['x_mm', 'y_mm', 'z_mm']].values)
                     
-                    print(f"成功加载理论点云数据: {point_count} 个数据点")
+                    logger.info(f"成功加载理论点云数据: {point_count} 个数据点")
                     
                     # 显示成功消息
                     QMessageBox.information(
@@ -893,14 +1118,14 @@ class MainWindow(QMainWindow):
                     )
             
             except Exception as e:
-                print(f"加载点云文件时出错: {e}")
+                logger.error(f"加载点云文件时出错: {e}")
                 QMessageBox.critical(
                     self,
                     "加载错误", 
                     f"加载点云文件时发生错误:\n\n{str(e)}"
                 )
         else:
-            print("用户取消了文件选择")
+            logger.info("用户取消了文件选择")
 
     def load_theoretical_data(self, file_path):
         """
@@ -912,6 +1137,12 @@ class MainWindow(QMainWindow):
         Returns:
             pandas.DataFrame 或 None
         """
+        # 数据加载相关模块延迟导入（启动后已在后台预加载）
+        import pandas as pd
+        from analytic_surface import load_surface_definition
+        from pointcloud_generator import load_pointcloud_binary
+        from stl_loader import load_stl_pointcloud
+        
         try:
             if file_path.endswith('.csv'):
                 df = pd.read_csv(file_path)
@@ -919,105 +1150,147 @@ class MainWindow(QMainWindow):
                 # 检查必要的列
                 required_cols = ['x_mm', 'y_mm', 'z_mm']
                 if all(col in df.columns for col in required_cols):
-                    print(f"成功加载理论数据: {len(df)} 个点")
+                    logger.info(f"成功加载理论数据: {len(df)} 个点")
                     return df
                 else:
                     # 尝试其他列名格式
                     alt_cols = ['x', 'y', 'z']
                     if all(col in df.columns for col in alt_cols):
                         df.rename(columns={'x': 'x_mm', 'y': 'y_mm', 'z': 'z_mm'}, inplace=True)
-                        print(f"成功加载理论数据(重命名列): {len(df)} 个点")
+                        logger.info(f"成功加载理论数据(重命名列): {len(df)} 个点")
                         return df
                     else:
-                        print(f"CSV文件缺少必要的列。找到: {list(df.columns)}")
+                        logger.warning(f"CSV文件缺少必要的列。找到: {list(df.columns)}")
                         return None
                         
+            elif file_path.endswith('.npy'):
+                # 二进制点云：(N, 3) float64 数组，列依次为 x_mm, y_mm, z_mm
+                points = load_pointcloud_binary(file_path)
+                df = pd.DataFrame(points, columns=['x_mm', 'y_mm', 'z_mm'])
+                logger.info(f"成功加载二进制理论数据: {len(df)} 个点")
+                return df
+                
+            elif file_path.lower().endswith('.stl'):
+                # STL网格：采样为理论点云，保留逐点法向 (nx, ny, nz)
+                df = load_stl_pointcloud(
+                    file_path,
+                    spacing=AppConfig.STL_SAMPLE_SPACING,
+                    method=AppConfig.STL_SAMPLE_METHOD,
+                    angle_step=AppConfig.STL_SAMPLE_ANGLE_STEP
+                )
+                logger.info(f"成功加载STL理论数据: {len(df)} 个采样点")
+                return df
+                
+            elif file_path.endswith('.json'):
+                # 解析曲面定义：分析时按闭式公式计算，采样点云仅用于测量路径和显示
+                surface = load_surface_definition(file_path)
+                df = surface.sample(AppConfig.ANALYTIC_SAMPLE_X_STEP, AppConfig.ANALYTIC_SAMPLE_ANGLE_STEP)
+                self.reference_surface = surface
+                logger.info(f"成功加载解析曲面: {surface.surface_type}，采样点: {len(df)} 个")
+                return df
+                
             else:
-                print(f"不支持的文件格式: {file_path}")
+                logger.warning(f"不支持的文件格式: {file_path}")
                 return None
                 
         except Exception as e:
-            print(f"加载理论数据失败: {e}")
+            logger.error(f"加载理论数据失败: {e}")
             return None        
 
     def display_point_cloud_in_3d(self, point_cloud_data):
-        """在3D可视化区域显示点云数据"""
+        """在3D可视化区域显示点云数据（由后台渲染线程绘制）"""
         try:
-            import matplotlib.pyplot as plt
-            from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-            from matplotlib.figure import Figure
-            
-            # 创建matplotlib图形
-            self.matplotlib_figure = Figure(figsize=(10, 8))
-            self.matplotlib_canvas = FigureCanvas(self.matplotlib_figure)
-            self.matplotlib_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-            self.matplotlib_canvas.setMinimumSize(1, 1)
-            
-            # 创建3D子图
-            self.matplotlib_ax = self.matplotlib_figure.add_subplot(111, projection='3d')
-            
-            # 从点云数据中提取坐标
-            if len(point_cloud_data) > 5000:
-                # 如果点太多，进行采样以提高性能
-                indices = np.random.choice(len(point_cloud_data), 5000, replace=False)
-                sampled_data = point_cloud_data[indices]
-            else:
-                sampled_data = point_cloud_data
-            
-            x_coords = sampled_data[:, 0]
-            y_coords = sampled_data[:, 1] 
-            z_coords = sampled_data[:, 2]
-            
-            # 绘制理论点云（蓝色，半透明）
-            self.theoretical_scatter = self.matplotlib_ax.scatter(
-                x_coords, y_coords, zs=z_coords,
-                c='lightblue', s=1, alpha=0.3, label='Theoretical Points'
-            )
-            
-            # 设置标签和标题
-            self.matplotlib_ax.set_xlabel('X (mm)')
-            self.matplotlib_ax.set_ylabel('Y (mm)')
-            # 对于3D轴，使用try-catch来设置Z标签
-            try:
-                self.matplotlib_ax.set_zlabel('Z (mm)')
-            except AttributeError:
-                pass
-            self.matplotlib_ax.set_title('Theoretical vs Measured Point Cloud', pad=10)
-            
-            # 添加图例
-            self.matplotlib_ax.legend()
-            
-            # 调整布局
-            self.matplotlib_figure.tight_layout()
-            
-            # 更新3D可视化区域
-            self.update_visualization_widget(self.matplotlib_canvas)
-            
-            print(f"3D点云可视化已更新，显示 {len(sampled_data)} 个理论点")
+            if self.render_worker is None:
+                raise ImportError("matplotlib")
+                
+            # 预计算体素金字塔（每个理论点云一次），按点数预算选层显示
+            import time
+            start_time = time.perf_counter()
+            self.theoretical_lod = PointCloudLOD(point_cloud_data)
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            logger.info(f"点云LOD金字塔: {self.theoretical_lod.level_sizes()}，耗时: {elapsed_ms:.1f} ms")
+            
+            # 视野范围以完整点云为准，缩放时按视野重新选层
+            lower = self.theoretical_lod.points.min(axis=0)
+            upper = self.theoretical_lod.points.max(axis=0)
+            self.full_view_limits = (lower, upper)
+            self.view_limits = (lower.copy(), upper.copy())
+            self.view_elev, self.view_azim = AppConfig.VIEW_DEFAULT_ELEV, AppConfig.VIEW_DEFAULT_AZIM
+            
+            level, indices = self.theoretical_lod.select(AppConfig.LOD_POINT_BUDGET)
+            self.theoretical_display_points = self.theoretical_lod.points[indices]
+            self.theoretical_lod_selection = (level, len(indices))
+            
+            # 显示部件只贴图，鼠标操作修改视图参数后重新提交渲染
+            if self.point_cloud_view is None:
+                self.point_cloud_view = RenderedView("Rendering...")
+                self.point_cloud_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+                self.point_cloud_view.resized.connect(self.refresh_3d_view)
+                self.point_cloud_view.mouse_dragged.connect(self.on_3d_drag)
+                self.point_cloud_view.mouse_released.connect(self.update_theoretical_lod)
+                self.point_cloud_view.wheel_scrolled.connect(self.on_3d_scroll)
+            self.update_visualization_widget(self.point_cloud_view)
+            self.refresh_3d_view()
+            
+            logger.info(f"3D点云可视化已更新，显示 {len(indices)} 个理论点（LOD层级 {level}）")
             
         except ImportError as e:
-            print(f"缺少matplotlib库: {e}")
+            logger.warning(f"缺少matplotlib库: {e}")
             QMessageBox.warning(
                 self, "可视化错误", 
                 "需要安装matplotlib库才能显示3D可视化\n\n请运行: pip install matplotlib"
             )
         except Exception as e:
-            print(f"3D可视化时出错: {e}")
+            logger.error(f"3D可视化时出错: {e}")
             QMessageBox.warning(self, "可视化错误", f"显示3D点云时出错:\n\n{str(e)}")
             
+    def update_theoretical_lod(self):
+        """按当前视野重新选择理论点云的LOD层级，视野内点数不超过预算"""
+        if self.theoretical_lod is None:
+            return
+        try:
+            level, indices = self.theoretical_lod.select(AppConfig.LOD_POINT_BUDGET, self.view_limits)
+            if (level, len(indices)) == self.theoretical_lod_selection:
+                return
+            self.theoretical_lod_selection = (level, len(indices))
+            self.theoretical_display_points = self.theoretical_lod.points[indices]
+            self.refresh_3d_view()
+        except Exception as e:
+            logger.error(f"更新点云LOD时出错: {e}")
+            
+    def zoom_3d_view(self, factor):
+        """以视野中心按比例缩放坐标轴范围"""
+        lower, upper = self.view_limits
+        center = (lower + upper) / 2
+        half = (upper - lower) / 2 * factor
+        self.view_limits = (center - half, center + half)
+            
+    def on_3d_scroll(self, steps):
+        """滚轮缩放3D视图"""
+        if self.theoretical_lod is None:
+            return
+        self.zoom_3d_view(AppConfig.LOD_ZOOM_STEP ** -steps)
+        self.update_theoretical_lod()
+        self.refresh_3d_view()
+        
+    def on_3d_drag(self, dx, dy, buttons):
+        """鼠标拖动：左键旋转视角，右键缩放"""
+        if self.theoretical_lod is None:
+            return
+        if buttons & Qt.RightButton:
+            self.zoom_3d_view(1.0 + dy * AppConfig.VIEW_DRAG_ZOOM_RATE)
+        else:
+            self.view_azim -= dx * AppConfig.VIEW_ROTATE_RATE
+            self.view_elev = float(np.clip(self.view_elev + dy * AppConfig.VIEW_ROTATE_RATE, -90, 90))
+        self.refresh_3d_view()
+        
     def add_measured_point_to_3d(self, measured_point, error_analysis):
         """向3D可视化添加测量点"""
         try:
-            if self.matplotlib_ax is None:
+            if self.point_cloud_view is None:
                 return
                 
-            # 提取测量点坐标
-            x = measured_point['x']
-            y = measured_point['y']
-            z = measured_point['z']
-            
             # 根据误差确定颜色
-            error_value = error_analysis['radius_error']
             if error_analysis['status'] == "合格":
                 color = 'green'
             elif error_analysis['status'] == "注意":
@@ -1025,16 +1298,10 @@ class MainWindow(QMainWindow):
             else:
                 color = 'red'
             
-            # 添加测量点到3D图中
-            self.matplotlib_ax.scatter(
-                [x], [y], [z], 
-                c=[color], s=20, alpha=0.8
-            )
-            
-            # 存储测量点数据用于后续更新
+            # 存储测量点数据，随下一帧一并渲染
             self.measured_points.append({
-                'x': x, 'y': y, 'z': z,
-                'error': error_value,
+                'x': measured_point['x'], 'y': measured_point['y'], 'z': measured_point['z'],
+                'error': error_analysis['radius_error'],
                 'color': color
             })
             
@@ -1047,15 +1314,37 @@ class MainWindow(QMainWindow):
                 self.refresh_3d_view()
                 
         except Exception as e:
-            print(f"添加测量点到3D视图时出错: {e}")
+            logger.error(f"添加测量点到3D视图时出错: {e}")
             
     def refresh_3d_view(self):
-        """刷新3D视图"""
+        """提交当前3D场景到后台渲染线程（渲染线程忙时只保留最新一帧）"""
         try:
-            if self.matplotlib_canvas:
-                self.matplotlib_canvas.draw()
+            if self.point_cloud_view is None or self.theoretical_display_points is None:
+                return
+            if self.measured_points:
+                measured = np.array([[p['x'], p['y'], p['z']] for p in self.measured_points])
+                colors = [p['color'] for p in self.measured_points]
+            else:
+                measured, colors = np.empty((0, 3)), []
+            scene = {
+                'theoretical_points': self.theoretical_display_points,
+                'measured_points': measured,
+                'measured_colors': colors,
+                'limits': (self.view_limits[0].copy(), self.view_limits[1].copy()),
+                'elev': self.view_elev,
+                'azim': self.view_azim,
+            }
+            self.render_worker.submit('3d', scene, self.point_cloud_view.width(),
+                                      self.point_cloud_view.height())
         except Exception as e:
-            print(f"刷新3D视图时出错: {e}")
+            logger.error(f"刷新3D视图时出错: {e}")
+            
+    def on_frame_ready(self, name, image):
+        """后台渲染完成，界面线程只做贴图"""
+        if name == '3d' and self.point_cloud_view is not None:
+            self.point_cloud_view.set_image(image)
+        elif name == 'histogram' and self.histogram_view is not None:
+            self.histogram_view.set_image(image)
     
     def update_visualization_widget(self, canvas):
         """更新3D可视化窗口部件"""
@@ -1066,14 +1355,14 @@ class MainWindow(QMainWindow):
                 if child:
                     child.setParent(None)
             
-            # 添加新的matplotlib画布
+            # 添加新的渲染结果显示部件
             self.viz_layout.addWidget(canvas)
             canvas.updateGeometry()
             
-            print("3D可视化区域已更新为matplotlib画布")
+            logger.info("3D可视化区域已更新为后台渲染视图")
             
         except Exception as e:
-            print(f"更新3D可视化区域时出错: {e}")
+            logger.error(f"更新3D可视化区域时出错: {e}")
             # 如果更新失败，显示错误信息
             error_label = QLabel(f"3D Visualization Error:\n{str(e)}")
             error_label.setAlignment(Qt.AlignCenter)
@@ -1081,13 +1370,18 @@ class MainWindow(QMainWindow):
             self.viz_layout.addWidget(error_label)
             
     def reset_view(self):
-        """重置视图占位符函数"""
-        print("=== 重置视图功能 ===")
+        """重置视图到完整点云范围与默认视角"""
+        logger.info("=== 重置视图功能 ===")
+        if self.full_view_limits is not None:
+            self.view_limits = (self.full_view_limits[0].copy(), self.full_view_limits[1].copy())
+            self.view_elev, self.view_azim = AppConfig.VIEW_DEFAULT_ELEV, AppConfig.VIEW_DEFAULT_AZIM
+            self.update_theoretical_lod()
+            self.refresh_3d_view()
         QMessageBox.information(self, "重置视图", "视图已重置到默认状态")
         
     def start_measurement(self):
         """开始测量 - 使用新的模拟器系统"""
-        print("=== 开始测量功能 ===")
+        logger.info("=== 开始测量功能 ===")
         
         # 检查是否已加载理论数据
         if self.theoretical_data is None:
@@ -1097,7 +1391,7 @@ class MainWindow(QMainWindow):
             )
             return
         
-        print(f"开始测量，理论数据点数: {len(self.theoretical_data)}")
+        logger.info(f"开始测量，理论数据点数: {len(self.theoretical_data)}")
         
         # 读取测量参数
         measurement_params = self.get_measurement_parameters()
@@ -1118,20 +1412,56 @@ class MainWindow(QMainWindow):
         os.makedirs(output_dir, exist_ok=True)
         measurement_file = os.path.join(output_dir, "live_measurement.csv")
         
+        # 创建偏差展开图
+        deviation_map = self.create_deviation_map(measurement_params)
+        self.deviation_map_widget.set_map(deviation_map)
+        
+        # 分析参数（工作线程与异步流水线的分析引擎相同）
+        analysis_options = dict(
+            tolerance_qualified=measurement_params['tolerance_qualified'],
+            tolerance_attention=measurement_params['tolerance_attention'],
+            tolerance_over_limit=measurement_params['tolerance_over_limit'],
+            index_cache=self.index_cache,
+            reference_surface=self.reference_surface,
+            normal_deviation=AppConfig.ENABLE_NORMAL_DEVIATION,
+            normal_deviation_k=AppConfig.NORMAL_DEVIATION_K,
+            probe_tip_radius=measurement_params['probe_tip_radius'],
+            alignment=AppConfig.ENABLE_ALIGNMENT,
+            alignment_interval=AppConfig.ALIGNMENT_UPDATE_INTERVAL,
+            alignment_sample_size=AppConfig.ALIGNMENT_SAMPLE_SIZE,
+            form_metrics=AppConfig.ENABLE_FORM_METRICS,
+            form_min_ring_points=AppConfig.FORM_MIN_RING_POINTS,
+            deviation_map=deviation_map,
+            pipeline_metrics=self.pipeline_metrics,
+            station_metrics=self.station_metrics
+        )
+        
+        if AppConfig.PIPELINE_MODE == 'asyncio':
+            self.start_async_pipeline(measurement_params, measurement_file, analysis_options)
+            self.update_ui_measurement_started()
+            logger.info("异步测量流水线已启动")
+            return
+            
+        # 工作线程模块延迟导入（启动后已在后台预加载）
+        from hardware_simulator import HardwareSimulator
+        from analysis_worker import AnalysisWorker
+        
         # 创建硬件模拟器
         self.hardware_simulator = HardwareSimulator(
             theoretical_data=self.theoretical_data,
             measurement_params=measurement_params,
-            output_file_path=measurement_file
+            output_file_path=measurement_file,
+            pipeline_metrics=self.pipeline_metrics,
+            station_metrics=self.station_metrics
         )
         
         # 创建误差分析工作线程
         self.analysis_worker = AnalysisWorker(
             theoretical_data=self.theoretical_data,
             measurement_file_path=measurement_file,
-            tolerance_qualified=measurement_params['tolerance_qualified'],
-            tolerance_attention=measurement_params['tolerance_attention'],
-            tolerance_over_limit=measurement_params['tolerance_over_limit']
+            analysis_jobs=AppConfig.ANALYSIS_JOBS,
+            shard_by=AppConfig.ANALYSIS_SHARD_BY,
+            **analysis_options
         )
         
         # 连接硬件模拟器信号
@@ -1146,6 +1476,8 @@ class MainWindow(QMainWindow):
         self.analysis_worker.error_data_updated.connect(self.on_error_data_updated)
         self.analysis_worker.analysis_finished.connect(self.on_analysis_finished)
         self.analysis_worker.analysis_error.connect(self.on_analysis_error)
+        self.analysis_worker.alignment_updated.connect(self.on_alignment_updated)
+        self.analysis_worker.form_metrics_updated.connect(self.on_form_metrics_updated)
         
         # 启动线程
         self.hardware_simulator.start()
@@ -1154,7 +1486,56 @@ class MainWindow(QMainWindow):
         # 更新UI状态
         self.update_ui_measurement_started()
         
-        print("测量和分析线程已启动")
+        logger.info("测量和分析线程已启动")
+        
+    def start_async_pipeline(self, measurement_params, measurement_file, analysis_options):
+        """
+        以异步流水线运行测量：模拟测头与分析引擎由界面线程中的事件循环驱动
+        
+        Args:
+            measurement_params: dict，测量参数
+            measurement_file: str，测量数据文件路径
+            analysis_options: dict，分析引擎参数
+        """
+        from analysis_engine import AnalysisEngine
+        from async_pipeline import AsyncPipeline, ProbeChannel, SimulatedProbe
+        
+        channel = ProbeChannel(
+            'probe-1',
+            SimulatedProbe(self.theoretical_data, measurement_params),
+            AnalysisEngine(self.theoretical_data, **analysis_options),
+            output_file_path=measurement_file,
+            publisher=WindowPipelinePublisher(self),
+            queue_size=AppConfig.ASYNC_QUEUE_SIZE,
+            batch_size=AppConfig.ASYNC_BATCH_SIZE,
+            batch_interval=AppConfig.ASYNC_BATCH_INTERVAL,
+            pipeline_metrics=self.pipeline_metrics,
+            station_metrics=self.station_metrics,
+            analysis_jobs=AppConfig.ANALYSIS_JOBS,
+            shard_by=AppConfig.ANALYSIS_SHARD_BY
+        )
+        self.async_pipeline = AsyncPipeline([channel])
+        self.async_pipeline.start(self.get_async_bridge().loop)
+        
+    def create_deviation_map(self, measurement_params):
+        """
+        按测量参数创建偏差展开图，角度范围取理论点云的实际分布
+        
+        Args:
+            measurement_params: dict，测量参数
+            
+        Returns:
+            DeviationMap
+        """
+        angles = np.degrees(np.arctan2(self.theoretical_data['z_mm'].to_numpy(),
+                                       self.theoretical_data['y_mm'].to_numpy()))
+        return DeviationMap(
+            measurement_params['x_min'], measurement_params['x_max'], measurement_params['x_step'],
+            float(np.floor(angles.min())), float(np.ceil(angles.max())), measurement_params['rot_step'],
+            measurement_params['tolerance_qualified'],
+            measurement_params['tolerance_attention'],
+            measurement_params['tolerance_over_limit']
+        )
         
     def get_measurement_parameters(self):
         """获取测量参数"""
@@ -1163,6 +1544,7 @@ class MainWindow(QMainWindow):
             x_max = float(self.x_max_input.text())
             x_step = float(self.x_step_input.text())
             rot_step = float(self.rot_step_input.text())
+            probe_tip_radius = float(self.probe_tip_radius_input.text())
             
             # 读取误差阈值参数
             tolerance_qualified = float(self.tolerance_qualified_input.text())
@@ -1174,6 +1556,8 @@ class MainWindow(QMainWindow):
                 raise ValueError("X轴最小值必须小于最大值")
             if x_step <= 0 or rot_step <= 0:
                 raise ValueError("步长值必须大于0")
+            if probe_tip_radius < 0:
+                raise ValueError("测头半径不能为负数")
             if tolerance_qualified <= 0 or tolerance_attention <= 0 or tolerance_over_limit <= 0:
                 raise ValueError("误差阈值必须大于0")
             if tolerance_qualified >= tolerance_attention or tolerance_attention >= tolerance_over_limit:
@@ -1184,14 +1568,15 @@ class MainWindow(QMainWindow):
                 'x_max': x_max,
                 'x_step': x_step,
                 'rot_step': rot_step,
-                'measurement_delay': 0.05,  # 50ms延时
+                'measurement_delay': AppConfig.MEASUREMENT_DELAY,
+                'probe_tip_radius': probe_tip_radius,
                 # 误差阈值参数
                 'tolerance_qualified': tolerance_qualified,
                 'tolerance_attention': tolerance_attention,
                 'tolerance_over_limit': tolerance_over_limit
             }
             
-            print(f"测量参数: {params}")
+            logger.info(f"测量参数: {params}")
             return params
             
         except ValueError as e:
@@ -1210,6 +1595,24 @@ class MainWindow(QMainWindow):
             self.analysis_worker.wait(1000)  # 等待最多1秒
             self.analysis_worker = None
             
+        if self.async_pipeline is not None:
+            self.async_pipeline.cancel()
+            self.async_pipeline = None
+            
+    def closeEvent(self, event):
+        """关闭窗口时停止全部后台线程"""
+        self.cleanup_threads()
+        if self.session_manager is not None:
+            self.session_manager.cancel_all()
+        if self.async_bridge is not None:
+            self.async_bridge.close()
+        if self.render_worker is not None:
+            self.render_worker.stop()
+            self.render_worker.wait()  # 最多等待当前一帧渲染完成
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        super().closeEvent(event)
+        
     def reset_measurement_data(self):
         """重置测量数据"""
         # 清空表格（保留示例数据的最后3行）
@@ -1223,6 +1626,12 @@ class MainWindow(QMainWindow):
         # 清空测量点数据
         self.measured_points = []
         
+        # 流水线指标按次测量统计（序号从1重新开始）
+        self.pipeline_metrics.reset()
+        self.paint_probe.clear()
+        if self.station_metrics is not None:
+            self.station_metrics.start_run()
+        
         # 清空直方图
         if hasattr(self, 'update_error_histogram'):
             self.update_error_histogram([])
@@ -1247,6 +1656,7 @@ class MainWindow(QMainWindow):
         self.x_max_input.setEnabled(False)
         self.x_step_input.setEnabled(False)
         self.rot_step_input.setEnabled(False)
+        self.probe_tip_radius_input.setEnabled(False)
         # 禁用误差阈值输入
         self.tolerance_qualified_input.setEnabled(False)
         self.tolerance_attention_input.setEnabled(False)
@@ -1255,7 +1665,8 @@ class MainWindow(QMainWindow):
     # 新增：信号槽函数
     def on_measurement_point(self, sequence, x_pos, angle_deg, measured_radius):
         """处理硬件模拟器的测量点信号"""
-        print(f"收到测量点: 序号={sequence}, X={x_pos}, 角度={angle_deg}, 半径={measured_radius}")
+        measurement_logger.debug("收到测量点: 序号=%s, X=%s, 角度=%s, 半径=%s",
+                                 sequence, x_pos, angle_deg, measured_radius)
         
         # 更新实时状态
         self.current_x = x_pos
@@ -1274,20 +1685,24 @@ class MainWindow(QMainWindow):
             theoretical_radius = result['theoretical_radius']
             error_analysis = result['error_analysis']
             measured_point = result['measured_point']
+            self.pipeline_metrics.mark('ui_receive', sequence)
+            self.pipeline_metrics.count('ui_receive')
             
             # 添加到表格
             self.add_analysis_result_to_table(
                 sequence, x_pos, angle_deg, measured_radius,
                 theoretical_radius, error_analysis
             )
+            self.paint_probe.add(sequence)
             
             # 添加测量点到3D可视化
             self.add_measured_point_to_3d(measured_point, error_analysis)
             
-            print(f"分析结果已添加到表格和3D视图: 序号={sequence}, 误差={error_analysis['radius_error']:.6f}")
+            measurement_logger.debug("分析结果已添加到表格和3D视图: 序号=%s, 误差=%.6f",
+                                     sequence, error_analysis['radius_error'])
             
         except Exception as e:
-            print(f"处理分析结果时出错: {e}")
+            logger.error(f"处理分析结果时出错: {e}")
             
     def add_analysis_result_to_table(self, sequence, x_pos, angle_deg, measured_radius, theoretical_radius, error_analysis):
         """将分析结果添加到表格"""
@@ -1317,9 +1732,15 @@ class MainWindow(QMainWindow):
                 
             self.data_table.setItem(row, col, item)
             
-        # 自动滚动到最新行
+        # 限制行数并自动滚动到最新行
+        self.trim_table_rows()
         self.data_table.scrollToBottom()
         
+    def trim_table_rows(self):
+        """删除超出 TABLE_MAX_ROWS 的最早的行"""
+        for _ in range(self.data_table.rowCount() - AppConfig.TABLE_MAX_ROWS):
+            self.data_table.removeRow(0)
+                
     def on_statistics_updated(self, statistics):
         """处理统计数据更新信号"""
         # 更新统计标签
@@ -1339,38 +1760,71 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'errors_list'):
             self.update_error_histogram(self.errors_list)
             
+    def on_alignment_updated(self, alignment):
+        """处理配准结果更新信号"""
+        tx, ty, tz = alignment['translation']
+        rx, ry, rz = alignment['rotation_deg']
+        self.alignment_translation_label.setText(f"{tx:+.3f}, {ty:+.3f}, {tz:+.3f} mm")
+        self.alignment_rotation_label.setText(f"{rx:+.4f}°, {ry:+.4f}°, {rz:+.4f}°")
+        self.alignment_rms_label.setText(f"{alignment['initial_rms']:.3f} → {alignment['rms']:.3f} mm")
+        
+        if alignment['final']:
+            raw = alignment['raw_statistics']
+            aligned = alignment['aligned_statistics']
+            self.aligned_avg_error_label.setText(
+                f"{aligned['avg_error']:+.3f} mm (原始 {raw['avg_error']:+.3f})"
+            )
+            
+    def on_form_metrics_updated(self, form_metrics):
+        """处理形状误差更新信号"""
+        if form_metrics['sections']:
+            section = form_metrics['sections'][-1]
+            self.section_roundness_label.setText(
+                f"{section['roundness_mz']:.3f} mm (X={section['x']:.1f}, 最小二乘 {section['roundness_ls']:.3f})"
+            )
+            
+        summary = form_metrics['summary']
+        if summary['section_count'] > 0:
+            self.max_roundness_label.setText(
+                f"{summary['max_roundness_mz']:.3f} mm ({summary['section_count']} 个截面)"
+            )
+            
+        cylindricity = form_metrics['cylindricity']
+        if cylindricity is not None:
+            self.cylindricity_label.setText(f"{cylindricity['cylindricity']:.3f} mm")
+            
     def on_error_data_updated(self, error_data):
         """处理误差数据更新信号 - 用于直方图"""
         try:
             # 更新误差分布直方图
             self.update_error_histogram(error_data)
         except Exception as e:
-            print(f"更新误差直方图时出错: {e}")
+            logger.error(f"更新误差直方图时出错: {e}")
         
     def on_progress_updated(self, current_point, total_points):
         """处理进度更新信号"""
-        progress_percent = (current_point / max(1, total_points)) * 100
-        print(f"测量进度: {current_point}/{total_points} ({progress_percent:.1f}%)")
+        progress_logger.debug("测量进度: %d/%d (%.1f%%)", current_point, total_points,
+                              current_point / max(1, total_points) * 100)
         
     def on_measurement_finished(self):
         """处理测量完成信号"""
-        print("硬件模拟器测量完成")
+        logger.info("硬件模拟器测量完成")
         
     def on_analysis_finished(self):
         """处理分析完成信号"""
-        print("误差分析完成")
+        logger.info("误差分析完成")
         
         # 更新UI状态
         self.update_ui_measurement_finished()
         
     def on_measurement_error(self, error_msg):
         """处理测量错误信号"""
-        print(f"测量错误: {error_msg}")
+        logger.error(f"测量错误: {error_msg}")
         QMessageBox.warning(self, "测量错误", error_msg)
         
     def on_analysis_error(self, error_msg):
         """处理分析错误信号"""
-        print(f"分析错误: {error_msg}")
+        logger.error(f"分析错误: {error_msg}")
         QMessageBox.warning(self, "分析错误", error_msg)
         
     def update_ui_measurement_finished(self):
@@ -1390,6 +1844,7 @@ class MainWindow(QMainWindow):
         self.x_max_input.setEnabled(True)
         self.x_step_input.setEnabled(True)
         self.rot_step_input.setEnabled(True)
+        self.probe_tip_radius_input.setEnabled(True)
         # 重新启用误差阈值输入
         self.tolerance_qualified_input.setEnabled(True)
         self.tolerance_attention_input.setEnabled(True)
@@ -1397,12 +1852,16 @@ class MainWindow(QMainWindow):
         
     def pause_measurement(self):
         """暂停测量 - 使用新的模拟器系统"""
-        print("=== 暂停测量功能 ===")
+        logger.info("=== 暂停测量功能 ===")
         
-        if self.is_measuring and self.hardware_simulator and self.analysis_worker:
-            # 暂停两个线程
-            self.hardware_simulator.pause()
-            self.analysis_worker.pause()
+        if self.is_measuring and (self.async_pipeline or (self.hardware_simulator and self.analysis_worker)):
+            if self.async_pipeline is not None:
+                # 暂停设备读取，已读取的点继续分析
+                self.async_pipeline.pause()
+            else:
+                # 暂停两个线程
+                self.hardware_simulator.pause()
+                self.analysis_worker.pause()
             
             # 更新状态
             self.is_measuring = False
@@ -1413,11 +1872,11 @@ class MainWindow(QMainWindow):
             self.start_measure_btn.setEnabled(True)
             self.pause_btn.setEnabled(False)
             
-            print("测量已暂停")
+            logger.info("测量已暂停")
         
     def stop_measurement(self):
         """停止测量 - 使用新的模拟器系统"""
-        print("=== 停止测量功能 ===")
+        logger.info("=== 停止测量功能 ===")
         
         # 停止并清理线程
         self.cleanup_threads()
@@ -1430,11 +1889,11 @@ class MainWindow(QMainWindow):
         # 重置按钮状态
         self.update_ui_measurement_finished()
         
-        print("测量已停止")
+        logger.info("测量已停止")
         
     def simulation_step(self):
         """模拟测量步骤占位符函数"""
-        print(f"=== 模拟测量步骤 - 序号 {self.current_sequence} ===")
+        logger.debug("=== 模拟测量步骤 - 序号 %s ===", self.current_sequence)
         
         # 生成随机模拟数据
         measured_value = 50.0 + random.uniform(-0.5, 0.5)
@@ -1483,7 +1942,7 @@ class MainWindow(QMainWindow):
             
     def read_measurement_parameters(self):
         """读取测量参数占位符函数"""
-        print("=== 读取测量参数 ===")
+        logger.info("=== 读取测量参数 ===")
         
         try:
             x_min = float(self.x_min_input.text())
@@ -1491,19 +1950,19 @@ class MainWindow(QMainWindow):
             x_step = float(self.x_step_input.text())
             rot_step = float(self.rot_step_input.text())
             
-            print(f"X轴范围: {x_min} - {x_max} mm")
-            print(f"X轴步长: {x_step} mm")
-            print(f"旋转轴步长: {rot_step} °")
+            logger.info(f"X轴范围: {x_min} - {x_max} mm")
+            logger.info(f"X轴步长: {x_step} mm")
+            logger.info(f"旋转轴步长: {rot_step} °")
             
             # 根据参数估算测量点数
             x_points = int((x_max - x_min) / x_step) + 1
             angle_points = int((170 - 10) / rot_step) + 1
             self.total_measurement_count = x_points * angle_points
             
-            print(f"预计测量点数: {self.total_measurement_count}")
+            logger.info(f"预计测量点数: {self.total_measurement_count}")
             
         except ValueError as e:
-            print(f"参数读取错误: {e}")
+            logger.error(f"参数读取错误: {e}")
             QMessageBox.warning(self, "参数错误", "请检查输入的测量参数是否为有效数字")
             
     def add_table_row(self, sequence, x_coord, angle, measured, theoretical, error, status):
@@ -1533,7 +1992,8 @@ class MainWindow(QMainWindow):
                 
             self.data_table.setItem(row, col, item)
             
-        # 自动滚动到最新行
+        # 限制行数并自动滚动到最新行
+        self.trim_table_rows()
         self.data_table.scrollToBottom()
         
     def update_statistics(self):
@@ -1564,9 +2024,54 @@ class MainWindow(QMainWindow):
         self.table_status_label.setText(
             f"测量中... (已完成 {self.measurement_count} / 约 {self.total_measurement_count} 点)"
         )
-def main():
-    """主函数"""
+
+
+class WindowPipelinePublisher:
+    """异步流水线结果 → 主窗口（调用与工作线程信号相同的槽函数）"""
+    
+    def __init__(self, window):
+        self.window = window
+        
+    def measurement_point(self, channel, sequence, x_pos, angle_deg, measured_radius):
+        self.window.on_measurement_point(sequence, x_pos, angle_deg, measured_radius)
+        self.window.on_progress_updated(sequence, channel.device.total_points)
+        
+    def measurement_finished(self, channel):
+        self.window.on_measurement_finished()
+        
+    def analysis_update(self, channel, update):
+        self.publish_updates(update)
+        self.window.on_statistics_updated(update['statistics'])
+        self.window.on_error_data_updated(list(channel.engine.error_history))
+        for record in channel.engine.result_records(update['result']):
+            self.window.on_analysis_result(record)
+            
+    def analysis_finished(self, channel, update):
+        self.publish_updates(update)
+        self.window.async_pipeline = None
+        self.window.on_analysis_finished()
+        
+    def pipeline_error(self, channel, message):
+        self.window.on_analysis_error(message)
+        
+    def publish_updates(self, update):
+        if update['alignment'] is not None:
+            self.window.on_alignment_updated(update['alignment'])
+        if update['form_metrics'] is not None:
+            self.window.on_form_metrics_updated(update['form_metrics'])
+            
+            
+def main(profiler=None):
+    """
+    主函数
+    
+    Args:
+        profiler: StartupProfiler，启动耗时分析器（可选）。提供时在窗口首次绘制后
+                  打印报告并退出
+    """
     app = QApplication(sys.argv)
+    if profiler is not None:
+        profiler.mark('QApplication创建')
     
     # 设置应用程序属性
     app.setApplicationName(AppConfig.APP_NAME)
@@ -1577,6 +2082,16 @@ def main():
     window = MainWindow()
     window.show()
     
+    if profiler is not None:
+        profiler.mark('主窗口创建')
+        
+        def finish_profiling():
+            profiler.mark('首帧绘制完成')
+            profiler.finish()
+            window.close()
+            
+        call_after_first_paint(window, finish_profiling)
+    
     # 启动事件循环
     sys.exit(app.exec())
 
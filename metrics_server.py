@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+指标端点模块 - 在本机以 Prometheus 文本格式提供检测站运行指标
+
+StationMetrics 的每个字段只由一个线程写入（单写者）：
+- 硬件模拟器线程：已测量点数、最新测量序号
+- 分析线程：已分析点数、最新分析序号、索引构建耗时、各容差等级点数
+- 界面线程：心跳 tick() 计算界面帧间隔与测量/分析速率
+抓取线程只读这些字段（整数/浮点赋值在 GIL 下是原子的），热路径不加锁。
+MetricsServer 在守护线程中运行 http.server，GET /metrics 返回 Prometheus 文本格式
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from app_logging import get_logger
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+logger = get_logger('metrics')
+
+# 指标名前缀
+METRIC_PREFIX = 'mold'
+
+# 容差等级（与 AnalysisEngine 的误差状态判定顺序一致）
+TOLERANCE_LEVELS = ('qualified', 'attention', 'over_limit', 'severe')
+
+# 速率统计窗口(秒)与界面帧时间统计的心跳次数
+RATE_WINDOW = 5.0
+FRAME_WINDOW = 50
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def resident_memory_bytes():
+    """当前进程常驻内存(字节)，无法获取时返回 None"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # 无 /proc 时退而使用峰值常驻内存（macOS 单位为字节，Linux 为KB）
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+class StationMetrics:
+    """检测站运行指标（单写者字段，热路径无锁）"""
+
+    def __init__(self):
+        # 硬件模拟器线程
+        self.points_measured = 0
+        self.last_measured_sequence = 0
+        # 分析线程
+        self.points_analysed = 0
+        self.last_analysed_sequence = 0
+        self.index_build_seconds = 0.0
+        self.tolerance_counts = [0] * len(TOLERANCE_LEVELS)
+        # 界面线程
+        self.ui_frame_seconds = 0.0
+        self.ui_frame_max_seconds = 0.0
+        self.measured_per_second = 0.0
+        self.analysed_per_second = 0.0
+        self._last_tick = None
+        self._frame_times = deque(maxlen=FRAME_WINDOW)
+        self._rate_samples = deque()
+
+    def record_measured(self, sequence):
+        """硬件模拟器线程：记录一个测量点"""
+        self.points_measured += 1
+        self.last_measured_sequence = sequence
+
+    def record_analysed(self, last_sequence, count, level_counts):
+        """
+        分析线程：记录一批分析结果
+
+        Args:
+            last_sequence: int，本批最后一个序号
+            count: int，本批点数
+            level_counts: 序列，按 TOLERANCE_LEVELS 顺序的各等级点数
+        """
+        counts = self.tolerance_counts
+        for i, n in enumerate(level_counts):
+            counts[i] += int(n)
+        self.points_analysed += count
+        self.last_analysed_sequence = last_sequence
+
+    def record_index_build(self, seconds):
+        """分析线程：记录理论索引构建（或从缓存加载）耗时"""
+        self.index_build_seconds = seconds
+
+    def start_run(self):
+        """新一次测量开始（工作线程启动前调用）：序号从1重新计数，累计量保持单调"""
+        self.last_measured_sequence = 0
+        self.last_analysed_sequence = 0
+
+    @property
+    def pipeline_lag(self):
+        """已测量但尚未分析的序号数"""
+        return max(0, self.last_measured_sequence - self.last_analysed_sequence)
+
+    def tick(self, now=None):
+        """
+        界面线程心跳：以相邻心跳间隔作为界面帧时间（界面卡顿时间隔变长），
+        并按窗口内的计数增量计算测量/分析速率
+        """
+        now = time.perf_counter() if now is None else now
+        if self._last_tick is not None:
+            self.ui_frame_seconds = now - self._last_tick
+            self._frame_times.append(self.ui_frame_seconds)
+            self.ui_frame_max_seconds = max(self._frame_times)
+        self._last_tick = now
+
+        samples = self._rate_samples
+        samples.append((now, self.points_measured, self.points_analysed))
+        while len(samples) > 2 and now - samples[1][0] >= RATE_WINDOW:
+            samples.popleft()
+        elapsed = now - samples[0][0]
+        if elapsed > 0:
+            self.measured_per_second = (self.points_measured - samples[0][1]) / elapsed
+            self.analysed_per_second = (self.points_analysed - samples[0][2]) / elapsed
+
+
+def render_prometheus(metrics):
+    """
+    将指标渲染为 Prometheus 文本格式
+
+    Args:
+        metrics: StationMetrics
+
+    Returns:
+        str
+    """
+    lines = []
+
+    def add(name, metric_type, help_text, value, labels=None):
+        full_name = f'{METRIC_PREFIX}_{name}'
+        if labels is None or not any(line.startswith(f'# HELP {full_name} ') for line in lines):
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} {metric_type}')
+        label_text = ''
+        if labels:
+            label_text = '{' + ','.join(f'{key}="{val}"' for key, val in labels.items()) + '}'
+        lines.append(f'{full_name}{label_text} {value}')
+
+    add('points_measured_total', 'counter', 'Points acquired by the measurement hardware.',
+        metrics.points_measured)
+    add('points_analysed_total', 'counter', 'Points analysed by the error analysis worker.',
+        metrics.points_analysed)
+    add('points_measured_per_second', 'gauge', 'Recent measurement rate.',
+        f'{metrics.measured_per_second:.3f}')
+    add('points_analysed_per_second', 'gauge', 'Recent analysis rate.',
+        f'{metrics.analysed_per_second:.3f}')
+    add('pipeline_lag_sequences', 'gauge', 'Measured but not yet analysed sequences.',
+        metrics.pipeline_lag)
+    add('ui_frame_seconds', 'gauge', 'Latest UI event loop frame interval.',
+        f'{metrics.ui_frame_seconds:.6f}')
+    add('ui_frame_max_seconds', 'gauge', f'Longest UI frame interval over the last {FRAME_WINDOW} frames.',
+        f'{metrics.ui_frame_max_seconds:.6f}')
+    add('index_build_seconds', 'gauge', 'Time to build or load the theoretical lookup index.',
+        f'{metrics.index_build_seconds:.6f}')
+
+    memory = resident_memory_bytes()
+    if memory is not None:
+        add('process_resident_memory_bytes', 'gauge', 'Resident memory of the application process.', memory)
+
+    for level, count in zip(TOLERANCE_LEVELS, list(metrics.tolerance_counts)):
+        add('tolerance_points_total', 'counter', 'Analysed points per tolerance level.',
+            count, {'level': level})
+
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """GET /metrics 返回指标，其余路径 404"""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus(self.server.metrics).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class MetricsServer:
+    """本机指标 HTTP 服务（守护线程）"""
+
+    def __init__(self, metrics, host='127.0.0.1', port=9464):
+        """
+        Args:
+            metrics: StationMetrics
+            host: str，监听地址（默认仅本机）
+            port: int，端口（0为自动分配）
+        """
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        启动服务
+
+        Returns:
+            bool: 是否启动成功（端口被占用等情况下返回 False，不影响主程序）
+        """
+        try:
+            self._server = HTTPServer((self.host, self.port), _MetricsRequestHandler)
+        except OSError as e:
+            logger.error(f"指标服务启动失败 ({self.host}:{self.port}): {e}")
+            return False
+        self._server.metrics = self.metrics
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info(f"指标服务已启动: http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        """停止服务"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+法向估计模块 - 理论点云逐点法向的一次性预计算
+
+以k近邻协方差矩阵的最小特征向量（PCA）估计法向，按块向量化计算并在线程池中
+并行处理（KD树查询与批量特征分解均释放GIL）；结果可写入索引缓存，
+同一理论点云再次加载时直接读取
+"""
+
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from spatial_index import SpatialIndex
+
+
+# 法向算法版本，算法变化时递增使旧缓存失效
+NORMALS_VERSION = 1
+
+# 默认近邻数
+DEFAULT_NORMAL_K = 12
+
+# 每个并行任务处理的点数
+NORMAL_CHUNK_POINTS = 32768
+
+# 缓存条目类型
+NORMALS_CACHE_KIND = 'normals'
+
+
+def _estimate_chunk(points, spatial_index, k, out, start, stop):
+    """估计 points[start:stop] 的法向并写入 out 对应区间"""
+    _, indices = spatial_index.query(points[start:stop], k=k, workers=1)
+    neighbours = spatial_index.points[indices]
+    centered = neighbours - neighbours.mean(axis=1, keepdims=True)
+    covariance = np.matmul(centered.transpose(0, 2, 1), centered)
+    _, eigenvectors = np.linalg.eigh(covariance)
+    out[start:stop] = eigenvectors[:, :, 0]
+
+
+def estimate_normals(points, spatial_index=None, k=DEFAULT_NORMAL_K, workers=None,
+                     chunk_points=NORMAL_CHUNK_POINTS):
+    """
+    以k近邻PCA估计点云法向，并统一朝向远离X轴的一侧
+
+    Args:
+        points: numpy数组 (N, 3)，点坐标
+        spatial_index: SpatialIndex，点云空间索引（可选，缺省时新建）
+        k: int，近邻数
+        workers: int，并行线程数（None为CPU核心数，1为串行）
+        chunk_points: int，每块点数
+
+    Returns:
+        numpy数组 (N, 3)，单位法向
+    """
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    if spatial_index is None:
+        spatial_index = SpatialIndex(points)
+    k = min(k, len(spatial_index))
+
+    normals = np.empty_like(points)
+    starts = range(0, len(points), chunk_points)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(starts) <= 1:
+        for start in starts:
+            _estimate_chunk(points, spatial_index, k, normals, start, start + chunk_points)
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(starts))) as executor:
+            futures = [
+                executor.submit(_estimate_chunk, points, spatial_index, k, normals,
+                                start, start + chunk_points)
+                for start in starts
+            ]
+            for future in futures:
+                future.result()
+
+    return orient_outward(points, normals)
+
+
+def orient_outward(points, normals):
+    """
+    模具曲面绕X轴分布，将法向统一翻转为指向径向外侧（原地修改）
+
+    Args:
+        points: numpy数组 (N, 3)
+        normals: numpy数组 (N, 3)
+
+    Returns:
+        normals
+    """
+    flip = points[:, 1] * normals[:, 1] + points[:, 2] * normals[:, 2] < 0
+    normals[flip] *= -1
+    return normals
+
+
+def normals_cache_params(k):
+    """返回影响法向结果的参数，用于生成缓存键"""
+    return {'version': NORMALS_VERSION, 'k': k}
+
+
+def load_cached_normals(index_cache, fingerprint, k, point_count):
+    """
+    从索引缓存读取预计算法向
+
+    Args:
+        index_cache: IndexCache
+        fingerprint: str，理论数据指纹
+        k: int，估计法向使用的近邻数
+        point_count: int，理论点数（用于校验）
+
+    Returns:
+        numpy数组 (N, 3) 或 None（未命中）
+    """
+    key = index_cache.make_key(NORMALS_CACHE_KIND, fingerprint, normals_cache_params(k))
+    arrays = index_cache.get(key)
+    if arrays is None or 'normals' not in arrays:
+        return None
+    normals = arrays['normals']
+    if normals.shape != (point_count, 3):
+        return None
+    return normals
+
+
+def store_cached_normals(index_cache, fingerprint, k, normals):
+    """
+    将法向写入索引缓存
+
+    Args:
+        index_cache: IndexCache
+        fingerprint: str，理论数据指纹
+        k: int，估计法向使用的近邻数
+        normals: numpy数组 (N, 3)
+    """
+    key = index_cache.make_key(NORMALS_CACHE_KIND, fingerprint, normals_cache_params(k))
+    index_cache.put(key, {'normals': np.ascontiguousarray(normals, dtype=np.float64)})
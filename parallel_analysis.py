@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程并行分析 - 按文件或按X范围分片重分析，或将单个测量流分片到进程池；理论模型以内存映射只读共享
+
+主进程构建（或从索引缓存加载）一次理论索引与法向，以 .npy 文件写入临时目录；
+各工作进程通过 SharedArrayStore 以 mmap_mode='r' 加载，多个进程共享同一份页缓存，
+索引数组不经 pickle 传递。SharedArrayStore 与 IndexCache 接口相同，
+直接作为 AnalysisEngine 的 index_cache 使用，工作进程中的索引加载流程与缓存命中时一致。
+KD树（scipy cKDTree）无法映射共享，由各工作进程从共享的点与法向重新构建。
+
+各分片返回 ErrorStatistics 部分统计，主进程按分片/文件顺序精确合并。
+
+ShardedStreamAnalysis 用于单个高速测头的实时分析：每批测量数据按序号块或X站位分片，
+查找与误差计算在工作进程中完成，结果按 sequence 重组后由主进程的分析引擎按顺序累积
+统计、配准与形状误差，结果与单进程逐批处理完全相同
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from index_cache import IndexCache
+from theoretical_index import TheoreticalIndex
+from normal_estimation import DEFAULT_NORMAL_K, store_cached_normals
+from error_statistics import ErrorStatistics
+from app_logging import get_logger
+
+
+logger = get_logger('analysis')
+
+# 共享存储中理论点云各列的条目名
+THEORETICAL_KEY = 'theoretical'
+
+# 工作进程内的分析引擎（进程初始化时创建一次）
+_process_engine = None
+
+# 测量流分片方式：'sequence' 按序号连续分块；'x' 按X站位（同一站位的点在同一片）
+SHARD_BY_SEQUENCE = 'sequence'
+SHARD_BY_X = 'x'
+
+# 每片最少点数，批次较小时少分片（至少一片，仍在工作进程中计算）
+DEFAULT_MIN_SHARD_POINTS = 200
+
+
+class SharedArrayStore:
+    """只读共享数组目录：每个条目一个子目录，每个数组一个 .npy 文件，按内存映射加载"""
+
+    make_key = staticmethod(IndexCache.make_key)
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory: str，存储目录
+        """
+        self.directory = directory
+
+    def get(self, key):
+        """
+        以只读内存映射加载条目
+
+        Returns:
+            dict（数组名 -> numpy.memmap）或 None
+        """
+        path = os.path.join(self.directory, key)
+        if not os.path.isdir(path):
+            return None
+        return {
+            name[:-4]: np.load(os.path.join(path, name), mmap_mode='r', allow_pickle=False)
+            for name in sorted(os.listdir(path)) if name.endswith('.npy')
+        }
+
+    def put(self, key, arrays):
+        """写入条目（只在启动工作进程前由主进程调用）"""
+        path = os.path.join(self.directory, key)
+        os.makedirs(path, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, name + '.npy'), np.ascontiguousarray(array), allow_pickle=False)
+
+
+def publish_model(engine, store):
+    """
+    将分析引擎已构建的理论点云、查找索引与估计法向写入共享存储
+
+    Args:
+        engine: AnalysisEngine
+        store: SharedArrayStore
+    """
+    data = engine.theoretical_data
+    store.put(THEORETICAL_KEY, {
+        column: data[column].to_numpy()
+        for column in data.columns if np.issubdtype(data[column].dtype, np.number)
+    })
+
+    index = engine.theoretical_index
+    if index is not None:
+        params = TheoreticalIndex.cache_params(index.x_precision, index.angle_precision)
+        store.put(store.make_key('lookup', engine.theoretical_fingerprint(), params), index.to_arrays())
+
+    deviation_engine = engine.deviation_engine
+    if deviation_engine is not None and not all(col in data.columns for col in ('nx', 'ny', 'nz')):
+        store_cached_normals(store, engine.theoretical_fingerprint(), DEFAULT_NORMAL_K, deviation_engine.normals)
+
+
+def _init_process(store_directory, surface_definition, options):
+    """工作进程初始化：从共享存储创建分析引擎"""
+    global _process_engine
+    from app_logging import setup_logging
+    from analytic_surface import create_surface
+    from batch_analysis import create_batch_engine
+    setup_logging(level='WARNING')
+
+    store = SharedArrayStore(store_directory)
+    theoretical_data = pd.DataFrame(store.get(THEORETICAL_KEY), copy=False)
+    reference_surface = create_surface(surface_definition) if surface_definition else None
+    _process_engine = create_batch_engine(theoretical_data, reference_surface, store, **options)
+
+
+def _process_run_task(path, name, output_dir, fmt, align):
+    from batch_analysis import process_run
+    return process_run(_process_engine, path, name, output_dir, fmt, align)
+
+
+def _analyse_shard_task(measurement_data):
+    from batch_analysis import analyse_run
+    return analyse_run(_process_engine, measurement_data, align=False)
+
+
+def _analyse_stream_task(measurement_data):
+    """查找与误差计算（不含等级判定与统计，由主进程在重组后完成）"""
+    engine = _process_engine
+    batch = engine.lookup_measurement_batch(measurement_data)
+    if batch is not None:
+        batch['errors'] = engine.calculate_error_batch(batch['theoretical'], batch['measured_points'],
+                                                       batch['contact_radius'], batch['normals'])
+    return batch
+
+
+def stream_options(engine):
+    """由主进程的分析引擎得到工作进程引擎的构造参数（只做查找与误差计算，不配准）"""
+    deviation_engine = engine.deviation_engine
+    return {
+        'tolerance_qualified': engine.tolerance_qualified,
+        'tolerance_attention': engine.tolerance_attention,
+        'tolerance_over_limit': engine.tolerance_over_limit,
+        'probe_tip_radius': engine.probe_tip_radius,
+        'normal_deviation': deviation_engine is not None,
+        'normal_deviation_k': deviation_engine.k if deviation_engine is not None else DEFAULT_NORMAL_K,
+        'alignment': False,
+    }
+
+
+def concatenate_batches(parts):
+    """
+    按序号重组各分片的分析结果
+
+    Args:
+        parts: list of dict 或 None，各分片的 lookup_measurement_batch() 字段与 'errors'
+
+    Returns:
+        dict 或 None（全部分片都没有有效测量点）：数组逐项拼接后按 sequence 稳定排序
+    """
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        return None
+    batch = _concatenate(parts)
+    if len(parts) > 1:
+        order = np.argsort(batch['sequence'], kind='stable')
+        batch = _take(batch, order)
+    return batch
+
+
+def _concatenate(values):
+    first = values[0]
+    if isinstance(first, dict):
+        return {key: _concatenate([value[key] for value in values]) for key in first}
+    if first is None:
+        return None
+    return np.concatenate(values) if len(values) > 1 else first
+
+
+def _take(value, order):
+    if isinstance(value, dict):
+        return {key: _take(item, order) for key, item in value.items()}
+    return value[order] if value is not None else None
+
+
+class ParallelAnalysis:
+    """进程池并行分析（上下文管理器，退出时关闭进程池并删除共享存储）"""
+
+    def __init__(self, engine, options, jobs):
+        """
+        Args:
+            engine: AnalysisEngine，主进程中已构建索引的分析引擎（发布共享模型、合并后的配准）
+            options: dict，batch_analysis.engine_options() 给出的构造参数
+            jobs: int，工作进程数
+        """
+        self.engine = engine
+        self.jobs = jobs
+        self.store_directory = tempfile.mkdtemp(prefix='mold-analysis-')
+        try:
+            publish_model(engine, SharedArrayStore(self.store_directory))
+        except Exception:
+            shutil.rmtree(self.store_directory, ignore_errors=True)
+            raise
+
+        surface = engine.reference_surface
+        # spawn：不继承主进程的线程状态，各平台行为一致
+        self.executor = ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_process,
+            initargs=(self.store_directory, surface.to_dict() if surface is not None else None, options),
+        )
+        logger.info(f"并行分析: {jobs} 个工作进程，共享理论模型目录 {self.store_directory}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self.store_directory, ignore_errors=True)
+
+    def process_runs(self, runs, output_dir, fmt, align):
+        """
+        按文件分片并行分析
+
+        Args:
+            runs: list of (测量文件路径, 输出名)
+
+        Yields:
+            (文件序号, (汇总行, ErrorStatistics) 或 None, 异常或 None)，按完成顺序
+        """
+        futures = {
+            self.executor.submit(_process_run_task, path, name, output_dir, fmt, align): i
+            for i, (path, name) in enumerate(runs)
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+    def process_run_sharded(self, path, name, output_dir, fmt, align):
+        """
+        将一个测量文件按X范围分为 jobs 片并行分析，合并逐点结果与部分统计
+
+        Returns:
+            (汇总行 dict, ErrorStatistics)
+        """
+        from batch_analysis import read_measurements, align_run, write_table, summary_row
+
+        start = time.perf_counter()
+        data = read_measurements(path)
+        # 按X排序后等点数切分，每片为一个连续X范围
+        order = np.argsort(data['x_pos_mm'].to_numpy(), kind='stable')
+        shards = [data.iloc[np.sort(rows)] for rows in np.array_split(order, self.jobs) if len(rows)]
+
+        statistics = ErrorStatistics()
+        parts = []
+        skipped = 0
+        # map 按分片顺序返回，合并顺序固定
+        for columns, shard_statistics, extra in self.executor.map(_analyse_shard_task, shards):
+            statistics.merge(shard_statistics)
+            skipped += extra['skipped_points']
+            if columns:
+                parts.append(columns)
+
+        columns = {}
+        if parts:
+            columns = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+            order = np.argsort(columns['sequence'], kind='stable')
+            columns = {key: values[order] for key, values in columns.items()}
+
+        extra = {'skipped_points': skipped}
+        # 配准需要全部测量点，在主进程中对合并结果进行
+        if align and columns and self.engine.alignment_target is not None:
+            extra.update(align_run(self.engine, columns))
+        output_path = write_table(columns, os.path.join(output_dir, name), fmt) if columns else ''
+        elapsed = time.perf_counter() - start
+        return summary_row(name, path, output_path, statistics, extra, elapsed), statistics
+
+
+class ShardedStreamAnalysis(ParallelAnalysis):
+    """
+    单个测量流的分片并行分析
+
+    submit() 将一批测量数据分片提交到进程池后立即返回，多批可以同时在不同进程中计算；
+    按提交顺序对每批调用 collect() 与 accumulate()，统计、配准与形状误差的累积顺序与单进程相同
+    """
+
+    def __init__(self, engine, jobs, shard_by=SHARD_BY_SEQUENCE, min_shard_points=DEFAULT_MIN_SHARD_POINTS):
+        """
+        Args:
+            engine: AnalysisEngine，主进程中的分析引擎（累积统计、配准与形状误差）
+            jobs: int，工作进程数
+            shard_by: str，分片方式，SHARD_BY_SEQUENCE 或 SHARD_BY_X
+            min_shard_points: int，每片最少点数
+        """
+        if shard_by not in (SHARD_BY_SEQUENCE, SHARD_BY_X):
+            raise ValueError(f"不支持的分片方式: {shard_by}")
+        super().__init__(engine, stream_options(engine), jobs)
+        self.shard_by = shard_by
+        self.min_shard_points = max(1, int(min_shard_points))
+        # 同时在计算中的批数上限（保持各进程忙碌，又不无限积压）
+        self.max_pending = 2 * jobs
+
+    def shard(self, measurement_data):
+        """
+        将一批测量数据分片
+
+        Returns:
+            list of DataFrame
+        """
+        count = len(measurement_data)
+        shard_count = min(self.jobs, max(1, count // self.min_shard_points))
+        if shard_count == 1:
+            return [measurement_data]
+
+        if self.shard_by == SHARD_BY_SEQUENCE:
+            groups = np.array_split(np.arange(count), shard_count)
+        else:
+            # 按X排序后在站位边界处切分，各片点数尽量相等
+            x_pos = measurement_data['x_pos_mm'].to_numpy()
+            order = np.argsort(x_pos, kind='stable')
+            _, starts = np.unique(x_pos[order], return_index=True)
+            targets = np.arange(1, shard_count) * count / shard_count
+            cuts = np.unique(np.append(starts, count)[np.searchsorted(starts, targets)])
+            groups = [np.sort(rows) for rows in np.split(order, cuts)]
+        return [measurement_data.iloc[rows] for rows in groups if len(rows)]
+
+    def submit(self, measurement_data):
+        """
+        分片提交一批测量数据
+
+        Returns:
+            list of concurrent.futures.Future，按分片顺序
+        """
+        return [self.executor.submit(_analyse_stream_task, shard) for shard in self.shard(measurement_data)]
+
+    def collect(self, futures):
+        """等待一批的全部分片并按序号重组（见 concatenate_batches）"""
+        return concatenate_batches([future.result() for future in futures])
+
+    def accumulate(self, batch):
+        """
+        在主进程的分析引擎中累积一批重组后的结果
+
+        Returns:
+            dict 或 None：同 AnalysisEngine.process_batch()
+        """
+        if batch is None:
+            return None
+        metrics = self.engine.pipeline_metrics
+        if metrics is not None:
+            metrics.mark('lookup', batch['sequence'])
+            metrics.count('lookup', len(batch['sequence']))
+        return self.engine.accumulate_batch(batch)
+
+    def process_batch(self, measurement_data):
+        """
+        分片并行分析一批测量数据并等待结果（与 AnalysisEngine.process_batch() 相同）
+        """
+        return self.accumulate(self.collect(self.submit(measurement_data)))
+
+    def finish(self):
+        return self.engine.finish()
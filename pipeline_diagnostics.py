@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线诊断面板 - 显示各阶段延迟分位数与吞吐量，可导出JSON
+"""
+
+from PySide6.QtCore import QObject, QEvent, QTimer
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox,
+                               QSpinBox, QPushButton, QTableWidget, QTableWidgetItem,
+                               QHeaderView, QFileDialog)
+
+from config import AppConfig
+from pipeline_metrics import STAGES
+from app_logging import get_logger
+
+
+logger = get_logger('ui')
+
+LATENCY_COLUMNS = ['阶段', '样本数', '平均(ms)', 'P50(ms)', 'P95(ms)', 'P99(ms)', '最大(ms)']
+THROUGHPUT_COLUMNS = ['阶段', '累计点数', '速率(点/秒)']
+
+
+class PaintProbe(QObject):
+    """记录已送达界面的测量点在其所在部件下一次绘制时的时间（ui_paint 阶段）"""
+
+    def __init__(self, widget, metrics):
+        super().__init__(widget)
+        self.metrics = metrics
+        self.pending = []
+        self.unpainted = 0
+        widget.installEventFilter(self)
+
+    def add(self, sequence):
+        """登记已加入界面、等待绘制的测量点（只在开启采样时记录，且只保存采样点的序号）"""
+        sample_every = self.metrics.sample_every
+        if not sample_every:
+            return
+        self.unpainted += 1
+        if sequence % sample_every == 0:
+            self.pending.append(sequence)
+
+    def clear(self):
+        self.pending = []
+        self.unpainted = 0
+
+    def eventFilter(self, watched, event):
+        if self.unpainted and event.type() == QEvent.Paint:
+            if self.pending:
+                self.metrics.mark('ui_paint', self.pending)
+            self.metrics.count('ui_paint', self.unpainted)
+            self.clear()
+        return False
+
+
+class PipelineDiagnosticsDialog(QDialog):
+    """流水线诊断对话框"""
+
+    def __init__(self, metrics, parent=None):
+        """
+        Args:
+            metrics: PipelineMetrics
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.metrics = metrics
+        self.setWindowTitle("流水线诊断")
+        self.resize(760, 520)
+
+        layout = QVBoxLayout(self)
+
+        control_layout = QHBoxLayout()
+        self.sampling_check = QCheckBox("启用延迟采样，每")
+        self.sampling_check.setChecked(metrics.enabled)
+        self.sampling_check.toggled.connect(self.apply_sampling)
+        control_layout.addWidget(self.sampling_check)
+        self.sample_spin = QSpinBox()
+        self.sample_spin.setRange(1, 10000)
+        self.sample_spin.setValue(metrics.sample_every or AppConfig.PIPELINE_DIAGNOSTICS_SAMPLE_EVERY)
+        self.sample_spin.valueChanged.connect(self.apply_sampling)
+        control_layout.addWidget(self.sample_spin)
+        control_layout.addWidget(QLabel("个点采样一个"))
+        control_layout.addStretch()
+
+        reset_btn = QPushButton("重置")
+        reset_btn.clicked.connect(self.reset_metrics)
+        control_layout.addWidget(reset_btn)
+        export_btn = QPushButton("导出JSON")
+        export_btn.clicked.connect(self.export_json)
+        control_layout.addWidget(export_btn)
+        layout.addLayout(control_layout)
+
+        layout.addWidget(QLabel("阶段延迟"))
+        self.latency_table = self.create_table(LATENCY_COLUMNS)
+        layout.addWidget(self.latency_table, 2)
+
+        layout.addWidget(QLabel("吞吐量"))
+        self.throughput_table = self.create_table(THROUGHPUT_COLUMNS)
+        self.throughput_table.setRowCount(len(STAGES))
+        layout.addWidget(self.throughput_table, 1)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.auto_refresh)
+        self.timer.start(AppConfig.PIPELINE_DIAGNOSTICS_REFRESH_INTERVAL)
+        self.refresh()
+
+    def create_table(self, columns):
+        table = QTableWidget(0, len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        return table
+
+    def apply_sampling(self):
+        """按界面设置开启/关闭延迟采样"""
+        self.metrics.set_sample_every(self.sample_spin.value() if self.sampling_check.isChecked() else 0)
+        self.refresh()
+
+    def auto_refresh(self):
+        """窗口可见时定时刷新"""
+        if self.isVisible():
+            self.refresh()
+
+    def refresh(self):
+        """刷新指标显示"""
+        snapshot = self.metrics.snapshot()
+
+        latency = snapshot['latency']
+        self.latency_table.setRowCount(len(latency))
+        for row, (name, summary) in enumerate(latency.items()):
+            values = [name, str(summary['count'])] + [
+                f"{summary[key]:.3f}" for key in ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')
+            ]
+            for col, value in enumerate(values):
+                self.latency_table.setItem(row, col, QTableWidgetItem(value))
+
+        for row, (stage, counter) in enumerate(snapshot['throughput'].items()):
+            values = [stage, str(counter['total']), f"{counter['rate_per_s']:.1f}"]
+            for col, value in enumerate(values):
+                self.throughput_table.setItem(row, col, QTableWidgetItem(value))
+
+        sampling = f"每 {snapshot['sample_every']} 个点采样一个" if snapshot['sample_every'] else "延迟采样已关闭"
+        self.status_label.setText(f"{sampling}，在途采样点 {snapshot['in_flight']} 个")
+
+    def reset_metrics(self):
+        self.metrics.reset()
+        self.refresh()
+
+    def export_json(self):
+        """将当前指标快照导出为JSON文件"""
+        file_path, _ = QFileDialog.getSaveFileName(self, "导出流水线指标", "pipeline_metrics.json",
+                                                   "JSON文件 (*.json)")
+        if not file_path:
+            return
+        try:
+            self.metrics.dump(file_path)
+            logger.info(f"流水线指标已导出: {file_path}")
+        except OSError as e:
+            logger.error(f"导出流水线指标失败: {e}")
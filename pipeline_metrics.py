@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测量流水线性能指标模块 - 分阶段延迟直方图与吞吐量计数
+
+每个测量点依次经过以下阶段（时间戳均取 time.perf_counter()，进程内各线程可比）：
+    acquire → file_write → analysis_read → lookup → error_compute → signal_emit
+    → ui_receive → ui_paint
+按序号采样（每 sample_every 个点取一个）记录各阶段时间戳，相邻阶段之差计入对应的
+对数分桶延迟直方图，并记录 acquire → ui_paint 的端到端延迟。吞吐量按阶段计数全部点，
+同样只在开启采样时记录。sample_every 为 0 时 mark() 与 count() 在第一行返回，开销仅为一次方法调用
+"""
+
+import json
+import math
+import time
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+
+# 流水线阶段（按先后顺序）
+STAGES = ('acquire', 'file_write', 'analysis_read', 'lookup', 'error_compute',
+          'signal_emit', 'ui_receive', 'ui_paint')
+
+# 端到端延迟的统计名
+END_TO_END = 'acquire→ui_paint'
+
+# 直方图分桶：下限1μs，每桶放大 2^(1/8)（相对误差约4.5%），上限约 1μs·2^40 ≈ 12天
+HISTOGRAM_MIN_SECONDS = 1e-6
+HISTOGRAM_BUCKETS_PER_OCTAVE = 8
+HISTOGRAM_BUCKET_COUNT = 40 * HISTOGRAM_BUCKETS_PER_OCTAVE
+
+# 同时跟踪的在途采样点上限（超出时丢弃最旧的）
+MAX_IN_FLIGHT = 10000
+
+# 吞吐量统计窗口(秒)
+THROUGHPUT_WINDOW = 5
+
+
+class LatencyHistogram:
+    """对数分桶延迟直方图，可合并"""
+
+    def __init__(self):
+        self.counts = np.zeros(HISTOGRAM_BUCKET_COUNT, dtype=np.int64)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @staticmethod
+    def bucket_index(seconds):
+        if seconds <= HISTOGRAM_MIN_SECONDS:
+            return 0
+        index = int(math.log2(seconds / HISTOGRAM_MIN_SECONDS) * HISTOGRAM_BUCKETS_PER_OCTAVE)
+        return min(index, HISTOGRAM_BUCKET_COUNT - 1)
+
+    @staticmethod
+    def bucket_upper(index):
+        """桶上界(秒)"""
+        return HISTOGRAM_MIN_SECONDS * 2.0 ** ((index + 1) / HISTOGRAM_BUCKETS_PER_OCTAVE)
+
+    def record(self, seconds):
+        """记录一次延迟(秒)"""
+        seconds = max(seconds, 0.0)
+        self.counts[self.bucket_index(seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """合并另一个直方图"""
+        self.counts += other.counts
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        """
+        分位数(秒)，取所在桶上界（不超过记录到的最大值）
+
+        Args:
+            q: float，0~100
+        """
+        if self.total == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(self.total * q / 100.0)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(self.bucket_upper(index), self.max)
+
+    def summary(self):
+        """统计摘要，单位毫秒"""
+        return {
+            'count': self.total,
+            'mean_ms': self.sum / self.total * 1000 if self.total else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000,
+        }
+
+
+class ThroughputCounter:
+    """按整秒分桶的吞吐量计数器"""
+
+    def __init__(self, window=THROUGHPUT_WINDOW):
+        self.window = window
+        self.total = 0
+        self.buckets = deque(maxlen=window + 1)
+
+    def add(self, count, now=None):
+        second = int(time.monotonic() if now is None else now)
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += count
+        else:
+            self.buckets.append([second, count])
+        self.total += count
+
+    def rate(self, now=None):
+        """最近 window 个完整秒的平均速率（点/秒）"""
+        second = int(time.monotonic() if now is None else now)
+        recent = sum(c for s, c in self.buckets if second - self.window <= s < second)
+        return recent / self.window
+
+
+class PipelineMetrics:
+    """测量流水线分阶段延迟与吞吐量指标（线程安全）"""
+
+    def __init__(self, sample_every=0):
+        """
+        Args:
+            sample_every: int，每多少个序号采样一个点记录阶段时间戳（0为关闭延迟采样）
+        """
+        self.sample_every = int(sample_every)
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def enabled(self):
+        return self.sample_every > 0
+
+    def set_sample_every(self, sample_every):
+        """修改采样间隔（0为关闭）"""
+        self.sample_every = int(sample_every)
+
+    def reset(self):
+        """清空全部指标"""
+        with self._lock:
+            self.histograms = {}
+            self.throughput = {stage: ThroughputCounter() for stage in STAGES}
+            self.in_flight = OrderedDict()
+            self.started = time.time()
+
+    def mark(self, stage, sequences, timestamp=None):
+        """
+        记录一批测量点到达某阶段的时间
+
+        Args:
+            stage: str，阶段名（STAGES之一）
+            sequences: int 或 numpy数组，测量点序号
+            timestamp: float，time.perf_counter() 时间（缺省为当前时间）
+        """
+        if not self.sample_every:
+            return
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        sequences = np.atleast_1d(sequences)
+        sampled = sequences[sequences % self.sample_every == 0]
+        if len(sampled) == 0:
+            return
+
+        with self._lock:
+            for sequence in sampled.tolist():
+                stamps = self.in_flight.get(sequence)
+                if stamps is None:
+                    if stage != STAGES[0]:
+                        continue  # 采样开启前已进入流水线的点
+                    stamps = self.in_flight[sequence] = {}
+                    if len(self.in_flight) > MAX_IN_FLIGHT:
+                        self.in_flight.popitem(last=False)
+                elif stamps:
+                    previous_stage, previous_time = next(reversed(stamps.items()))
+                    self._histogram(f'{previous_stage}→{stage}').record(timestamp - previous_time)
+                stamps[stage] = timestamp
+
+                if stage == STAGES[-1]:
+                    self._histogram(END_TO_END).record(timestamp - stamps[STAGES[0]])
+                    del self.in_flight[sequence]
+
+    def count(self, stage, count=1):
+        """累计某阶段处理的点数（吞吐量，开启采样时记录）"""
+        if not self.sample_every:
+            return
+        counter = self.throughput[stage]
+        with self._lock:
+            counter.add(count)
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+
+    def snapshot(self):
+        """
+        当前指标快照
+
+        Returns:
+            dict:
+                'sample_every': 采样间隔
+                'latency': {阶段转换: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}，按流水线顺序
+                'throughput': {阶段: {total, rate_per_s}}
+                'in_flight': 尚未到达 ui_paint 的采样点数
+        """
+        order = {stage: i for i, stage in enumerate(STAGES)}
+
+        def sort_key(name):
+            if name == END_TO_END:
+                return (len(STAGES), 0)
+            source, target = name.split('→')
+            return (order.get(target, 0), order.get(source, 0))
+
+        with self._lock:
+            latency = {name: self.histograms[name].summary()
+                       for name in sorted(self.histograms, key=sort_key)}
+            throughput = {stage: {'total': counter.total, 'rate_per_s': counter.rate()}
+                          for stage, counter in self.throughput.items()}
+            in_flight = len(self.in_flight)
+
+        return {
+            'timestamp': time.time(),
+            'uptime_s': time.time() - self.started,
+            'sample_every': self.sample_every,
+            'latency': latency,
+            'throughput': throughput,
+            'in_flight': in_flight,
+        }
+
+    def dump(self, file_path):
+        """将指标快照写入JSON文件"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
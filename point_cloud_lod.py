@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+点云多分辨率模块 - 理论点云显示用的体素网格金字塔
+
+第0层为原始点云，此后每层体素边长加倍，每个体素保留最接近体素质心的一个原始点：
+结果确定（同一点云每次加载显示相同），且代表点位于真实曲面上，细小特征只要占据
+体素即被保留。金字塔按理论点云一次性预计算，显示时按点数预算和当前视野选层
+"""
+
+import numpy as np
+
+
+# 最细体素层的体素边长 = 点云包围盒最大边长 / LOD_FINEST_DIVISIONS
+LOD_FINEST_DIVISIONS = 1024
+
+# 点数不超过该值后不再生成更粗的层
+LOD_MIN_POINTS = 256
+
+
+def _voxel_representatives(points, indices, voxel_size, origin):
+    """
+    按体素聚合，每个体素取最接近体素质心的点
+
+    Args:
+        points: numpy数组 (N, 3)，原始点云
+        indices: numpy数组 (M,)，上一层代表点在原始点云中的索引
+        voxel_size: float，体素边长
+        origin: numpy数组 (3,)，体素网格原点
+
+    Returns:
+        numpy数组，本层代表点的原始索引（按体素编号排序）
+    """
+    level_points = points[indices]
+    cells = np.floor((level_points - origin) / voxel_size).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+    # 按体素编号稳定排序，同一体素的点连续排列
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    sorted_points = level_points[order]
+    starts = np.flatnonzero(np.concatenate([[True], sorted_keys[1:] != sorted_keys[:-1]]))
+    counts = np.diff(np.append(starts, len(sorted_keys)))
+    group = np.repeat(np.arange(len(starts)), counts)
+
+    centroids = np.add.reduceat(sorted_points, starts, axis=0) / counts[:, np.newaxis]
+    offset = sorted_points - centroids[group]
+    distance = np.einsum('ij,ij->i', offset, offset)
+
+    # 每个体素取到质心距离最小的点（并列时取排序在前者）
+    nearest = np.flatnonzero(distance == np.minimum.reduceat(distance, starts)[group])
+    first = nearest[np.concatenate([[True], group[nearest[1:]] != group[nearest[:-1]]])]
+    return indices[order[first]]
+
+
+class PointCloudLOD:
+    """理论点云的体素网格金字塔"""
+
+    def __init__(self, points, finest_divisions=LOD_FINEST_DIVISIONS, min_points=LOD_MIN_POINTS):
+        """
+        预计算全部层级
+
+        Args:
+            points: numpy数组 (N, 3)，理论点云
+            finest_divisions: int，最细体素层沿包围盒最大边的体素数
+            min_points: int，层点数不超过该值后停止生成更粗的层
+        """
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        self.origin = self.points.min(axis=0)
+        extent = float(np.ptp(self.points, axis=0).max()) if len(self.points) else 0.0
+
+        self.level_indices = [np.arange(len(self.points))]
+        self.voxel_sizes = [0.0]
+        if extent <= 0:
+            return
+
+        voxel_size = extent / finest_divisions
+        while len(self.level_indices[-1]) > min_points and voxel_size <= extent:
+            indices = _voxel_representatives(self.points, self.level_indices[-1], voxel_size, self.origin)
+            if len(indices) < len(self.level_indices[-1]):
+                self.level_indices.append(indices)
+                self.voxel_sizes.append(voxel_size)
+            voxel_size *= 2.0
+
+    @property
+    def level_count(self):
+        return len(self.level_indices)
+
+    def level_sizes(self):
+        """各层点数（第0层为原始点云）"""
+        return [len(indices) for indices in self.level_indices]
+
+    def select(self, point_budget, bounds=None):
+        """
+        选择视野内点数不超过预算的最细层级
+
+        Args:
+            point_budget: int，显示点数上限
+            bounds: (min_xyz, max_xyz)，当前视野范围（可选，缺省为整个点云）
+
+        Returns:
+            (level, indices)：层级号与视野内代表点的原始索引
+        """
+        # 由粗到细逐层检查，视野内点数超出预算即停止，避免对大层做无谓的裁剪
+        level = self.level_count - 1
+        selected = self._crop(self.level_indices[level], bounds)
+        for candidate in range(self.level_count - 2, -1, -1):
+            indices = self.level_indices[candidate]
+            if bounds is None and len(indices) > point_budget:
+                break
+            indices = self._crop(indices, bounds)
+            if len(indices) > point_budget:
+                break
+            level, selected = candidate, indices
+        return level, selected
+
+    def _crop(self, indices, bounds):
+        """保留视野范围内的点"""
+        if bounds is None:
+            return indices
+        lower, upper = np.asarray(bounds[0]), np.asarray(bounds[1])
+        level_points = self.points[indices]
+        inside = np.all((level_points >= lower) & (level_points <= upper), axis=1)
+        return indices[inside]
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+理论点云生成库 - 向量化生成多种参数化曲面点云
+
+支持圆柱、圆锥、圆环段和自由曲面（B样条曲面片），采样密度任意；
+输出CSV或二进制(.npy)格式，无界面依赖，可用于生成千万级测试模具
+
+命令行示例:
+    python pointcloud_generator.py cylinder --radius 500 --length 2000 --x-step 1 --angle-step 0.05 -o data/cylinder.npy
+    python pointcloud_generator.py bspline --length 2000 --radius 500 --u-count 3000 --v-count 3000 -o data/freeform.npy
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+from analytic_surface import CylinderSurface, ConeSurface, TorusSurface
+
+
+# 二进制点云格式：numpy .npy，形状 (N, 3) 的 float64 数组，列依次为 x_mm, y_mm, z_mm
+BINARY_SUFFIX = ".npy"
+
+# CSV分块写入的行数
+CSV_CHUNK_ROWS = 200000
+
+
+def generate_cylinder(radius, length, x_step, angle_step, angle_start=0.0, angle_end=180.0):
+    """生成圆柱面点云"""
+    surface = CylinderSurface(radius, 0.0, length, angle_start, angle_end)
+    return surface.sample_points(x_step, angle_step)
+
+
+def generate_cone(radius_start, radius_end, length, x_step, angle_step,
+                  angle_start=0.0, angle_end=180.0):
+    """生成圆锥面点云"""
+    surface = ConeSurface(radius_start, radius_end, 0.0, length, angle_start, angle_end)
+    return surface.sample_points(x_step, angle_step)
+
+
+def generate_torus_patch(major_radius, minor_radius, x_step, angle_step,
+                         angle_start=0.0, angle_end=180.0):
+    """生成圆环段（鼓形）曲面点云，X范围为截面圆的完整外侧弧"""
+    surface = TorusSurface(major_radius, minor_radius, center_x=minor_radius,
+                           angle_start=angle_start, angle_end=angle_end)
+    return surface.sample_points(x_step, angle_step)
+
+
+def bspline_basis(t, degree, control_count):
+    """
+    向量化计算钳位均匀B样条基函数矩阵
+
+    Args:
+        t: numpy数组 (K,)，[0, 1]内的参数值
+        degree: int，样条次数
+        control_count: int，控制点数
+
+    Returns:
+        numpy数组 (K, control_count)
+    """
+    if control_count <= degree:
+        raise ValueError("控制点数必须大于样条次数")
+
+    inner = np.linspace(0.0, 1.0, control_count - degree + 1)
+    knots = np.concatenate([np.zeros(degree), inner, np.ones(degree)])
+    t = np.asarray(t, dtype=np.float64)[:, np.newaxis]
+
+    # 0次基函数：t落在的节点区间为1；t=1时归入最后一个非空区间
+    basis = ((knots[:-1] <= t) & (t < knots[1:])).astype(np.float64)
+    basis[t[:, 0] >= 1.0, control_count - 1] = 1.0
+
+    # Cox-de Boor 递推，0/0 按 0 处理
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for d in range(1, degree + 1):
+            left_den = knots[d:-1] - knots[:-d - 1]
+            right_den = knots[d + 1:] - knots[1:-d]
+            left = np.where(left_den > 0, (t - knots[:-d - 1]) / left_den, 0.0)
+            right = np.where(right_den > 0, (knots[d + 1:] - t) / right_den, 0.0)
+            basis = left * basis[:, :-1] + right * basis[:, 1:]
+
+    return basis
+
+
+def generate_bspline_patch(control_points, u_count, v_count, degree=3):
+    """
+    生成B样条自由曲面片点云
+
+    Args:
+        control_points: numpy数组 (M, N, 3)，控制点网格
+        u_count: int，u方向采样数
+        v_count: int，v方向采样数
+        degree: int，样条次数
+
+    Returns:
+        numpy数组 (u_count * v_count, 3)
+    """
+    control_points = np.asarray(control_points, dtype=np.float64)
+    m, n, _ = control_points.shape
+    basis_u = bspline_basis(np.linspace(0.0, 1.0, u_count), degree, m)
+    basis_v = bspline_basis(np.linspace(0.0, 1.0, v_count), degree, n)
+
+    # S(u, v) = Σ Σ Nu_i(u) Nv_j(v) P_ij，先沿v收缩减少中间量
+    partial = np.einsum('vj,ijc->vic', basis_v, control_points)
+    points = np.einsum('ui,vic->uvc', basis_u, partial)
+    return points.reshape(-1, 3)
+
+
+def freeform_control_grid(length, radius, control_u=8, control_v=8, amplitude=5.0, seed=0):
+    """
+    构造自由曲面控制点网格：以半圆柱为基础，叠加可复现的径向扰动
+
+    Args:
+        length: float，X方向长度(mm)
+        radius: float，基础半径(mm)
+        control_u: int，X方向控制点数
+        control_v: int，周向控制点数
+        amplitude: float，径向扰动幅度(mm)
+        seed: int，随机种子
+
+    Returns:
+        numpy数组 (control_u, control_v, 3)
+    """
+    rng = np.random.default_rng(seed)
+    x_values = np.linspace(0.0, length, control_u)
+    theta = np.linspace(0.0, np.pi, control_v)
+    radii = radius + amplitude * rng.uniform(-1.0, 1.0, size=(control_u, control_v))
+
+    grid = np.empty((control_u, control_v, 3), dtype=np.float64)
+    grid[:, :, 0] = x_values[:, np.newaxis]
+    grid[:, :, 1] = radii * np.cos(theta)
+    grid[:, :, 2] = radii * np.sin(theta)
+    return grid
+
+
+def save_pointcloud_csv(points, filename, decimals=3):
+    """
+    保存点云到CSV文件（x_mm, y_mm, z_mm），分块格式化写入
+
+    Args:
+        points: numpy数组 (N, 3)
+        filename: str，输出路径
+        decimals: int，小数位数
+    """
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    row_format = f"%.{decimals}f,%.{decimals}f,%.{decimals}f\n"
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        f.write("x_mm,y_mm,z_mm\n")
+        for start in range(0, len(points), CSV_CHUNK_ROWS):
+            chunk = points[start:start + CSV_CHUNK_ROWS]
+            f.write((row_format * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+
+def save_pointcloud_binary(points, filename):
+    """
+    保存点云到二进制文件（.npy，(N, 3) float64）
+
+    Args:
+        points: numpy数组 (N, 3)
+        filename: str，输出路径
+    """
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    np.save(filename, np.ascontiguousarray(points, dtype=np.float64))
+
+
+def load_pointcloud_binary(filename, mmap=False):
+    """
+    加载二进制点云文件
+
+    Args:
+        filename: str，.npy文件路径
+        mmap: bool，是否以只读内存映射方式打开
+
+    Returns:
+        numpy数组 (N, 3)
+    """
+    points = np.load(filename, mmap_mode='r' if mmap else None, allow_pickle=False)
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError(f"二进制点云形状应为 (N, 3)，实际为 {points.shape}")
+    return points
+
+
+def save_pointcloud(points, filename):
+    """按扩展名选择输出格式保存点云"""
+    if filename.endswith(BINARY_SUFFIX):
+        save_pointcloud_binary(points, filename)
+    else:
+        save_pointcloud_csv(points, filename)
+
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="理论点云生成器（向量化，多曲面类型）")
+    subparsers = parser.add_subparsers(dest='shape', required=True)
+
+    def add_common(sub, default_output):
+        sub.add_argument('-o', '--output', default=default_output,
+                         help="输出文件，.npy 为二进制格式，其余为CSV")
+        sub.add_argument('--angle-start', type=float, default=0.0, help="角度起点(度)")
+        sub.add_argument('--angle-end', type=float, default=180.0, help="角度终点(度)")
+
+    cylinder = subparsers.add_parser('cylinder', help="圆柱面")
+    cylinder.add_argument('--radius', type=float, default=500.0)
+    cylinder.add_argument('--length', type=float, default=2000.0)
+    cylinder.add_argument('--x-step', type=float, default=10.0)
+    cylinder.add_argument('--angle-step', type=float, default=1.0)
+    add_common(cylinder, "data/cylinder_pointcloud.npy")
+
+    cone = subparsers.add_parser('cone', help="圆锥面")
+    cone.add_argument('--radius-start', type=float, default=500.0)
+    cone.add_argument('--radius-end', type=float, default=400.0)
+    cone.add_argument('--length', type=float, default=2000.0)
+    cone.add_argument('--x-step', type=float, default=10.0)
+    cone.add_argument('--angle-step', type=float, default=1.0)
+    add_common(cone, "data/cone_pointcloud.npy")
+
+    torus = subparsers.add_parser('torus', help="圆环段（鼓形）曲面")
+    torus.add_argument('--major-radius', type=float, default=400.0)
+    torus.add_argument('--minor-radius', type=float, default=300.0)
+    torus.add_argument('--x-step', type=float, default=5.0)
+    torus.add_argument('--angle-step', type=float, default=1.0)
+    add_common(torus, "data/torus_pointcloud.npy")
+
+    bspline = subparsers.add_parser('bspline', help="B样条自由曲面片")
+    bspline.add_argument('--length', type=float, default=2000.0)
+    bspline.add_argument('--radius', type=float, default=500.0)
+    bspline.add_argument('--u-count', type=int, default=201, help="X方向采样数")
+    bspline.add_argument('--v-count', type=int, default=181, help="周向采样数")
+    bspline.add_argument('--control', type=int, default=8, help="每个方向的控制点数")
+    bspline.add_argument('--amplitude', type=float, default=5.0, help="径向扰动幅度(mm)")
+    bspline.add_argument('--degree', type=int, default=3)
+    bspline.add_argument('--seed', type=int, default=0)
+    bspline.add_argument('-o', '--output', default="data/freeform_pointcloud.npy",
+                         help="输出文件，.npy 为二进制格式，其余为CSV")
+
+    return parser
+
+
+def main(argv=None):
+    """命令行入口"""
+    args = build_parser().parse_args(argv)
+
+    start_time = time.perf_counter()
+    if args.shape == 'cylinder':
+        points = generate_cylinder(args.radius, args.length, args.x_step, args.angle_step,
+                                   args.angle_start, args.angle_end)
+    elif args.shape == 'cone':
+        points = generate_cone(args.radius_start, args.radius_end, args.length,
+                               args.x_step, args.angle_step, args.angle_start, args.angle_end)
+    elif args.shape == 'torus':
+        points = generate_torus_patch(args.major_radius, args.minor_radius, args.x_step,
+                                      args.angle_step, args.angle_start, args.angle_end)
+    else:
+        control_points = freeform_control_grid(args.length, args.radius, args.control,
+                                               args.control, args.amplitude, args.seed)
+        points = generate_bspline_patch(control_points, args.u_count, args.v_count, args.degree)
+    generate_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    save_pointcloud(points, args.output)
+    save_time = time.perf_counter() - start_time
+
+    print(f"Generated {len(points)} points ({args.shape}) in {generate_time:.2f}s")
+    print(f"Saved to {args.output} in {save_time:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+刚体配准模块 - 测量点到理论模型的点到平面ICP最佳拟合
+
+估计将测量点变换到理论模型坐标系的刚体变换 p' = R·p + t，消除工件装夹偏差带来的
+系统性误差。每次迭代批量求对应点与法向，线性化后求解6参数最小二乘：
+    r_i + ω·(p_i × n_i) + t·n_i = 0
+对回转曲面，绕X轴旋转与沿X轴平移等不可观测方向通过截断小特征值自动置零
+"""
+
+import numpy as np
+
+
+# 迭代参数
+ICP_MAX_ITERATIONS = 30
+ICP_TOLERANCE = 1e-7            # 参数增量收敛阈值（旋转以特征长度换算为mm）
+ICP_RMS_TOLERANCE = 1e-3        # 残差RMS相对变化收敛阈值（最近点对应存在离散跳动）
+ICP_REFINE_ITERATIONS = 1       # 收敛后使用精确曲面对应点的精化迭代次数
+ICP_REJECT_FACTOR = 3.0         # 残差离群剔除阈值（鲁棒标准差倍数）
+ICP_MIN_REJECT_DISTANCE = 0.01  # 离群剔除阈值下限(mm)
+ICP_EIGEN_CUTOFF = 1e-4         # 法方程特征值相对截断阈值，低于该比例的方向视为不可观测
+
+
+def rotation_from_vector(omega):
+    """
+    旋转向量转旋转矩阵（Rodrigues公式）
+
+    Args:
+        omega: numpy数组 (3,)，旋转轴 × 旋转角(弧度)
+
+    Returns:
+        numpy数组 (3, 3)
+    """
+    angle = np.linalg.norm(omega)
+    if angle < 1e-15:
+        return np.eye(3)
+    kx, ky, kz = omega / angle
+    k = np.array([[0.0, -kz, ky], [kz, 0.0, -kx], [-ky, kx, 0.0]])
+    return np.eye(3) + np.sin(angle) * k + (1.0 - np.cos(angle)) * (k @ k)
+
+
+def apply_transform(points, rotation, translation):
+    """对点集应用刚体变换 p' = R·p + t"""
+    return points @ rotation.T + translation
+
+
+def rotation_angles_deg(rotation):
+    """
+    将旋转矩阵分解为绕X、Y、Z轴的旋转角（R = Rz·Ry·Rx）
+
+    Returns:
+        (rx, ry, rz)，单位：度
+    """
+    ry = np.arcsin(-np.clip(rotation[2, 0], -1.0, 1.0))
+    rx = np.arctan2(rotation[2, 1], rotation[2, 2])
+    rz = np.arctan2(rotation[1, 0], rotation[0, 0])
+    return tuple(float(v) for v in np.degrees([rx, ry, rz]))
+
+
+class PointCloudTarget:
+    """以理论点云（法向偏差引擎）为配准目标"""
+
+    def __init__(self, deviation_engine):
+        """
+        Args:
+            deviation_engine: NormalDeviationEngine，含空间索引与逐点法向
+        """
+        self.engine = deviation_engine
+
+    def correspond(self, points, exact=False):
+        """
+        批量求对应点与法向
+
+        Args:
+            points: numpy数组 (N, 3)
+            exact: bool，False 取最近理论点及其法向；True 取局部拟合曲面上的投影点与法向
+
+        Returns:
+            (targets, normals, valid)
+        """
+        if exact:
+            result = self.engine.query(points)
+            return result['foot_points'], result['normals'], np.ones(len(points), dtype=bool)
+        _, indices = self.engine.spatial_index.query(points, k=1)
+        indices = indices[:, 0]
+        return self.engine.points[indices], self.engine.normals[indices], np.ones(len(points), dtype=bool)
+
+
+class AnalyticSurfaceTarget:
+    """以解析回转曲面为配准目标"""
+
+    def __init__(self, surface):
+        """
+        Args:
+            surface: AnalyticSurface
+        """
+        self.surface = surface
+
+    def correspond(self, points, exact=False):
+        """
+        批量求对应点与法向：同一(x, θ)处的曲面点及其外法向
+
+        Returns:
+            (targets, normals, valid)
+        """
+        angle_deg = np.degrees(np.arctan2(points[:, 2], points[:, 1]))
+        radius, normals, valid = self.surface.evaluate(points[:, 0], angle_deg)
+        angle_rad = np.radians(angle_deg)
+        targets = np.column_stack([points[:, 0], radius * np.cos(angle_rad), radius * np.sin(angle_rad)])
+        return targets, normals, valid
+
+
+def _residuals(source, target, rotation, translation, exact):
+    """计算变换后测量点的点到平面残差，并按鲁棒阈值标记内点"""
+    moved = apply_transform(source, rotation, translation)
+    targets, normals, valid = target.correspond(moved, exact=exact)
+    residual = np.einsum('ij,ij->i', moved - targets, normals)
+
+    # 鲁棒离群剔除：以中位数绝对偏差估计残差标准差
+    valid &= np.isfinite(residual)
+    if valid.any():
+        center = np.median(residual[valid])
+        spread = 1.4826 * np.median(np.abs(residual[valid] - center))
+        limit = max(ICP_REJECT_FACTOR * spread, ICP_MIN_REJECT_DISTANCE)
+        valid &= np.abs(residual - center) <= limit
+    return moved, normals, residual, valid
+
+
+def point_to_plane_icp(source, target, rotation=None, translation=None,
+                       max_iterations=ICP_MAX_ITERATIONS, tolerance=ICP_TOLERANCE,
+                       refine_iterations=ICP_REFINE_ITERATIONS):
+    """
+    点到平面ICP刚体配准
+
+    先以最近理论点为对应点迭代至收敛，再以精确曲面投影点精化
+
+    Args:
+        source: numpy数组 (N, 3)，测量点
+        target: PointCloudTarget 或 AnalyticSurfaceTarget
+        rotation: numpy数组 (3, 3)，初始旋转（可选，用于增量配准的热启动）
+        translation: numpy数组 (3,)，初始平移（可选）
+        max_iterations: int，粗配准最大迭代次数
+        tolerance: float，参数增量收敛阈值
+        refine_iterations: int，精化迭代次数
+
+    Returns:
+        dict:
+            'rotation', 'translation': 变换 p' = R·p + t
+            'initial_rms', 'rms': 配准前后的点到平面残差RMS(mm)
+            'iterations', 'converged', 'inliers': 迭代次数、是否收敛、最终内点数
+    """
+    source = np.ascontiguousarray(source, dtype=np.float64)
+    rotation = np.eye(3) if rotation is None else np.array(rotation, dtype=np.float64)
+    translation = np.zeros(3) if translation is None else np.array(translation, dtype=np.float64)
+
+    # 旋转参数按特征长度缩放，使6个参数量纲一致
+    scale = max(float(np.sqrt(np.mean(np.einsum('ij,ij->i', source, source)))), 1e-9)
+
+    _, _, residual, mask = _residuals(source, target, rotation, translation, exact=True)
+    initial_rms = float(np.sqrt(np.mean(residual[mask]**2))) if mask.any() else 0.0
+
+    iterations = 0
+    converged = False
+    previous_rms = None
+    schedule = [False] * max_iterations + [True] * refine_iterations
+    for exact in schedule:
+        if converged and not exact:
+            continue
+
+        moved, normals, residual, mask = _residuals(source, target, rotation, translation, exact)
+        if mask.sum() < 6:
+            break
+
+        if not exact:
+            current_rms = float(np.sqrt(np.mean(residual[mask]**2)))
+            if previous_rms is not None and abs(previous_rms - current_rms) <= ICP_RMS_TOLERANCE * previous_rms:
+                converged = True
+                continue
+            previous_rms = current_rms
+
+        # 线性化：r + ω·(p × n) + t·n，按特征值截断求最小范数解
+        jacobian = np.column_stack([np.cross(moved[mask], normals[mask]) / scale, normals[mask]])
+        normal_matrix = jacobian.T @ jacobian
+        gradient = jacobian.T @ residual[mask]
+        eigenvalues, eigenvectors = np.linalg.eigh(normal_matrix)
+        keep = eigenvalues > ICP_EIGEN_CUTOFF * max(eigenvalues[-1], 1e-300)
+        delta = -(eigenvectors[:, keep] @ ((eigenvectors[:, keep].T @ gradient) / eigenvalues[keep]))
+
+        step_rotation = rotation_from_vector(delta[:3] / scale)
+        rotation = step_rotation @ rotation
+        translation = step_rotation @ translation + delta[3:]
+        iterations += 1
+
+        if not exact and np.linalg.norm(delta) < tolerance:
+            converged = True
+
+    # 正交化，消除迭代累积的数值误差
+    u, _, vt = np.linalg.svd(rotation)
+    rotation = u @ vt
+
+    _, _, residual, mask = _residuals(source, target, rotation, translation, exact=True)
+    rms = float(np.sqrt(np.mean(residual[mask]**2))) if mask.any() else 0.0
+
+    return {
+        'rotation': rotation,
+        'translation': translation,
+        'initial_rms': initial_rms,
+        'rms': rms,
+        'iterations': iterations,
+        'converged': converged,
+        'inliers': int(mask.sum()),
+    }
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台渲染模块 - 在独立线程中用 Agg 后端绘制 matplotlib 图形
+
+界面线程只提交场景数据（numpy数组与视图参数），渲染线程持有各视图的 Figure，
+绘制完成后以 QImage 发回，界面线程仅做一次贴图。每个视图只保留最新一帧待渲染
+请求：渲染线程忙时新请求覆盖旧请求（丢帧），交互延迟与图形复杂度无关
+"""
+
+import threading
+import importlib.util
+import numpy as np
+from PySide6.QtCore import QThread, Signal, Qt, QRectF
+from PySide6.QtGui import QImage, QPainter, QColor
+from PySide6.QtWidgets import QWidget
+
+from app_logging import get_logger
+
+
+logger = get_logger('render')
+
+# 只检查 matplotlib 是否可用，实际导入在渲染线程中进行，不占用启动时间
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec('matplotlib') is not None
+
+
+# 渲染分辨率
+RENDER_DPI = 100
+
+
+def draw_point_cloud_scene(figure, scene):
+    """
+    绘制理论点云与测量点的3D散点图
+
+    Args:
+        figure: matplotlib Figure
+        scene: dict，'theoretical_points' (N, 3)、'measured_points' (M, 3)、
+               'measured_colors' (M,)、'limits' (min_xyz, max_xyz)、'elev'、'azim'
+    """
+    figure.clear()
+    ax = figure.add_subplot(111, projection='3d')
+
+    points = scene['theoretical_points']
+    ax.scatter(points[:, 0], points[:, 1], zs=points[:, 2],
+               c='lightblue', s=1, alpha=0.3, label='Theoretical Points')
+
+    measured = scene.get('measured_points')
+    if measured is not None and len(measured) > 0:
+        ax.scatter(measured[:, 0], measured[:, 1], zs=measured[:, 2],
+                   c=list(scene['measured_colors']), s=20, alpha=0.8)
+
+    lower, upper = scene['limits']
+    ax.set_xlim3d(lower[0], upper[0])
+    ax.set_ylim3d(lower[1], upper[1])
+    ax.set_zlim3d(lower[2], upper[2])
+    ax.view_init(elev=scene['elev'], azim=scene['azim'])
+
+    ax.set_xlabel('X (mm)')
+    ax.set_ylabel('Y (mm)')
+    ax.set_zlabel('Z (mm)')
+    ax.set_title('Theoretical vs Measured Point Cloud', pad=10)
+    ax.legend()
+    figure.tight_layout()
+
+
+def draw_histogram_scene(figure, scene):
+    """
+    绘制误差分布直方图
+
+    Args:
+        figure: matplotlib Figure
+        scene: dict，'errors' 误差数组、'tolerance' 合格阈值
+    """
+    figure.clear()
+    ax = figure.add_subplot(111)
+    errors = scene['errors']
+    tolerance = scene['tolerance']
+
+    if len(errors) > 0:
+        ax.hist(errors, bins=20, alpha=0.7, color='skyblue', edgecolor='black')
+
+        mean_error = np.mean(errors)
+        ax.axvline(mean_error, color='red', linestyle='--',
+                   linewidth=2, label=f'Mean: {mean_error:.3f}')
+
+        ax.axvline(tolerance, color='green', linestyle=':', alpha=0.7, label='Tolerance Range')
+        ax.axvline(-tolerance, color='green', linestyle=':', alpha=0.7)
+        ax.legend(fontsize=8)
+    else:
+        ax.text(0.5, 0.5, 'No Data Available', transform=ax.transAxes,
+                ha='center', va='center', fontsize=10)
+
+    ax.set_xlabel('Error (mm)', fontsize=8)
+    ax.set_ylabel('Frequency', fontsize=8)
+    ax.tick_params(axis='both', labelsize=8)
+    figure.tight_layout()
+
+
+class RenderWorker(QThread):
+    """后台渲染线程 - 每个视图只渲染最新提交的场景"""
+
+    frame_ready = Signal(str, QImage)  # 视图名，渲染结果
+
+    def __init__(self):
+        super().__init__()
+        self.renderers = {}
+        self.figures = {}
+        self.pending = {}
+        self.is_running = False
+        self.rendered_frames = 0
+        self.dropped_frames = 0
+        self._condition = threading.Condition()
+
+    def register_view(self, name, draw_function):
+        """
+        注册视图
+
+        Args:
+            name: str，视图名
+            draw_function: callable(figure, scene)，在渲染线程中绘制场景
+        """
+        self.renderers[name] = draw_function
+
+    def submit(self, name, scene, width, height):
+        """
+        提交待渲染场景（界面线程调用，立即返回）
+
+        Args:
+            name: str，视图名
+            scene: dict，场景数据（提交后不应再被修改）
+            width, height: int，目标像素尺寸
+        """
+        if width <= 1 or height <= 1:
+            return
+        with self._condition:
+            if name in self.pending:
+                self.dropped_frames += 1
+            self.pending[name] = (scene, width, height)
+            self._condition.notify()
+
+    def start(self):
+        """启动渲染线程（在 run() 之前置位，避免与 stop() 竞争）"""
+        self.is_running = True
+        super().start()
+
+    def run(self):
+        """渲染循环"""
+        while True:
+            with self._condition:
+                while self.is_running and not self.pending:
+                    self._condition.wait()
+                if not self.is_running:
+                    break
+                name = next(iter(self.pending))
+                scene, width, height = self.pending.pop(name)
+
+            try:
+                image = self.render(name, scene, width, height)
+            except Exception as e:
+                logger.error(f"渲染视图 {name} 时出错: {e}")
+                continue
+            self.rendered_frames += 1
+            self.frame_ready.emit(name, image)
+
+    def render(self, name, scene, width, height):
+        """
+        以 Agg 后端绘制场景并转换为 QImage
+
+        Returns:
+            QImage
+        """
+        figure = self.figures.get(name)
+        if figure is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            figure = Figure(dpi=RENDER_DPI)
+            FigureCanvasAgg(figure)
+            self.figures[name] = figure
+
+        figure.set_size_inches(width / RENDER_DPI, height / RENDER_DPI)
+        self.renderers[name](figure, scene)
+        figure.canvas.draw()
+
+        buffer = np.asarray(figure.canvas.buffer_rgba())
+        image = QImage(buffer.data, buffer.shape[1], buffer.shape[0], buffer.shape[1] * 4,
+                       QImage.Format_RGBA8888)
+        # 拷贝一份，使 QImage 与 Agg 缓冲区脱离
+        return image.copy()
+
+    def stop(self):
+        """停止渲染线程"""
+        with self._condition:
+            self.is_running = False
+            self.pending.clear()
+            self._condition.notify()
+
+
+class RenderedView(QWidget):
+    """显示后台渲染结果的部件 - 绘制时只贴图，并将鼠标操作转为信号"""
+
+    resized = Signal()
+    mouse_dragged = Signal(float, float, object)  # dx, dy, 按键
+    mouse_released = Signal()
+    wheel_scrolled = Signal(int)  # 滚轮格数，向上为正
+
+    def __init__(self, placeholder_text="", parent=None):
+        super().__init__(parent)
+        self.image = None
+        self.placeholder_text = placeholder_text
+        self._last_position = None
+        self.setMinimumSize(1, 1)
+
+    def set_image(self, image):
+        """显示新一帧"""
+        self.image = image
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(255, 255, 255))
+        if self.image is not None:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+            painter.drawImage(QRectF(self.rect()), self.image)
+        elif self.placeholder_text:
+            painter.setPen(QColor(100, 116, 139))
+            painter.drawText(self.rect(), Qt.AlignCenter, self.placeholder_text)
+        painter.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit()
+
+    def mousePressEvent(self, event):
+        self._last_position = event.position()
+
+    def mouseMoveEvent(self, event):
+        if self._last_position is None:
+            return
+        position = event.position()
+        dx = position.x() - self._last_position.x()
+        dy = position.y() - self._last_position.y()
+        self._last_position = position
+        self.mouse_dragged.emit(dx, dy, event.buttons())
+
+    def mouseReleaseEvent(self, event):
+        self._last_position = None
+        self.mouse_released.emit()
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() // 120
+        if steps:
+            self.wheel_scrolled.emit(steps)
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多工位测量会话管理 - 一个进程内同时运行多个测头/工位的测量
+
+每个会话有自己的设备、分析引擎与测量文件，以 async_pipeline.ProbeChannel 运行，
+全部会话共用一个事件循环。同一模具（理论数据、解析曲面与法向偏差设置相同）的会话
+共享一份理论查找索引与法向偏差引擎，只在首个会话创建时构建（或从索引缓存加载）。
+会话自身即流水线结果的接收方，保存最新统计、配准、形状误差与最近的分析结果，
+界面按固定间隔读取，不随测量点频率刷新
+"""
+
+import os
+import json
+import time
+from collections import OrderedDict, deque
+
+from analysis_engine import AnalysisEngine
+from async_pipeline import ProbeChannel, PipelinePublisher
+from error_statistics import ErrorStatistics
+from theoretical_index import TheoreticalIndex
+from app_logging import get_logger
+
+
+logger = get_logger('analysis')
+
+# 会话测量文件目录
+DEFAULT_OUTPUT_DIR = os.path.join('measurement_data', 'sessions')
+
+# 每个会话保留的最近分析结果条数（会话视图的数据表格）
+DEFAULT_RECENT_RESULTS = 200
+
+# 会话状态
+STATUS_CREATED = '未开始'
+STATUS_RUNNING = '测量中'
+STATUS_PAUSED = '已暂停'
+STATUS_FINISHED = '已完成'
+STATUS_STOPPED = '已停止'
+STATUS_ERROR = '出错'
+
+
+class MeasurementSession(PipelinePublisher):
+    """一个测量会话：设备 → 分析引擎 → 测量文件，并保存供界面显示的最新结果"""
+
+    def __init__(self, name, mold_name, device, engine, output_file_path, model_key=None,
+                 recent_results=DEFAULT_RECENT_RESULTS, **channel_options):
+        """
+        Args:
+            name: str，会话名称（唯一）
+            mold_name: str，模具名称（显示用）
+            device: 提供 read() 异步生成器的设备对象
+            engine: AnalysisEngine
+            output_file_path: str，测量数据文件路径
+            model_key: 共享模型的模具键（SessionManager.model_key()）
+            recent_results: int，保留的最近分析结果条数
+            **channel_options: 传给 ProbeChannel 的队列与凑批参数
+        """
+        self.name = name
+        self.mold_name = mold_name
+        self.engine = engine
+        self.output_file_path = output_file_path
+        self.model_key = model_key
+        self.channel = ProbeChannel(name, device, engine, output_file_path, publisher=self, **channel_options)
+        self.task = None
+
+        self.status = STATUS_CREATED
+        self.error_message = None
+        self.started_at = None
+        self.finished_at = None
+        self.measured_points = 0
+        self.last_sequence = 0
+        self.error_statistics = ErrorStatistics()
+        self.alignment = None
+        self.form_metrics = None
+        self.recent_results = deque(maxlen=recent_results)
+        # 每次有新结果时加一，界面据此跳过未变化的会话
+        self.version = 0
+
+    @property
+    def total_points(self):
+        return self.channel.device.total_points
+
+    def start(self, loop):
+        self.status = STATUS_RUNNING
+        self.started_at = time.time()
+        self.task = loop.create_task(self.channel.run())
+        logger.info(f"会话 {self.name} 开始测量（模具 {self.mold_name}）")
+
+    @property
+    def is_running(self):
+        return self.task is not None and not self.task.done()
+
+    def pause(self):
+        if self.status == STATUS_RUNNING:
+            self.channel.pause()
+            self.status = STATUS_PAUSED
+            self.version += 1
+
+    def resume(self):
+        if self.status == STATUS_PAUSED:
+            self.channel.resume()
+            self.status = STATUS_RUNNING
+            self.version += 1
+
+    def stop(self):
+        """停止测量，已读取的点分析完毕后结束"""
+        if self.is_running:
+            self.channel.stop()
+
+    def cancel(self):
+        """立即取消（不等待剩余数据分析）"""
+        if self.is_running:
+            self.task.cancel()
+            self.status = STATUS_STOPPED
+            self.finished_at = time.time()
+
+    # ---- PipelinePublisher ----
+
+    def measurement_point(self, channel, sequence, x_pos, angle_deg, measured_radius):
+        self.measured_points += 1
+        self.last_sequence = sequence
+
+    def analysis_update(self, channel, update):
+        result = update['result']
+        radius_error = result['errors']['radius_error']
+        self.error_statistics.add(radius_error, self.engine.tolerance_levels(radius_error))
+        self.store_updates(update)
+        # 只转换最近结果所需的尾部
+        tail = len(result['sequence']) - self.recent_results.maxlen
+        if tail > 0:
+            result = {key: self.tail(value, tail) for key, value in result.items()}
+        self.recent_results.extend(self.engine.result_records(result))
+        self.version += 1
+
+    @classmethod
+    def tail(cls, value, start):
+        if isinstance(value, dict):
+            return {key: cls.tail(item, start) for key, item in value.items()}
+        return value[start:] if value is not None else None
+
+    def analysis_finished(self, channel, update):
+        self.store_updates(update)
+        self.status = STATUS_STOPPED if channel.is_stopping else STATUS_FINISHED
+        self.finished_at = time.time()
+        self.version += 1
+        logger.info(f"会话 {self.name} {self.status}，已分析 {self.error_statistics.count} 点")
+
+    def pipeline_error(self, channel, message):
+        self.status = STATUS_ERROR
+        self.error_message = message
+        self.finished_at = time.time()
+        self.version += 1
+
+    def store_updates(self, update):
+        if update['alignment'] is not None:
+            self.alignment = update['alignment']
+        if update['form_metrics'] is not None:
+            self.form_metrics = update['form_metrics']
+
+    def summary(self):
+        """
+        会话总览行
+
+        Returns:
+            dict：name, mold, status, measured_points, total_points, 以及 ErrorStatistics.to_dict() 的字段，
+            另含 pass_rate（合格率）、alignment_rms、max_roundness、elapsed_s、output_path、error
+        """
+        summary = {
+            'name': self.name,
+            'mold': self.mold_name,
+            'status': self.status,
+            'measured_points': self.measured_points,
+            'total_points': self.total_points,
+        }
+        summary.update(self.error_statistics.to_dict())
+        count = self.error_statistics.count
+        summary['pass_rate'] = summary['within_tolerance_count'] / count if count else None
+        summary['alignment_rms'] = self.alignment['rms'] if self.alignment else None
+        summary['max_roundness'] = (self.form_metrics['summary']['max_roundness_mz']
+                                    if self.form_metrics and self.form_metrics['summary']['section_count'] else None)
+        end = self.finished_at or time.time()
+        summary['elapsed_s'] = end - self.started_at if self.started_at else 0.0
+        summary['output_path'] = self.output_file_path
+        summary['error'] = self.error_message
+        return summary
+
+
+class SessionManager:
+    """多个测量会话的创建、启停与总览；同一模具的会话共享理论索引"""
+
+    def __init__(self, index_cache=None, output_dir=DEFAULT_OUTPUT_DIR, recent_results=DEFAULT_RECENT_RESULTS,
+                 channel_options=None):
+        """
+        Args:
+            index_cache: IndexCache，理论索引磁盘缓存（可选），模具首次使用时从中加载
+            output_dir: str，会话测量文件目录
+            recent_results: int，每个会话保留的最近分析结果条数
+            channel_options: dict，传给 ProbeChannel 的队列与凑批参数（可选）
+        """
+        self.index_cache = index_cache
+        self.output_dir = output_dir
+        self.recent_results = recent_results
+        self.channel_options = channel_options or {}
+        self.sessions = OrderedDict()
+        # 模具键 -> 只用于共享索引与法向偏差引擎的 AnalysisEngine
+        self.models = {}
+        self._counter = 0
+
+    @staticmethod
+    def model_key(theoretical_data, reference_surface, normal_deviation, normal_deviation_k):
+        """模具键：理论数据指纹、解析曲面定义与法向偏差设置"""
+        surface = json.dumps(reference_surface.to_dict(), sort_keys=True) if reference_surface is not None else None
+        return (TheoreticalIndex.fingerprint(theoretical_data), surface,
+                bool(normal_deviation), normal_deviation_k if normal_deviation else None)
+
+    def shared_model(self, key, theoretical_data, reference_surface=None, normal_deviation=True,
+                     normal_deviation_k=12):
+        """
+        取得模具的共享模型（首次使用时构建）
+
+        Args:
+            key: model_key() 给出的模具键
+
+        Returns:
+            AnalysisEngine
+        """
+        model = self.models.get(key)
+        if model is None:
+            model = AnalysisEngine(theoretical_data, index_cache=self.index_cache,
+                                   reference_surface=reference_surface, normal_deviation=normal_deviation,
+                                   normal_deviation_k=normal_deviation_k, alignment=False, form_metrics=False)
+            self.models[key] = model
+            logger.info(f"模具模型已构建并共享，当前共 {len(self.models)} 个模具")
+        return model
+
+    def create_session(self, theoretical_data, device, mold_name='', name=None, reference_surface=None,
+                       normal_deviation=True, normal_deviation_k=12, **analysis_options):
+        """
+        创建会话（不启动）
+
+        Args:
+            theoretical_data: Pandas DataFrame，理论点云数据
+            device: 提供 read() 异步生成器的设备对象
+            mold_name: str，模具名称（显示用）
+            name: str，会话名称（缺省时自动编号）
+            reference_surface: AnalyticSurface，解析参考曲面（可选）
+            normal_deviation, normal_deviation_k: 法向偏差设置（决定共享的模型）
+            **analysis_options: 其余 AnalysisEngine 参数（误差阈值、测头半径、配准、形状误差等）
+
+        Returns:
+            MeasurementSession
+        """
+        if name is None:
+            self._counter += 1
+            name = f"工位{self._counter}"
+            while name in self.sessions:
+                self._counter += 1
+                name = f"工位{self._counter}"
+        elif name in self.sessions:
+            raise ValueError(f"会话名称已存在: {name}")
+
+        key = self.model_key(theoretical_data, reference_surface, normal_deviation, normal_deviation_k)
+        model = self.shared_model(key, theoretical_data, reference_surface, normal_deviation, normal_deviation_k)
+        engine = AnalysisEngine(theoretical_data, reference_surface=reference_surface,
+                                normal_deviation=normal_deviation, normal_deviation_k=normal_deviation_k,
+                                shared_model=model, **analysis_options)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        output_file_path = os.path.join(self.output_dir, f"{name}.csv")
+        session = MeasurementSession(name, mold_name, device, engine, output_file_path, key,
+                                     self.recent_results, **self.channel_options)
+        self.sessions[name] = session
+        return session
+
+    def start(self, loop, name=None):
+        """
+        启动会话
+
+        Args:
+            loop: asyncio 事件循环（如 QtAsyncBridge.loop）
+            name: str，会话名称（缺省时启动全部未开始的会话）
+        """
+        sessions = [self.sessions[name]] if name is not None else self.sessions.values()
+        for session in sessions:
+            if session.status == STATUS_CREATED:
+                session.start(loop)
+
+    def pause(self, name):
+        self.sessions[name].pause()
+
+    def resume(self, name):
+        self.sessions[name].resume()
+
+    def stop(self, name):
+        self.sessions[name].stop()
+
+    def stop_all(self):
+        for session in self.sessions.values():
+            session.stop()
+
+    def cancel_all(self):
+        for session in self.sessions.values():
+            session.cancel()
+
+    def remove(self, name):
+        """移除已结束的会话；模具没有其余会话使用时释放共享模型"""
+        session = self.sessions[name]
+        if session.is_running:
+            raise ValueError(f"会话 {name} 仍在运行，请先停止")
+        del self.sessions[name]
+        if all(other.model_key != session.model_key for other in self.sessions.values()):
+            self.models.pop(session.model_key, None)
+
+    @property
+    def running_count(self):
+        return sum(session.is_running for session in self.sessions.values())
+
+    def overview(self):
+        """全部会话的总览行（按创建顺序）"""
+        return [session.summary() for session in self.sessions.values()]
+
+    def combined_statistics(self):
+        """
+        全部会话的合并误差统计（按创建顺序合并，结果确定）
+
+        Returns:
+            ErrorStatistics
+        """
+        combined = ErrorStatistics()
+        for session in self.sessions.values():
+            combined.merge(session.error_statistics)
+        return combined
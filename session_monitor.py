@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多工位会话面板 - 全部会话的总览表与每个会话的视图
+
+总览页每行一个会话，末行为全部会话的合并统计；每个会话一页，显示其统计、配准与形状误差
+以及最近的分析结果。按固定间隔读取 SessionManager，只重绘有新结果的会话
+"""
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel,
+                               QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QTabWidget,
+                               QMessageBox)
+
+from config import AppConfig
+from app_logging import get_logger
+
+
+logger = get_logger('ui')
+
+OVERVIEW_COLUMNS = ['会话', '模具', '状态', '进度', '已分析点数', '平均误差(mm)', '标准差(mm)',
+                    '最大误差(mm)', '最小误差(mm)', '合格率', '配准RMS(mm)', '最大圆度(mm)']
+RESULT_COLUMNS = ['序号', 'X (mm)', '角度 (°)', '测量半径(mm)', '理论半径(mm)', '误差(mm)', '状态']
+
+# 总览表合计行的名称
+COMBINED_ROW_NAME = '合计'
+
+
+def format_value(value, fmt):
+    """数值格式化，None/NaN 显示为 '-'"""
+    if value is None or value != value:
+        return '-'
+    return format(value, fmt)
+
+
+def create_table(columns):
+    table = QTableWidget(0, len(columns))
+    table.setHorizontalHeaderLabels(columns)
+    table.verticalHeader().setVisible(False)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    table.setEditTriggers(QTableWidget.NoEditTriggers)
+    table.setSelectionBehavior(QTableWidget.SelectRows)
+    table.setSelectionMode(QTableWidget.SingleSelection)
+    return table
+
+
+def set_row(table, row, values):
+    for col, value in enumerate(values):
+        table.setItem(row, col, QTableWidgetItem(value))
+
+
+class SessionView(QWidget):
+    """单个会话的视图：统计、配准与形状误差，以及最近的分析结果"""
+
+    def __init__(self, session, parent=None):
+        super().__init__(parent)
+        self.session = session
+        self.version = None
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+        self.labels = {}
+        for key, title in (('status', "状态"), ('progress', "进度"), ('errors', "平均 / 标准差"),
+                           ('range', "最大 / 最小误差"), ('pass_rate', "合格率"),
+                           ('alignment', "配准RMS"), ('roundness', "最大圆度"), ('output', "测量文件")):
+            self.labels[key] = QLabel("-")
+            form.addRow(title + ":", self.labels[key])
+        layout.addLayout(form)
+
+        layout.addWidget(QLabel("最近分析结果"))
+        self.results_table = create_table(RESULT_COLUMNS)
+        layout.addWidget(self.results_table, 1)
+
+    def refresh(self):
+        """会话有新结果时更新显示"""
+        session = self.session
+        if session.version == self.version:
+            return
+        self.version = session.version
+        summary = session.summary()
+
+        status = summary['status']
+        if summary['error']:
+            status = f"{status}: {summary['error']}"
+        self.labels['status'].setText(status)
+        self.labels['progress'].setText(f"{summary['measured_points']} / {summary['total_points']} 点，"
+                                        f"已分析 {summary['points']} 点，{summary['elapsed_s']:.0f} 秒")
+        self.labels['errors'].setText(f"{format_value(summary['mean_error'], '+.4f')} / "
+                                      f"{format_value(summary['std_error'], '.4f')} mm")
+        self.labels['range'].setText(f"{format_value(summary['max_error'], '+.4f')} / "
+                                     f"{format_value(summary['min_error'], '+.4f')} mm")
+        self.labels['pass_rate'].setText(format_value(summary['pass_rate'], '.1%'))
+        self.labels['alignment'].setText(f"{format_value(summary['alignment_rms'], '.4f')} mm")
+        self.labels['roundness'].setText(f"{format_value(summary['max_roundness'], '.4f')} mm")
+        self.labels['output'].setText(summary['output_path'])
+
+        # 最新的结果在最上方
+        results = list(session.recent_results)[::-1]
+        self.results_table.setRowCount(len(results))
+        for row, result in enumerate(results):
+            error_analysis = result['error_analysis']
+            set_row(self.results_table, row, [
+                str(result['sequence']), f"{result['x_pos']:.1f}", f"{result['angle_deg']:.1f}",
+                f"{result['measured_radius']:.3f}", f"{result['theoretical_radius']:.3f}",
+                f"{error_analysis['radius_error']:+.4f}", error_analysis['status'],
+            ])
+
+
+class SessionMonitorDialog(QDialog):
+    """多工位会话面板（非模态）"""
+
+    def __init__(self, manager, create_session, parent=None):
+        """
+        Args:
+            manager: SessionManager
+            create_session: 可调用对象，按当前模型与测量参数创建并启动一个会话，返回会话或 None
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.manager = manager
+        self.create_session = create_session
+        self.views = {}
+        self.setWindowTitle("多工位会话")
+        self.resize(980, 600)
+
+        layout = QVBoxLayout(self)
+
+        control_layout = QHBoxLayout()
+        for title, slot in (("新建工位", self.add_session), ("暂停", self.pause_selected),
+                            ("继续", self.resume_selected), ("停止", self.stop_selected),
+                            ("移除", self.remove_selected), ("全部停止", self.stop_all)):
+            button = QPushButton(title)
+            button.clicked.connect(slot)
+            control_layout.addWidget(button)
+        control_layout.addStretch()
+        layout.addLayout(control_layout)
+
+        self.tabs = QTabWidget()
+        self.overview_table = create_table(OVERVIEW_COLUMNS)
+        self.overview_table.cellDoubleClicked.connect(self.open_session_tab)
+        self.tabs.addTab(self.overview_table, "总览")
+        layout.addWidget(self.tabs, 1)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.auto_refresh)
+        self.timer.start(AppConfig.SESSION_MONITOR_REFRESH_INTERVAL)
+        self.refresh()
+
+    def auto_refresh(self):
+        """窗口可见时定时刷新"""
+        if self.isVisible():
+            self.refresh()
+
+    def refresh(self):
+        """同步会话页并刷新总览与当前会话页"""
+        sessions = self.manager.sessions
+        for name in [name for name in self.views if name not in sessions]:
+            self.tabs.removeTab(self.tabs.indexOf(self.views.pop(name)))
+        for name, session in sessions.items():
+            if name not in self.views:
+                self.views[name] = SessionView(session)
+                self.tabs.addTab(self.views[name], name)
+
+        overview = self.manager.overview()
+        self.overview_table.setRowCount(len(overview) + 1)
+        for row, summary in enumerate(overview):
+            set_row(self.overview_table, row, [
+                summary['name'], summary['mold'], summary['status'],
+                f"{summary['measured_points']} / {summary['total_points']}", str(summary['points']),
+                format_value(summary['mean_error'], '+.4f'), format_value(summary['std_error'], '.4f'),
+                format_value(summary['max_error'], '+.4f'), format_value(summary['min_error'], '+.4f'),
+                format_value(summary['pass_rate'], '.1%'), format_value(summary['alignment_rms'], '.4f'),
+                format_value(summary['max_roundness'], '.4f'),
+            ])
+
+        combined = self.manager.combined_statistics().to_dict()
+        pass_rate = combined['within_tolerance_count'] / combined['points'] if combined['points'] else None
+        set_row(self.overview_table, len(overview), [
+            COMBINED_ROW_NAME, '', f"{self.manager.running_count} 个运行中", '', str(combined['points']),
+            format_value(combined['mean_error'], '+.4f'), format_value(combined['std_error'], '.4f'),
+            format_value(combined['max_error'], '+.4f'), format_value(combined['min_error'], '+.4f'),
+            format_value(pass_rate, '.1%'), '', '',
+        ])
+
+        current = self.tabs.currentWidget()
+        if isinstance(current, SessionView):
+            current.refresh()
+        self.status_label.setText(f"{len(overview)} 个会话，{len(self.manager.models)} 个共享模具模型")
+
+    def selected_name(self):
+        """当前会话页或总览表选中行对应的会话名称"""
+        current = self.tabs.currentWidget()
+        if isinstance(current, SessionView):
+            return current.session.name
+        row = self.overview_table.currentRow()
+        item = self.overview_table.item(row, 0) if row >= 0 else None
+        if item is None or item.text() not in self.manager.sessions:
+            return None
+        return item.text()
+
+    def open_session_tab(self, row, column):
+        item = self.overview_table.item(row, 0)
+        if item is not None and item.text() in self.views:
+            self.tabs.setCurrentWidget(self.views[item.text()])
+            self.refresh()
+
+    def add_session(self):
+        session = self.create_session()
+        if session is not None:
+            self.refresh()
+            self.tabs.setCurrentWidget(self.views[session.name])
+
+    def apply_selected(self, action):
+        name = self.selected_name()
+        if name is None:
+            QMessageBox.information(self, "多工位会话", "请先选择一个会话")
+            return
+        action(name)
+        self.refresh()
+
+    def pause_selected(self):
+        self.apply_selected(self.manager.pause)
+
+    def resume_selected(self):
+        self.apply_selected(self.manager.resume)
+
+    def stop_selected(self):
+        self.apply_selected(self.manager.stop)
+
+    def remove_selected(self):
+        def remove(name):
+            try:
+                self.manager.remove(name)
+            except ValueError as e:
+                QMessageBox.warning(self, "无法移除", str(e))
+        self.apply_selected(remove)
+
+    def stop_all(self):
+        self.manager.stop_all()
+        self.refresh()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+长时间运行（浸泡）测试 - 无界面驱动完整测量流程并跟踪资源增长
+
+在 offscreen Qt 平台上创建 MainWindow，加载合成圆柱模具，按设定速率持续运行
+HardwareSimulator + AnalysisWorker（模具测完后自动重新开始测量），定时采样：
+- 进程常驻内存(RSS)
+- Python 对象总数及增长最多的类型
+- 预热结束后新增且仍存活的内存分配中最多的位置（tracemalloc 在预热结束时才开始跟踪，
+  不计入启动期的分配，快照开销与运行期增长量成正比）
+- 单点端到端延迟（采集 → 界面绘制）的 P50/P95/P99（流水线指标按序号采样）
+预热结束后的首个采样作为基准，结束时 RSS、对象数或 P95 延迟增长超出预算则以非零状态退出
+
+命令行示例:
+    python soak_test.py --duration 7200 --rate 20
+    python soak_test.py --duration 600 --rss-budget-mb 50 -o soak_report.json
+"""
+
+import os
+import sys
+import gc
+import json
+import math
+import time
+import argparse
+import tracemalloc
+from collections import Counter
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+
+
+# 合成模具：圆柱半径、X间隔(mm)、角度间隔(度)、最多X站位数
+SOAK_MOLD_RADIUS = 500.0
+SOAK_X_STEP = 1.0
+SOAK_ANGLE_STEP = 1.0
+SOAK_MAX_STATIONS = 2000
+
+# 默认运行参数
+DEFAULT_DURATION = 3600.0       # 运行时长(秒)
+DEFAULT_RATE = 20.0             # 测量速率(点/秒)
+DEFAULT_SAMPLE_INTERVAL = 30.0  # 采样间隔(秒)
+DEFAULT_WARMUP = 120.0          # 预热时长(秒)，之后的首个采样作为基准
+DEFAULT_SAMPLE_EVERY = 10       # 延迟采样：每多少个序号记录一个点
+
+# 默认增长预算（相对基准采样）
+DEFAULT_RSS_BUDGET_MB = 100.0
+DEFAULT_OBJECT_BUDGET = 50000
+DEFAULT_LATENCY_BUDGET = 2.0    # P95 延迟最多为基准的倍数
+LATENCY_WINDOWS = 3             # 延迟比较使用的区间数
+
+# 报告中列出的增长最多的类型/分配位置数
+DEFAULT_TOP = 10
+
+DEFAULT_OUTPUT = 'soak_report.json'
+
+
+def make_soak_mold(point_count):
+    """
+    生成足够运行 point_count 个测量点的合成圆柱模具
+
+    Returns:
+        (points (N, 3), X站位数)
+    """
+    from analytic_surface import CylinderSurface
+    per_station = int(round(180.0 / SOAK_ANGLE_STEP)) + 1
+    stations = min(SOAK_MAX_STATIONS, max(2, math.ceil(point_count / per_station) + 1))
+    surface = CylinderSurface(SOAK_MOLD_RADIUS, 0.0, (stations - 1) * SOAK_X_STEP, 0.0, 180.0)
+    return surface.sample_points(SOAK_X_STEP, SOAK_ANGLE_STEP), stations
+
+
+class SoakTest:
+    """浸泡测试驱动：启动测量、定时采样并评估增长预算"""
+
+    def __init__(self, app, args):
+        self.app = app
+        self.args = args
+        self.window = None
+        self.samples = []
+        self.baseline = None
+        self.baseline_types = None
+        self.cycles = 0
+        self.start_time = None
+
+    def setup(self):
+        """创建主窗口、加载合成模具并开始测量"""
+        import pandas as pd
+        from PySide6.QtCore import QTimer
+        from config import AppConfig
+        from main_window import MainWindow
+
+        AppConfig.MEASUREMENT_DELAY = 1.0 / self.args.rate
+
+        self.window = MainWindow()
+        self.window.show()
+        self.window.pipeline_metrics.set_sample_every(self.args.sample_every)
+
+        points, stations = make_soak_mold(int(self.args.rate * self.args.duration))
+        self.window.theoretical_data = pd.DataFrame(points, columns=['x_mm', 'y_mm', 'z_mm'])
+        self.window.display_point_cloud_in_3d(points)
+        self.window.x_min_input.setText(str(0.0))
+        self.window.x_max_input.setText(str((stations - 1) * SOAK_X_STEP))
+        self.window.x_step_input.setText(str(SOAK_X_STEP))
+        self.window.rot_step_input.setText(str(SOAK_ANGLE_STEP))
+        print(f"合成模具 {len(points)} 点（{stations} 个X站位），测量速率 {self.args.rate} 点/秒，"
+              f"运行 {self.args.duration:.0f} 秒", flush=True)
+
+        self.start_time = time.perf_counter()
+        self.start_cycle()
+
+        self.sample_timer = QTimer()
+        self.sample_timer.timeout.connect(self.sample)
+        self.sample_timer.start(int(self.args.sample_interval * 1000))
+        QTimer.singleShot(int(self.args.duration * 1000), self.finish)
+
+    def start_cycle(self):
+        """开始（或重新开始）一轮测量"""
+        from PySide6.QtCore import QTimer
+        self.cycles += 1
+        self.window.start_measurement()
+        # 模具测完后等待分析线程处理完剩余数据，再开始下一轮
+        self.window.hardware_simulator.measurement_finished.connect(
+            lambda: QTimer.singleShot(1000, self.start_cycle))
+        self.window.pipeline_metrics.set_sample_every(self.args.sample_every)
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def sample(self):
+        """采样内存、对象数、分配位置与延迟"""
+        from metrics_server import resident_memory_bytes
+
+        gc.collect()
+        objects = gc.get_objects()
+        types = Counter(type(obj).__name__ for obj in objects)
+        object_count = len(objects)
+        del objects
+
+        # 采样本身会短暂阻塞界面线程，在其后才截取并重置延迟统计，使阻塞期间的在途点计入本区间
+        latency = self.window.pipeline_metrics.snapshot()['latency'].get('acquire→ui_paint')
+        self.window.pipeline_metrics.reset()
+
+        sample = {
+            'elapsed_s': self.elapsed(),
+            'cycle': self.cycles,
+            'rss_bytes': resident_memory_bytes(),
+            'tracemalloc_overhead_bytes': tracemalloc.get_tracemalloc_memory(),
+            'objects': object_count,
+            'table_rows': self.window.data_table.rowCount(),
+            'measured_points_3d': len(self.window.measured_points),
+            'latency': latency,
+        }
+
+        if self.baseline is None and sample['elapsed_s'] >= self.args.warmup:
+            self.baseline = sample
+            self.baseline_types = types
+            if self.args.tracemalloc_frames > 0:
+                tracemalloc.start(self.args.tracemalloc_frames)
+        elif self.baseline is not None:
+            sample['type_growth'] = [
+                {'type': name, 'growth': growth}
+                for name, growth in (types - self.baseline_types).most_common(self.args.top)
+            ]
+            if tracemalloc.is_tracing():
+                stats = tracemalloc.take_snapshot().statistics('lineno')
+                sample['allocation_growth'] = [
+                    {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+                    for stat in stats[:self.args.top]
+                ]
+
+        self.samples.append(sample)
+        p95 = f"{latency['p95_ms']:.1f}ms" if latency else "-"
+        rss = f"{sample['rss_bytes'] / 1e6:.1f}MB" if sample['rss_bytes'] else "-"
+        print(f"[{sample['elapsed_s']:7.0f}s] 第{self.cycles}轮 RSS {rss} 对象 {object_count} "
+              f"表格 {sample['table_rows']} 行 P95延迟 {p95}", flush=True)
+
+    def evaluate(self):
+        """
+        按预算评估增长
+
+        Returns:
+            list of str: 超出预算的说明（为空表示通过）
+        """
+        if self.baseline is None or len(self.samples) < 2:
+            return ["运行时间不足，预热结束后没有可比较的采样"]
+        last = self.samples[-1]
+        failures = []
+
+        if last['rss_bytes'] and self.baseline['rss_bytes']:
+            # 扣除 tracemalloc 自身的内存开销
+            growth_mb = (last['rss_bytes'] - last['tracemalloc_overhead_bytes']
+                         - self.baseline['rss_bytes'] + self.baseline['tracemalloc_overhead_bytes']) / 1e6
+            if growth_mb > self.args.rss_budget_mb:
+                failures.append(f"RSS 增长 {growth_mb:.1f}MB，超出预算 {self.args.rss_budget_mb}MB")
+
+        object_growth = last['objects'] - self.baseline['objects']
+        if object_growth > self.args.object_budget:
+            failures.append(f"对象数增长 {object_growth}，超出预算 {self.args.object_budget}")
+
+        # 单个区间的 P95 波动较大，比较预热后最初与最后 LATENCY_WINDOWS 个区间的中位数
+        measured = [s for s in self.samples[self.samples.index(self.baseline):] if s['latency']]
+        if len(measured) >= 2:
+            count = min(LATENCY_WINDOWS, len(measured) // 2)
+            first = np.median([s['latency']['p95_ms'] for s in measured[:count]])
+            recent = np.median([s['latency']['p95_ms'] for s in measured[-count:]])
+            ratio = recent / first if first > 0 else 1.0
+            if ratio > self.args.latency_budget:
+                failures.append(f"P95 延迟为基准的 {ratio:.2f} 倍，超出预算 {self.args.latency_budget} 倍")
+        return failures
+
+    def finish(self):
+        """结束测量并退出事件循环"""
+        self.sample()
+        self.sample_timer.stop()
+        self.window.cleanup_threads()
+        tracemalloc.stop()
+        self.app.quit()
+
+    def report(self, failures):
+        return {
+            'config': {key: value for key, value in vars(self.args).items() if key != 'output'},
+            'cycles': self.cycles,
+            'baseline': self.baseline,
+            'samples': self.samples,
+            'failures': failures,
+            'passed': not failures,
+        }
+
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="模具曲面精度分析系统浸泡测试（offscreen）")
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help="运行时长(秒)")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help="测量速率(点/秒)")
+    parser.add_argument('--sample-interval', type=float, default=DEFAULT_SAMPLE_INTERVAL, help="采样间隔(秒)")
+    parser.add_argument('--warmup', type=float, default=DEFAULT_WARMUP, help="预热时长(秒)")
+    parser.add_argument('--sample-every', type=int, default=DEFAULT_SAMPLE_EVERY,
+                        help="延迟采样：每多少个序号记录一个点")
+    parser.add_argument('--rss-budget-mb', type=float, default=DEFAULT_RSS_BUDGET_MB,
+                        help="RSS 相对基准的最大增长(MB)")
+    parser.add_argument('--object-budget', type=int, default=DEFAULT_OBJECT_BUDGET,
+                        help="Python 对象数相对基准的最大增长")
+    parser.add_argument('--latency-budget', type=float, default=DEFAULT_LATENCY_BUDGET,
+                        help="P95 延迟相对基准的最大倍数")
+    parser.add_argument('--tracemalloc-frames', type=int, default=1,
+                        help="tracemalloc 记录的栈帧数（0为关闭），预热结束后开始跟踪")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help="报告中列出的增长最多的项数")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help="报告JSON文件")
+    return parser
+
+
+def main(argv=None):
+    """命令行入口，超出增长预算时返回1"""
+    args = build_parser().parse_args(argv)
+    if args.rate <= 0 or args.duration <= 0 or args.sample_interval <= 0:
+        print("运行时长、速率与采样间隔必须大于0")
+        return 2
+
+    from PySide6.QtWidgets import QApplication
+    from app_logging import setup_logging
+    setup_logging(level='WARNING')
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    soak = SoakTest(app, args)
+    soak.setup()
+    app.exec()
+
+    failures = soak.evaluate()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(soak.report(failures), f, ensure_ascii=False, indent=2)
+    print(f"报告已保存: {args.output}")
+
+    soak.window.close()
+    if failures:
+        print("浸泡测试未通过:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print(f"浸泡测试通过（{soak.cycles} 轮测量）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+空间索引模块 - 三维点云的k近邻批量查询
+
+优先使用 scipy.spatial.cKDTree（多线程批量查询）；
+scipy不可用时退化为分块暴力搜索，仅适合小规模点云，超过 BRUTE_FORCE_MAX_POINTS 的点云直接拒绝
+"""
+
+import numpy as np
+
+from app_logging import get_logger
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+
+logger = get_logger('index')
+
+
+class SpatialIndex:
+    """三维点云k近邻索引"""
+
+    # 暴力搜索时每块查询点数，限制距离矩阵内存
+    BRUTE_FORCE_CHUNK = 256
+
+    # 暴力搜索允许的最大参考点数，更大的点云必须安装scipy
+    BRUTE_FORCE_MAX_POINTS = 20000
+
+    # 少于该数量的查询使用单线程，避免线程调度开销
+    PARALLEL_MIN_QUERIES = 1024
+
+    def __init__(self, points, leafsize=32):
+        """
+        构建空间索引
+
+        Args:
+            points: numpy数组 (N, 3)，参考点坐标
+            leafsize: int，KD树叶节点大小
+
+        Raises:
+            ImportError: 未安装scipy且点数超过 BRUTE_FORCE_MAX_POINTS
+        """
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        if cKDTree is not None:
+            self.tree = cKDTree(self.points, leafsize=leafsize, balanced_tree=False)
+        elif len(self.points) > self.BRUTE_FORCE_MAX_POINTS:
+            raise ImportError(f"点云共 {len(self.points)} 点，超过暴力搜索上限 {self.BRUTE_FORCE_MAX_POINTS} 点，"
+                              f"请安装scipy（pip install scipy）")
+        else:
+            self.tree = None
+            logger.warning("未安装scipy，空间索引退化为暴力搜索")
+
+    def __len__(self):
+        return len(self.points)
+
+    def query(self, queries, k=1, workers=-1):
+        """
+        批量查询k近邻
+
+        Args:
+            queries: numpy数组 (Q, 3)，查询点
+            k: int，近邻数
+            workers: int，并行线程数（-1为全部核心，仅KD树有效）
+
+        Returns:
+            (distances, indices)：均为 (Q, k) 数组，按距离升序
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        k = min(k, len(self.points))
+
+        if self.tree is not None:
+            if len(queries) < self.PARALLEL_MIN_QUERIES:
+                workers = 1
+            distances, indices = self.tree.query(queries, k=k, workers=workers)
+            if k == 1:
+                distances = distances[:, np.newaxis]
+                indices = indices[:, np.newaxis]
+            return distances, indices
+
+        return self._brute_force_query(queries, k)
+
+    def _brute_force_query(self, queries, k):
+        """分块暴力搜索k近邻"""
+        distances = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=np.int64)
+        point_norms = np.einsum('ij,ij->i', self.points, self.points)
+
+        for start in range(0, len(queries), self.BRUTE_FORCE_CHUNK):
+            chunk = queries[start:start + self.BRUTE_FORCE_CHUNK]
+            d2 = (np.einsum('ij,ij->i', chunk, chunk)[:, np.newaxis]
+                  - 2.0 * chunk @ self.points.T + point_norms)
+            nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            nearest_d2 = np.take_along_axis(d2, nearest, axis=1)
+            order = np.argsort(nearest_d2, axis=1)
+            indices[start:start + len(chunk)] = np.take_along_axis(nearest, order, axis=1)
+            distances[start:start + len(chunk)] = np.sqrt(np.maximum(
+                np.take_along_axis(nearest_d2, order, axis=1), 0.0))
+
+        return distances, indices
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动模块 - 首帧后的后台预加载与启动耗时分析
+
+- call_after_first_paint(): 窗口首次绘制完成后执行回调，用于启动渲染线程、预加载重模块
+- preload_modules(): 在后台线程中导入模块（导入锁保证与界面线程并发导入安全）
+- StartupProfiler: 记录每个模块的导入耗时（含/不含子模块）与启动各阶段时间点，
+  由 `python app.py --profile-startup` 启用
+"""
+
+import sys
+import json
+import time
+import threading
+import importlib
+
+from PySide6.QtCore import QObject, QEvent, QTimer
+from app_logging import get_logger
+
+
+logger = get_logger('startup')
+
+
+def preload_modules(module_names):
+    """
+    在后台守护线程中依次导入模块
+
+    Args:
+        module_names: list of str，模块名
+
+    Returns:
+        threading.Thread
+    """
+    def _preload():
+        for name in module_names:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                logger.error(f"后台预加载模块 {name} 失败: {e}")
+
+    thread = threading.Thread(target=_preload, name="module-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+class _FirstPaintFilter(QObject):
+    """监听部件的首次绘制事件"""
+
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            watched.removeEventFilter(self)
+            # 延迟到本次绘制完成后再执行
+            QTimer.singleShot(0, self.callback)
+        return False
+
+
+def call_after_first_paint(widget, callback):
+    """
+    部件首次绘制完成后执行回调（仅一次）
+
+    Args:
+        widget: QWidget
+        callback: callable
+    """
+    return _FirstPaintFilter(widget, callback)
+
+
+class _TimedLoader:
+    """包装模块加载器，记录 exec_module 耗时"""
+
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name)
+
+
+class _TimingFinder:
+    """sys.meta_path 查找器：委托其余查找器定位模块，并为其加载器计时"""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self.profiler, name)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    """启动耗时分析：模块导入耗时与启动阶段时间点"""
+
+    def __init__(self, output_path=None):
+        """
+        Args:
+            output_path: str，JSON报告输出路径（可选）
+        """
+        self.output_path = output_path
+        self.start_time = time.perf_counter()
+        self.phases = []
+        self.imports = {}
+        self._stack = []
+        self._finder = None
+        self._thread = threading.get_ident()
+
+    def install(self):
+        """开始记录模块导入（应在导入应用模块之前调用）"""
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        """停止记录模块导入"""
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def mark(self, phase):
+        """记录启动阶段时间点（相对于分析开始的毫秒数）"""
+        self.phases.append((phase, (time.perf_counter() - self.start_time) * 1000))
+
+    def _enter(self, name):
+        if threading.get_ident() != self._thread:
+            return
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name):
+        if threading.get_ident() != self._thread or not self._stack:
+            return
+        name, started, children = self._stack.pop()
+        total = time.perf_counter() - started
+        self.imports[name] = {'self_ms': (total - children) * 1000, 'cumulative_ms': total * 1000}
+        if self._stack:
+            self._stack[-1][2] += total
+
+    def report(self, top=25):
+        """
+        生成启动耗时报告
+
+        Args:
+            top: int，列出自身耗时最高的模块数
+
+        Returns:
+            dict: 'phases' 阶段时间点(ms)，'imports' 按自身耗时降序的模块导入耗时
+        """
+        ranked = sorted(self.imports.items(), key=lambda item: item[1]['self_ms'], reverse=True)
+        return {
+            'phases': dict(self.phases),
+            'import_count': len(self.imports),
+            'imports': [{'module': name, **timing} for name, timing in ranked[:top]],
+        }
+
+    def print_report(self, top=25):
+        """打印启动耗时报告"""
+        report = self.report(top)
+        print("=== 启动耗时分析 ===")
+        for phase, elapsed in report['phases'].items():
+            print(f"  {phase:<28s} {elapsed:9.1f} ms")
+        print(f"  已导入模块: {report['import_count']} 个，自身耗时最高的 {len(report['imports'])} 个:")
+        print(f"  {'模块':<40s} {'自身(ms)':>10s} {'累计(ms)':>10s}")
+        for entry in report['imports']:
+            print(f"  {entry['module']:<40s} {entry['self_ms']:10.1f} {entry['cumulative_ms']:10.1f}")
+
+    def save_report(self, file_path, top=100):
+        """将启动耗时报告写入JSON文件"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(top), f, ensure_ascii=False, indent=2)
+
+    def finish(self):
+        """停止记录，打印报告并按需写入文件"""
+        self.uninstall()
+        self.print_report()
+        if self.output_path:
+            self.save_report(self.output_path)
+            print(f"启动耗时报告已保存: {self.output_path}")
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+STL导入模块 - 读取三角网格并采样为理论点云
+
+支持二进制与ASCII格式STL，向量化读取与采样：
+- 网格对齐采样：在(x, θ)规则网格上求从X轴出发的射线与三角面的交点
+- 面积加权采样：按三角形面积分配采样点，可复现的重心坐标采样
+输出与其余流程一致的 x_mm, y_mm, z_mm 列，并附带逐点法向 nx, ny, nz
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from normal_estimation import orient_outward
+from app_logging import get_logger
+
+
+logger = get_logger('loader')
+
+
+# 二进制STL三角形记录：法向(3) + 顶点(9) + 属性字节数
+STL_RECORD_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
+
+# 网格对齐采样每批处理的三角形数，限制中间数组内存
+GRID_CHUNK_TRIANGLES = 100000
+
+
+def read_stl(file_path):
+    """
+    读取STL文件
+
+    Args:
+        file_path: str，STL文件路径
+
+    Returns:
+        numpy数组 (T, 3, 3)，每个三角形的三个顶点
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        header = f.read(84)
+
+    # 二进制格式：80字节头 + 4字节三角形数 + 每个三角形50字节
+    if len(header) == 84:
+        count = int(np.frombuffer(header[80:84], dtype='<u4')[0])
+        if file_size == 84 + count * STL_RECORD_DTYPE.itemsize:
+            records = np.fromfile(file_path, dtype=STL_RECORD_DTYPE, count=count, offset=84)
+            return records['vertices'].astype(np.float64)
+
+    if header.lstrip().lower().startswith(b'solid'):
+        return _read_ascii_stl(file_path)
+
+    raise ValueError(f"无法识别的STL文件格式: {file_path}")
+
+
+def _read_ascii_stl(file_path):
+    """读取ASCII格式STL：取每个 'vertex' 关键字后的三个数值"""
+    with open(file_path, 'rb') as f:
+        tokens = np.array(f.read().split())
+
+    vertex_pos = np.flatnonzero(tokens == b'vertex')
+    if len(vertex_pos) == 0 or len(vertex_pos) % 3 != 0:
+        raise ValueError(f"ASCII STL顶点数量无效: {len(vertex_pos)}")
+
+    coords = tokens[vertex_pos[:, np.newaxis] + np.arange(1, 4)].astype(np.float64)
+    return coords.reshape(-1, 3, 3)
+
+
+def face_normals(vertices):
+    """
+    计算三角形单位法向（按顶点顺序的右手定则）与面积
+
+    Args:
+        vertices: numpy数组 (T, 3, 3)
+
+    Returns:
+        (normals, areas)：(T, 3) 单位法向与 (T,) 面积
+    """
+    cross = np.cross(vertices[:, 1] - vertices[:, 0], vertices[:, 2] - vertices[:, 0])
+    length = np.linalg.norm(cross, axis=1)
+    normals = cross / np.maximum(length, 1e-300)[:, np.newaxis]
+    return normals, 0.5 * length
+
+
+def sample_area_weighted(vertices, spacing, seed=0):
+    """
+    按面积加权在网格表面采样
+
+    每个三角形的期望采样数为 面积 / spacing²，小数部分按随机取整，结果可复现
+
+    Args:
+        vertices: numpy数组 (T, 3, 3)
+        spacing: float，平均采样间距(mm)
+        seed: int，随机种子
+
+    Returns:
+        (points, normals)：(N, 3) 采样点与法向
+    """
+    normals, areas = face_normals(vertices)
+    rng = np.random.default_rng(seed)
+
+    expected = areas / spacing**2
+    counts = np.floor(expected).astype(np.int64)
+    counts += rng.random(len(counts)) < (expected - counts)
+
+    triangle_ids = np.repeat(np.arange(len(vertices)), counts)
+    r1 = np.sqrt(rng.random(len(triangle_ids)))
+    r2 = rng.random(len(triangle_ids))
+
+    # 均匀重心坐标：(1 - √r1, √r1(1 - r2), √r1·r2)
+    v = vertices[triangle_ids]
+    points = ((1 - r1)[:, np.newaxis] * v[:, 0] +
+              (r1 * (1 - r2))[:, np.newaxis] * v[:, 1] +
+              (r1 * r2)[:, np.newaxis] * v[:, 2])
+    return points, normals[triangle_ids]
+
+
+def sample_grid_aligned(vertices, x_step, angle_step):
+    """
+    在(x, θ)规则网格上采样：网格节点对应从X轴出发、角度为θ的射线与三角面的交点
+
+    同一网格单元命中多个三角面时保留半径最大的交点（外表面）
+
+    Args:
+        vertices: numpy数组 (T, 3, 3)
+        x_step: float，X采样间隔(mm)
+        angle_step: float，角度采样间隔(度)
+
+    Returns:
+        (points, normals)：(N, 3) 采样点与法向，按X站位优先、角度次之排列
+    """
+    # 角度步长调整为能整除360°，保证±180°接缝处网格列连续
+    angle_step = 360.0 / max(1, int(round(360.0 / angle_step)))
+
+    normals, areas = face_normals(vertices)
+    vertices = vertices[areas > 0]
+    normals = normals[areas > 0]
+
+    x0 = np.floor(vertices[:, :, 0].min() / x_step) * x_step
+    angle0 = -180.0
+
+    cells, radii, tri_ids = [], [], []
+    for start in range(0, len(vertices), GRID_CHUNK_TRIANGLES):
+        chunk = vertices[start:start + GRID_CHUNK_TRIANGLES]
+        result = _grid_hits(chunk, x0, x_step, angle0, angle_step)
+        cells.append(result[0])
+        radii.append(result[1])
+        tri_ids.append(result[2] + start)
+
+    cells = np.concatenate(cells)
+    radii = np.concatenate(radii)
+    tri_ids = np.concatenate(tri_ids)
+    if len(cells) == 0:
+        return np.empty((0, 3)), np.empty((0, 3))
+
+    # 每个单元保留半径最大的交点
+    order = np.lexsort((radii, cells))
+    cells, radii, tri_ids = cells[order], radii[order], tri_ids[order]
+    last = np.r_[cells[1:] != cells[:-1], True]
+    cells, radii, tri_ids = cells[last], radii[last], tri_ids[last]
+
+    angle_count = int(round(360.0 / angle_step)) + 1
+    ix, ia = np.divmod(cells, angle_count)
+    x = x0 + ix * x_step
+    angle_rad = np.radians(angle0 + ia * angle_step)
+
+    points = np.column_stack([x, radii * np.cos(angle_rad), radii * np.sin(angle_rad)])
+    return points, normals[tri_ids]
+
+
+def _grid_hits(vertices, x0, x_step, angle0, angle_step):
+    """计算一批三角形覆盖的网格节点及射线交点半径"""
+    tri_x = vertices[:, :, 0]
+    tri_angle = np.degrees(np.arctan2(vertices[:, :, 2], vertices[:, :, 1]))
+
+    # 跨越±180°接缝的三角形：以第一个顶点为参考展开角度
+    delta = tri_angle - tri_angle[:, :1]
+    tri_angle = tri_angle - 360.0 * np.round(delta / 360.0)
+
+    # 三角形在(x, θ)参数平面上的网格节点包围盒
+    ix_min = np.ceil((tri_x.min(axis=1) - x0) / x_step - 1e-9).astype(np.int64)
+    ix_max = np.floor((tri_x.max(axis=1) - x0) / x_step + 1e-9).astype(np.int64)
+    ia_min = np.ceil((tri_angle.min(axis=1) - angle0) / angle_step - 1e-9).astype(np.int64)
+    ia_max = np.floor((tri_angle.max(axis=1) - angle0) / angle_step + 1e-9).astype(np.int64)
+
+    count_x = np.maximum(ix_max - ix_min + 1, 0)
+    count_a = np.maximum(ia_max - ia_min + 1, 0)
+    total = count_x * count_a
+    if total.sum() == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, np.empty(0), empty
+
+    # 展开每个三角形包围盒内的候选节点
+    tri = np.repeat(np.arange(len(vertices)), total)
+    offset = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+    ix = ix_min[tri] + offset // count_a[tri]
+    ia = ia_min[tri] + offset % count_a[tri]
+
+    px = x0 + ix * x_step
+    pa = angle0 + ia * angle_step
+
+    # 参数平面内的重心坐标判断节点是否落在三角形内（含边界）
+    ax, aa = tri_x[tri, 0], tri_angle[tri, 0]
+    bx, ba = tri_x[tri, 1] - ax, tri_angle[tri, 1] - aa
+    cx, ca = tri_x[tri, 2] - ax, tri_angle[tri, 2] - aa
+    qx, qa = px - ax, pa - aa
+    det = bx * ca - cx * ba
+    valid = np.abs(det) > 1e-12
+    det = np.where(valid, det, 1.0)
+    u = (qx * ca - cx * qa) / det
+    v = (bx * qa - qx * ba) / det
+    eps = 1e-9
+    inside = valid & (u >= -eps) & (v >= -eps) & (u + v <= 1 + eps)
+
+    tri, ix, ia, px, pa = tri[inside], ix[inside], ia[inside], px[inside], pa[inside]
+
+    # 射线 (px, r·cosθ, r·sinθ) 与三角面所在平面求交
+    v0 = vertices[tri, 0]
+    n = np.cross(vertices[tri, 1] - v0, vertices[tri, 2] - v0)
+    angle_rad = np.radians(pa)
+    denom = n[:, 1] * np.cos(angle_rad) + n[:, 2] * np.sin(angle_rad)
+    numer = np.einsum('ij,ij->i', n, v0) - n[:, 0] * px
+    hit = np.abs(denom) > 1e-12
+    radius = np.where(hit, numer / np.where(hit, denom, 1.0), -1.0)
+    hit &= radius > 0
+
+    # 将展开后的角度折回 (-180, 180] 对应的网格列 1..angle_count-1
+    angle_count = int(round(360.0 / angle_step)) + 1
+    ia = np.mod(ia - 1, angle_count - 1) + 1
+    cells = ix[hit] * angle_count + ia[hit]
+    return cells, radius[hit], tri[hit]
+
+
+def load_stl_pointcloud(file_path, spacing=5.0, method='grid', angle_step=0.5, seed=0):
+    """
+    加载STL并转换为理论点云
+
+    Args:
+        file_path: str，STL文件路径
+        spacing: float，采样间距(mm)；网格对齐采样时为X步长
+        method: str，'grid'（网格对齐(x, θ)采样）或 'area'（面积加权采样）
+        angle_step: float，网格对齐采样的角度步长(度)
+        seed: int，面积加权采样的随机种子
+
+    Returns:
+        Pandas DataFrame，包含 x_mm, y_mm, z_mm, nx, ny, nz 列（法向指向径向外侧，与三角形绕序无关）
+    """
+    vertices = read_stl(file_path)
+    logger.info(f"读取STL网格: {len(vertices)} 个三角形")
+
+    if method == 'grid':
+        points, normals = sample_grid_aligned(vertices, spacing, angle_step)
+    elif method == 'area':
+        points, normals = sample_area_weighted(vertices, spacing, seed)
+    else:
+        raise ValueError(f"不支持的STL采样方式: {method}")
+
+    # 三角形绕序给出的法向可能朝内，按与 estimate_normals 相同的约定统一朝外
+    normals = orient_outward(points, np.array(normals, dtype=np.float64))
+
+    return pd.DataFrame({
+        'x_mm': points[:, 0],
+        'y_mm': points[:, 1],
+        'z_mm': points[:, 2],
+        'nx': normals[:, 0],
+        'ny': normals[:, 1],
+        'nz': normals[:, 2],
+    })
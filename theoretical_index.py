@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+理论数据索引模块 - 基于(x, angle)键的理论点查找索引
+
+将理论点云预处理为数组形式的查找索引，支持序列化到缓存目录以便重复使用。
+对规则(x, θ)网格点云，额外构建按整数网格单元直接寻址的半径数组，
+查找退化为纯算术运算，并在网格节点之间进行双线性插值
+"""
+
+import math
+import hashlib
+import numpy as np
+from app_logging import get_logger
+
+
+logger = get_logger('index')
+
+
+class TheoreticalIndex:
+    """理论数据查找索引 - 以(x, angle)四舍五入键定位理论点"""
+
+    # 索引格式版本，索引结构变化时递增以使旧缓存失效
+    INDEX_VERSION = 2
+
+    # 邻近搜索容差
+    TOLERANCE_X = 0.5  # X方向容差(mm)
+    TOLERANCE_ANGLE = 1.0  # 角度容差(度)
+
+    # 规则网格检测容差（相对于网格步长）
+    GRID_TOLERANCE = 0.05
+
+    def __init__(self, arrays, x_precision=1, angle_precision=1):
+        """
+        初始化索引
+
+        Args:
+            arrays: dict，索引数组 {'x', 'y', 'z', 'radius', 'angle', 'x_key', 'angle_key'}，
+                    规则网格点云另含 'grid_radius' 和 'grid_params'
+            x_precision: int，X键的小数位数
+            angle_precision: int，角度键的小数位数
+        """
+        self.x_precision = x_precision
+        self.angle_precision = angle_precision
+
+        self.x = arrays['x']
+        self.y = arrays['y']
+        self.z = arrays['z']
+        self.radius = arrays['radius']
+        self.angle = arrays['angle']
+        self.x_key = arrays['x_key']
+        self.angle_key = arrays['angle_key']
+
+        # 规则网格：grid_radius[ix, ia] 与网格参数 [x0, dx, angle0, dangle]
+        self.grid_radius = arrays.get('grid_radius')
+        self.grid_params = arrays.get('grid_params')
+        if self.grid_radius is not None:
+            self._grid_scalars = [float(v) for v in self.grid_params]
+        self._grid_rows = None
+
+        # 按X键排序的顺序，用于邻近搜索时快速截取候选范围
+        self.x_order = arrays.get('x_order')
+        if self.x_order is None:
+            self.x_order = np.argsort(self.x_key, kind='stable')
+        self.sorted_x_key = self.x_key[self.x_order]
+
+        # 精确命中字典在首次键查找时构建（规则网格的整批查找不需要）。
+        # 数组可以是只读内存映射，多个进程共享同一份索引文件时不复制
+        self._lookup = None
+
+    @property
+    def lookup(self):
+        """(x_key, angle_key) -> 行号 的字典，用于精确命中（首次访问时构建）"""
+        if self._lookup is None:
+            self._lookup = dict(zip(zip(self.x_key.tolist(), self.angle_key.tolist()),
+                                    range(len(self.x_key))))
+        return self._lookup
+
+    @classmethod
+    def build(cls, theoretical_data, x_precision=1, angle_precision=1):
+        """
+        从理论点云数据构建索引
+
+        Args:
+            theoretical_data: Pandas DataFrame，包含 x_mm, y_mm, z_mm 列
+            x_precision: int，X键的小数位数
+            angle_precision: int，角度键的小数位数
+
+        Returns:
+            TheoreticalIndex
+        """
+        x = theoretical_data['x_mm'].to_numpy(dtype=np.float64)
+        y = theoretical_data['y_mm'].to_numpy(dtype=np.float64)
+        z = theoretical_data['z_mm'].to_numpy(dtype=np.float64)
+
+        # 角度必须与硬件模拟器一致：使用atan2(z, y)
+        angle = np.degrees(np.arctan2(z, y))
+        radius = np.sqrt(y**2 + z**2)
+
+        x_key = np.round(x, x_precision)
+        angle_key = np.round(angle, angle_precision)
+
+        # 重复键保留最后一个点，与逐行写入字典的行为一致
+        keys = np.column_stack([x_key, angle_key])
+        _, first_in_reversed = np.unique(keys[::-1], axis=0, return_index=True)
+        keep = np.sort(len(keys) - 1 - first_in_reversed)
+
+        arrays = {
+            'x': x[keep],
+            'y': y[keep],
+            'z': z[keep],
+            'radius': radius[keep],
+            'angle': angle[keep],
+            'x_key': x_key[keep],
+            'angle_key': angle_key[keep],
+        }
+
+        grid = cls.detect_grid(x, angle, radius)
+        if grid is not None:
+            arrays['grid_radius'], arrays['grid_params'] = grid
+            nx, na = grid[0].shape
+            logger.info(f"检测到规则(x, θ)网格: {nx} x {na}，启用网格直接寻址查找")
+
+        return cls(arrays, x_precision, angle_precision)
+
+    @classmethod
+    def detect_grid(cls, x, angle, radius):
+        """
+        检测点云是否为规则(x, θ)网格
+
+        要求X站位等间距、每个站位的角度集合相同且等间距，每个网格单元恰好一个点
+
+        Args:
+            x: numpy数组，X坐标
+            angle: numpy数组，角度(度)
+            radius: numpy数组，半径
+
+        Returns:
+            (grid_radius, grid_params) 或 None
+        """
+        n = len(x)
+        if n < 4:
+            return None
+
+        x_values = np.unique(np.round(x, 6))
+        nx = len(x_values)
+        if nx < 2 or n % nx != 0:
+            return None
+        na = n // nx
+        if na < 2:
+            return None
+
+        x0 = x_values[0]
+        dx = (x_values[-1] - x0) / (nx - 1)
+        if dx <= 0 or np.max(np.abs(np.diff(x_values) - dx)) > cls.GRID_TOLERANCE * dx:
+            return None
+
+        angle0 = angle.min()
+        dangle = (angle.max() - angle0) / (na - 1)
+        if dangle <= 0:
+            return None
+
+        # 计算每个点所在网格单元，并检查偏离网格节点的程度
+        fx = (x - x0) / dx
+        fa = (angle - angle0) / dangle
+        ix = np.rint(fx).astype(np.int64)
+        ia = np.rint(fa).astype(np.int64)
+        if (np.max(np.abs(fx - ix)) > cls.GRID_TOLERANCE or
+                np.max(np.abs(fa - ia)) > cls.GRID_TOLERANCE):
+            return None
+
+        # 每个网格单元必须恰好一个点
+        cell = ix * na + ia
+        if np.unique(cell).size != n:
+            return None
+
+        grid_radius = np.empty(nx * na, dtype=np.float64)
+        grid_radius[cell] = radius
+        grid_params = np.array([x0, dx, angle0, dangle], dtype=np.float64)
+        return grid_radius.reshape(nx, na), grid_params
+
+    @staticmethod
+    def fingerprint(theoretical_data):
+        """
+        计算理论数据指纹，用作缓存键的一部分
+
+        Args:
+            theoretical_data: Pandas DataFrame，理论点云数据
+
+        Returns:
+            str，十六进制摘要
+        """
+        coords = np.ascontiguousarray(
+            theoretical_data[['x_mm', 'y_mm', 'z_mm']].to_numpy(dtype=np.float64)
+        )
+        digest = hashlib.sha1()
+        digest.update(str(coords.shape).encode('utf-8'))
+        digest.update(coords.tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def cache_params(cls, x_precision=1, angle_precision=1):
+        """返回影响索引内容的参数，用于生成缓存键"""
+        return {
+            'version': cls.INDEX_VERSION,
+            'x_precision': x_precision,
+            'angle_precision': angle_precision,
+        }
+
+    def to_arrays(self):
+        """导出索引数组，用于序列化"""
+        arrays = {
+            'x': self.x,
+            'y': self.y,
+            'z': self.z,
+            'radius': self.radius,
+            'angle': self.angle,
+            'x_key': self.x_key,
+            'angle_key': self.angle_key,
+            'x_order': self.x_order,
+        }
+        if self.grid_radius is not None:
+            arrays['grid_radius'] = self.grid_radius
+            arrays['grid_params'] = self.grid_params
+        return arrays
+
+    @property
+    def is_grid(self):
+        """是否为规则网格索引"""
+        return self.grid_radius is not None
+
+    def interpolate_radius(self, x_pos, angle_deg):
+        """
+        在规则网格上双线性插值理论半径
+
+        Args:
+            x_pos: float 或 numpy数组，X位置
+            angle_deg: float 或 numpy数组，角度(度)
+
+        Returns:
+            (radius, valid)：插值半径与是否落在网格容差范围内的掩码
+        """
+        x0, dx, angle0, dangle = self.grid_params
+        nx, na = self.grid_radius.shape
+
+        fx = (np.asarray(x_pos, dtype=np.float64) - x0) / dx
+        fa = (np.asarray(angle_deg, dtype=np.float64) - angle0) / dangle
+
+        # 超出网格边界的点仅在查找容差内允许（按边界值处理）；非有限值（如未写完的行）视为未找到
+        finite = np.isfinite(fx) & np.isfinite(fa)
+        valid = (finite &
+                 (fx >= -self.TOLERANCE_X / dx) & (fx <= nx - 1 + self.TOLERANCE_X / dx) &
+                 (fa >= -self.TOLERANCE_ANGLE / dangle) & (fa <= na - 1 + self.TOLERANCE_ANGLE / dangle))
+        fx = np.clip(np.where(finite, fx, 0.0), 0, nx - 1)
+        fa = np.clip(np.where(finite, fa, 0.0), 0, na - 1)
+
+        ix = np.minimum(fx.astype(np.int64), nx - 2)
+        ia = np.minimum(fa.astype(np.int64), na - 2)
+        tx = fx - ix
+        ta = fa - ia
+
+        grid = self.grid_radius
+        radius = ((1 - tx) * (1 - ta) * grid[ix, ia] +
+                  tx * (1 - ta) * grid[ix + 1, ia] +
+                  (1 - tx) * ta * grid[ix, ia + 1] +
+                  tx * ta * grid[ix + 1, ia + 1])
+        return radius, valid
+
+    def _interpolate_scalar(self, x_pos, angle_deg):
+        """单点双线性插值，避免numpy标量运算开销"""
+        x0, dx, angle0, dangle = self._grid_scalars
+        nx, na = self.grid_radius.shape
+
+        fx = (x_pos - x0) / dx
+        fa = (angle_deg - angle0) / dangle
+        if not (-self.TOLERANCE_X / dx <= fx <= nx - 1 + self.TOLERANCE_X / dx and
+                -self.TOLERANCE_ANGLE / dangle <= fa <= na - 1 + self.TOLERANCE_ANGLE / dangle):
+            return None
+        fx = min(max(fx, 0.0), nx - 1)
+        fa = min(max(fa, 0.0), na - 1)
+
+        ix = min(int(fx), nx - 2)
+        ia = min(int(fa), na - 2)
+        tx = fx - ix
+        ta = fa - ia
+
+        # 单点查找使用的Python原生副本（首次使用时生成）
+        if self._grid_rows is None:
+            self._grid_rows = self.grid_radius.tolist()
+        grid = self._grid_rows
+        row0 = grid[ix]
+        row1 = grid[ix + 1]
+        return ((1 - tx) * (1 - ta) * row0[ia] + tx * (1 - ta) * row1[ia] +
+                (1 - tx) * ta * row0[ia + 1] + tx * ta * row1[ia + 1])
+
+    def __len__(self):
+        return len(self.x_key)
+
+    def make_key(self, x_pos, angle_deg):
+        """生成查找键"""
+        return (float(np.round(x_pos, self.x_precision)),
+                float(np.round(angle_deg, self.angle_precision)))
+
+    def point(self, row):
+        """返回指定行的理论点数据"""
+        return {
+            'x_theoretical': float(self.x[row]),
+            'y_theoretical': float(self.y[row]),
+            'z_theoretical': float(self.z[row]),
+            'radius_theoretical': float(self.radius[row]),
+            'angle_theoretical': float(self.angle[row])
+        }
+
+    def find(self, x_pos, angle_deg):
+        """
+        查找对应的理论点数据
+
+        Args:
+            x_pos: float，X位置
+            angle_deg: float，角度(度)
+
+        Returns:
+            dict 或 None
+        """
+        # 规则网格：直接寻址并双线性插值
+        if self.grid_radius is not None:
+            radius = self._interpolate_scalar(float(x_pos), float(angle_deg))
+            if radius is None:
+                return None
+            angle_rad = math.radians(angle_deg)
+            return {
+                'x_theoretical': float(x_pos),
+                'y_theoretical': radius * math.cos(angle_rad),
+                'z_theoretical': radius * math.sin(angle_rad),
+                'radius_theoretical': radius,
+                'angle_theoretical': float(angle_deg)
+            }
+
+        # 直接查找
+        row = self.lookup.get(self.make_key(x_pos, angle_deg))
+        if row is not None:
+            return self.point(row)
+
+        # 直接查找失败时，在容差范围内搜索最近的键
+        row = self._nearest_row(x_pos, angle_deg)
+        if row is None:
+            return None
+        return self.point(row)
+
+    def _nearest_row(self, x_pos, angle_deg):
+        """在容差范围内搜索最近键对应的行号，未找到返回None"""
+        lo = np.searchsorted(self.sorted_x_key, x_pos - self.TOLERANCE_X, side='left')
+        hi = np.searchsorted(self.sorted_x_key, x_pos + self.TOLERANCE_X, side='right')
+        if lo >= hi:
+            return None
+
+        candidates = self.x_order[lo:hi]
+        dx = self.x_key[candidates] - x_pos
+        da = self.angle_key[candidates] - angle_deg
+        mask = (np.abs(dx) <= self.TOLERANCE_X) & (np.abs(da) <= self.TOLERANCE_ANGLE)
+        if not mask.any():
+            return None
+
+        candidates = candidates[mask]
+        distance = np.hypot(dx[mask], da[mask])
+        return int(candidates[np.argmin(distance)])
+
+    def find_batch(self, x_pos, angle_deg):
+        """
+        批量查找理论点数据
+
+        Args:
+            x_pos: numpy数组，X位置
+            angle_deg: numpy数组，角度(度)
+
+        Returns:
+            (points, valid)：points 为字段与 find() 结果相同的数组字典，
+            valid 为是否找到理论点的布尔掩码（无效位置的值无意义）
+        """
+        x_pos = np.asarray(x_pos, dtype=np.float64)
+        angle_deg = np.asarray(angle_deg, dtype=np.float64)
+
+        # 规则网格：整批直接寻址插值
+        if self.grid_radius is not None:
+            radius, valid = self.interpolate_radius(x_pos, angle_deg)
+            angle_rad = np.radians(angle_deg)
+            return {
+                'x_theoretical': x_pos.copy(),
+                'y_theoretical': radius * np.cos(angle_rad),
+                'z_theoretical': radius * np.sin(angle_rad),
+                'radius_theoretical': radius,
+                'angle_theoretical': angle_deg.copy()
+            }, valid
+
+        # 键查找：批量生成键后逐个查字典，仅未命中的点走容差搜索
+        x_keys = np.round(x_pos, self.x_precision).tolist()
+        angle_keys = np.round(angle_deg, self.angle_precision).tolist()
+        rows = np.fromiter(
+            (self.lookup.get(key, -1) for key in zip(x_keys, angle_keys)),
+            dtype=np.int64, count=len(x_keys)
+        )
+        for i in np.flatnonzero(rows < 0):
+            row = self._nearest_row(x_pos[i], angle_deg[i])
+            if row is not None:
+                rows[i] = row
+
+        valid = rows >= 0
+        rows = np.where(valid, rows, 0)
+        return {
+            'x_theoretical': self.x[rows],
+            'y_theoretical': self.y[rows],
+            'z_theoretical': self.z[rows],
+            'radius_theoretical': self.radius[rows],
+            'angle_theoretical': self.angle[rows]
+        }, valid